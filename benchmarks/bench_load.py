@@ -0,0 +1,322 @@
+"""
+End-to-end load benchmark: drives agent_runtime.main:app in-process over httpx's ASGI transport
+(no sockets), with the example tools replaced by stubs of configurable latency and error rate.
+
+    python benchmarks/bench_load.py [--requests 2000] [--concurrency 32]
+        [--mix math=1,weather_math=1,search=1] [--latency-ms 20 | math=1,weather=40,web_search=80]
+        [--latency-dist fixed|exp|lognormal] [--error-rate 0.01 | weather=0.1] [--cache]
+        [--alloc-requests 200] [--out result.json]
+
+With --planner ollama_math the runtime's Ollama client talks to agent_runtime.fake_ollama (also
+in-process), replaying the recorded sessions; the mix is then the sessions' inputs, and
+--ollama-latency-ms / --ollama-stream / --ollama-chunk-interval-ms shape the fake model.
+
+Prints one JSON report: requests/s, latency percentiles (overall and per mix entry), status
+counts, and allocations per request from a separate sequential pass under tracemalloc
+(peak_kb: transient high-water mark above the baseline; retained_blocks: net allocated blocks
+left behind). Compare reports across commits with the same arguments.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+import httpx
+
+from agent_runtime.fake_ollama import FakeOllamaConfig, build_app, load_sessions
+from agent_runtime.main import app
+from agent_runtime.ollama_client import OllamaClient
+from agent_runtime.tools.base import Tool, ToolError
+
+MIXES = {
+    "math": "12*13",
+    "weather_math": "weather in Seattle and 12*13",
+    "search": "search something obscure",
+}
+
+# What each stubbed tool answers with: enough for the final templates to render.
+_RESULTS: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    "math": lambda arguments: {"result": 156.0},
+    "weather": lambda arguments: {"location": arguments.get("location", ""), "summary": "Stub: 72F, clear skies."},
+    "web_search": lambda arguments: {
+        "query": arguments.get("query", ""),
+        "results": [{"title": "Stub result", "snippet": "Benchmark"}],
+    },
+}
+
+
+class _StubTool(Tool):
+    """Stands in for a real tool: sleeps a sampled latency, then fails at error_rate or answers."""
+
+    def __init__(self, real: Tool, *, latency: Callable[[], float], error_rate: float, rng: random.Random, cache: bool):
+        self.name = real.name
+        self.description = real.description
+        self.triggers = real.triggers
+        self.plan_arguments = real.plan_arguments  # type: ignore[method-assign]
+        # Without --cache every call reaches the stub, so its latency is always paid.
+        self.cache_policy = real.cache_policy if cache else None
+        self.idempotent = real.idempotent if cache else False
+        self._latency = latency
+        self._error_rate = error_rate
+        self._rng = rng
+
+    async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        delay = self._latency()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self._error_rate and self._rng.random() < self._error_rate:
+            raise ToolError("Stub failure", code="stub_error")
+        return _RESULTS[self.name](arguments)
+
+
+def _per_tool(value: str, names: list[str]) -> dict[str, float]:
+    """"20" -> every tool 20; "math=1,weather=40" -> those tools, 0 for the rest."""
+    if "=" not in value:
+        return {name: float(value) for name in names}
+    out = {name: 0.0 for name in names}
+    for part in value.split(","):
+        name, _, number = part.partition("=")
+        out[name.strip()] = float(number)
+    return out
+
+
+def _sampler(mean_ms: float, dist: str, rng: random.Random) -> Callable[[], float]:
+    mean_s = mean_ms / 1000
+    if mean_s <= 0 or dist == "fixed":
+        return lambda: mean_s
+    if dist == "exp":
+        return lambda: rng.expovariate(1 / mean_s)
+    # Lognormal with sigma 1 and the requested mean: a long tail like real upstreams.
+    mu = math.log(mean_s) - 0.5
+    return lambda: rng.lognormvariate(mu, 1.0)
+
+
+def _install_stubs(runtime: Any, args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    names = [n for n in _RESULTS if n in runtime.registry.tools]
+    latency = _per_tool(args.latency_ms, names)
+    errors = _per_tool(args.error_rate, names)
+    for name in names:
+        real = runtime.registry.get(name)
+        runtime.registry.register(
+            _StubTool(
+                real,
+                latency=_sampler(latency[name], args.latency_dist, rng),
+                error_rate=errors[name],
+                rng=rng,
+                cache=args.cache,
+            )
+        )
+
+
+def _mix(value: str) -> list[str]:
+    """"math=2,search=1" -> ["math", "math", "search"], the cycle requests are drawn from."""
+    kinds: list[str] = []
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in MIXES:
+            raise SystemExit(f"unknown mix entry {name!r}; choose from {sorted(MIXES)}")
+        kinds += [name.strip()] * int(weight or 1)
+    return kinds
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def rank(q: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+    return {
+        "p50": round(rank(0.50), 3),
+        "p95": round(rank(0.95), 3),
+        "p99": round(rank(0.99), 3),
+        "max": round(ordered[-1], 3),
+        "mean": round(sum(ordered) / len(ordered), 3),
+    }
+
+
+async def _install_fake_ollama(runtime: Any, args: argparse.Namespace) -> dict[str, dict[str, Any]]:
+    """Point the runtime's Ollama client at the replay app; returns one request body per session."""
+    sessions = load_sessions(args.sessions)
+    if not sessions:
+        raise SystemExit(f"no replayable ollama_math sessions under {args.sessions}")
+    config = FakeOllamaConfig(
+        latency_ms=None if args.ollama_latency_ms == "recorded" else float(args.ollama_latency_ms),
+        chunk_interval_ms=args.ollama_chunk_interval_ms,
+    )
+    await runtime.ollama.aclose()
+    runtime.ollama = OllamaClient(transport=httpx.ASGITransport(app=build_app(sessions, config)))
+    return {
+        s.name: {"input": s.user_input, "planner": "ollama_math", "ollama_stream": args.ollama_stream}
+        for s in sessions
+    }
+
+
+async def _post(client: httpx.AsyncClient, body: dict[str, Any], debug: bool) -> tuple[int, float]:
+    started = time.perf_counter()
+    response = await client.post("/v1/agent/run", json={**body, "debug": debug})
+    return response.status_code, (time.perf_counter() - started) * 1000
+
+
+async def _load(
+    client: httpx.AsyncClient, kinds: list[str], bodies: dict[str, dict[str, Any]], args: argparse.Namespace
+) -> dict[str, Any]:
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for i in range(args.requests):
+        queue.put_nowait(kinds[i % len(kinds)])
+    latencies: dict[str, list[float]] = {kind: [] for kind in set(kinds)}
+    statuses: dict[str, int] = {}
+
+    async def worker() -> None:
+        while not queue.empty():
+            kind = queue.get_nowait()
+            status, ms = await _post(client, bodies[kind], args.debug)
+            latencies[kind].append(ms)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    every = [ms for samples in latencies.values() for ms in samples]
+    return {
+        "duration_s": round(elapsed, 3),
+        "requests_per_s": round(len(every) / elapsed, 1),
+        "latency_ms": _percentiles(every),
+        "by_mix": {kind: {"count": len(s), **_percentiles(s)} for kind, s in sorted(latencies.items())},
+        "status": statuses,
+    }
+
+
+async def _allocations(
+    client: httpx.AsyncClient, kinds: list[str], bodies: dict[str, dict[str, Any]], args: argparse.Namespace
+) -> dict[str, Any]:
+    if args.alloc_requests <= 0:
+        return {}
+    tracemalloc.start()
+    try:
+        peaks = []
+        gc.collect()
+        blocks_before = sys.getallocatedblocks()
+        for i in range(args.alloc_requests):
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await _post(client, bodies[kinds[i % len(kinds)]], args.debug)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append((peak - baseline) / 1024)
+        gc.collect()
+        retained = (sys.getallocatedblocks() - blocks_before) / args.alloc_requests
+    finally:
+        tracemalloc.stop()
+    return {
+        "requests": args.alloc_requests,
+        "peak_kb_per_request": _percentiles(peaks),
+        "retained_blocks_per_request": round(retained, 2),
+    }
+
+
+def _commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    async with app.router.lifespan_context(app):
+        _install_stubs(app.state.runtime, args)
+        if args.planner == "ollama_math":
+            bodies = await _install_fake_ollama(app.state.runtime, args)
+            kinds = sorted(bodies)
+        else:
+            kinds = _mix(args.mix)
+            bodies = {kind: {"input": MIXES[kind]} for kind in set(kinds)}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for i in range(args.warmup):
+                await _post(client, bodies[kinds[i % len(kinds)]], args.debug)
+            errors = app.state.runtime.executor.metrics.errors.values
+            before = dict(errors)
+            load = await _load(client, kinds, bodies, args)
+            # Tool failures render into a 200 response; the metrics registry has them by code.
+            load["tool_errors"] = {
+                ":".join(labels): int(count - before.get(labels, 0))
+                for labels, count in errors.items()
+                if count > before.get(labels, 0)
+            }
+            allocations = await _allocations(client, kinds, bodies, args)
+    return {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "planner": args.planner,
+            "mix": args.mix if args.planner == "rules" else kinds,
+            "latency_ms": args.latency_ms,
+            "latency_dist": args.latency_dist,
+            "error_rate": args.error_rate,
+            "cache": args.cache,
+            "debug": args.debug,
+            "seed": args.seed,
+            **(
+                {
+                    "ollama_latency_ms": args.ollama_latency_ms,
+                    "ollama_stream": args.ollama_stream,
+                    "ollama_chunk_interval_ms": args.ollama_chunk_interval_ms,
+                }
+                if args.planner == "ollama_math"
+                else {}
+            ),
+        },
+        **load,
+        "allocations": allocations,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", default="math=1,weather_math=1,search=1")
+    parser.add_argument("--latency-ms", default="20", help='mean stub latency: "20" or "math=1,weather=40"')
+    parser.add_argument("--latency-dist", choices=("fixed", "exp", "lognormal"), default="exp")
+    parser.add_argument("--error-rate", default="0", help='stub failure rate: "0.01" or "weather=0.1"')
+    parser.add_argument("--cache", action="store_true", help="keep the real tools' cache policies")
+    parser.add_argument("--debug", action="store_true", help="request debug traces")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--alloc-requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--planner", choices=("rules", "ollama_math"), default="rules")
+    parser.add_argument("--sessions", default=str(ROOT / "sessions"), help="recorded sessions for ollama_math")
+    parser.add_argument("--ollama-latency-ms", default="0", help='fake model latency: "0", "25" or "recorded"')
+    parser.add_argument("--ollama-stream", action="store_true", help="stream the fake model's reply")
+    parser.add_argument("--ollama-chunk-interval-ms", type=float, default=0.0)
+    parser.add_argument("--out", help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
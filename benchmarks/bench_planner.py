@@ -0,0 +1,175 @@
+"""
+RulesPlanner throughput, before and after.
+
+    python benchmarks/bench_planner.py [--n 200000] [--tools 200]
+
+"distinct" gives every input a unique suffix, so it measures the scanner and call-id hashing;
+"repeated" cycles through a handful of inputs, the shape of real traffic the plan cache serves.
+"distinct_with_extra_tools" repeats "distinct" after registering --tools extra trigger tools;
+it should stay close to "distinct" because intent matching is one automaton pass.
+
+"baseline_*" runs BaselinePlanner below, the planner as it was before patterns were compiled
+and plans cached: a regex compile-cache lookup per check, several linear scans per input and
+no plan cache. "uncached_*" is the current planner with cache_size=0, which separates the
+scanner's gain from the cache's.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from typing import Any
+
+from agent_runtime.canonical import canonical_json
+from agent_runtime.planner_rules import RulesPlanner
+from agent_runtime.tools.base import Tool
+from agent_runtime.tools.registry import ToolRegistry, build_default_registry
+from agent_runtime.types import Plan, PlanStep, ToolCall
+
+INPUTS = [
+    "What is 12*13 and then add 5?",
+    "weather in Seattle",
+    "12*13 and weather in Seattle",
+    "search something obscure",
+    "5",
+    "forecast for Paris tomorrow",
+    "how tall is the eiffel tower",
+    "(3 + 4) ^ 2 / 7",
+]
+
+
+class _TriggerTool(Tool):
+    description = "Benchmark filler."
+
+    def __init__(self, i: int):
+        self.name = f"filler_{i}"
+        self.triggers = (f"filler{_tag(i)}", f"keyword{_tag(i)}x", f"{_tag(i)}zq")
+
+    async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        return {}
+
+
+class BaselinePlanner:
+    """The rules planner before the compiled single scan and the plan cache (kept for comparison)."""
+
+    def __init__(self, registry: ToolRegistry):
+        self.registry = registry
+
+    def plan(self, user_input: str) -> Plan:
+        text = user_input.strip()
+
+        wants_weather = self._mentions_weather(text)
+        wants_math = self._looks_like_math(text) or self._contains_numbers(text)
+
+        if wants_weather and wants_math:
+            city = self._extract_city(text) or "San Francisco"
+            expr = self._extract_math_expr(text)
+            call_weather = self._call(text, 0, "weather", {"location": city})
+            call_math = self._call(text, 1, "math", {"expression": expr})
+            steps = [
+                PlanStep(kind="parallel_tool_calls", parallel_calls=[call_weather, call_math]),
+                PlanStep(kind="final", final_template="weather_plus_math"),
+            ]
+            return Plan(user_input=text, steps=steps)
+
+        if wants_math:
+            expr = self._extract_math_expr(text)
+            call = self._call(text, 0, "math", {"expression": expr})
+            steps = [PlanStep(kind="tool_call", tool_call=call), PlanStep(kind="final", final_template="math")]
+            return Plan(user_input=text, steps=steps)
+
+        if wants_weather:
+            city = self._extract_city(text) or "San Francisco"
+            call = self._call(text, 0, "weather", {"location": city})
+            steps = [PlanStep(kind="tool_call", tool_call=call), PlanStep(kind="final", final_template="weather")]
+            return Plan(user_input=text, steps=steps)
+
+        call = self._call(text, 0, "web_search", {"query": text})
+        steps = [PlanStep(kind="tool_call", tool_call=call), PlanStep(kind="final", final_template="search_summary")]
+        return Plan(user_input=text, steps=steps)
+
+    def _call(self, user_input: str, ordinal: int, tool_name: str, arguments: dict) -> ToolCall:
+        payload = {"user_input": user_input, "ordinal": ordinal, "tool": tool_name, "arguments": arguments}
+        digest = hashlib.sha256(canonical_json(payload)).hexdigest()[:12]
+        return ToolCall(tool_name=tool_name, arguments=arguments, call_id=f"{tool_name}_{ordinal}_{digest}")
+
+    def _looks_like_math(self, text: str) -> bool:
+        return bool(re.search(r"\d\s*[\+\-\*/\^]\s*\d", text))
+
+    def _contains_numbers(self, text: str) -> bool:
+        return bool(re.search(r"\d", text))
+
+    def _mentions_weather(self, text: str) -> bool:
+        t = text.lower()
+        return "weather" in t or "forecast" in t or "temperature" in t
+
+    def _extract_city(self, text: str) -> str | None:
+        m = re.search(r"(?:weather|forecast|temperature)\s+(?:in|for)\s+([A-Za-z .'-]+)", text, flags=re.IGNORECASE)
+        return m.group(1).strip() if m else None
+
+    def _extract_math_expr(self, text: str) -> str:
+        candidates = re.findall(r"[0-9\s\+\-\*/\^\(\)\.]+", text)
+        candidates = [c.strip() for c in candidates if c.strip()]
+        for c in candidates:
+            if any(op in c for op in ["+", "-", "*", "/", "^"]) and re.search(r"\d", c):
+                return c
+        nums = re.findall(r"\d+(?:\.\d+)?", text)
+        return nums[0] if nums else "0"
+
+
+def _tag(i: int) -> str:
+    # Letters only: a numeric suffix would turn every input into a math request.
+    out = ""
+    while True:
+        i, r = divmod(i, 26)
+        out += chr(ord("a") + r)
+        if not i:
+            return out
+
+
+def _rate(planner: RulesPlanner | BaselinePlanner, texts: list[str]) -> float:
+    started = time.perf_counter()
+    for text in texts:
+        planner.plan(text)
+    return len(texts) / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=200_000)
+    parser.add_argument("--tools", type=int, default=200)
+    args = parser.parse_args()
+
+    registry = build_default_registry()
+    distinct = [f"{INPUTS[i % len(INPUTS)]} {_tag(i)}" for i in range(args.n)]
+    repeated = [INPUTS[i % len(INPUTS)] for i in range(args.n)]
+    # Same plans, call ids included, or the comparison means nothing.
+    baseline, current = BaselinePlanner(registry), RulesPlanner(registry, cache_size=0)
+    for text in INPUTS + distinct[: len(INPUTS) * 4]:
+        assert baseline.plan(text) == current.plan(text), text
+    report = {
+        "n": args.n,
+        "baseline_distinct_plans_per_s": round(_rate(BaselinePlanner(registry), distinct)),
+        "baseline_repeated_plans_per_s": round(_rate(BaselinePlanner(registry), repeated)),
+        "uncached_distinct_plans_per_s": round(_rate(RulesPlanner(registry, cache_size=0), distinct)),
+        "uncached_repeated_plans_per_s": round(_rate(RulesPlanner(registry, cache_size=0), repeated)),
+        "distinct_plans_per_s": round(_rate(RulesPlanner(registry), distinct)),
+        "repeated_plans_per_s": round(_rate(RulesPlanner(registry), repeated)),
+    }
+    for i in range(args.tools):
+        registry.register(_TriggerTool(i))
+    report["extra_tools"] = args.tools
+    report["distinct_with_extra_tools_plans_per_s"] = round(_rate(RulesPlanner(registry), distinct))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
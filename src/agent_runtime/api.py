@@ -1,16 +1,29 @@
+import asyncio
 import time
-from typing import Any, Literal
+from typing import Any, AsyncIterator, Callable, Literal
 
 import httpx
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
+from agent_runtime.batch import run_batch
+from agent_runtime.fast_json import FastJSONResponse, dumps
 from agent_runtime.ollama_adapter import plan_from_ollama_response
-from agent_runtime.planner_rules import RulesPlanner
-from agent_runtime.executor import Executor
-from agent_runtime.tools.registry import build_default_registry
+from agent_runtime.ollama_client import OLLAMA_MODEL
+from agent_runtime.runtime import AgentRuntime
+from agent_runtime.tools.base import ToolError
+from agent_runtime.tools.registry import ToolRegistry
+from agent_runtime.types import ExecutionResult, Plan
 
 router = APIRouter()
+# Mounted without the /v1 prefix: scrapers expect /metrics at the root.
+metrics_router = APIRouter()
+
+
+def get_runtime(request: Request) -> AgentRuntime:
+    """Resolve the process-lifetime runtime built by the app lifespan."""
+    return request.app.state.runtime
 
 
 def _ollama_token_usage(payload: dict[str, Any]) -> dict[str, int | None]:
@@ -40,102 +53,442 @@ class AgentRunRequest(BaseModel):
         "rules",
         description="Planning mode. ollama_math makes one local Ollama math-tool call.",
     )
+    ollama_stream: bool = Field(
+        False,
+        description="ollama_math only: stream the completion and start the tool call as soon as it appears.",
+    )
+    deadline_ms: int | None = Field(
+        None,
+        ge=1,
+        le=600_000,
+        description="End-to-end time budget. Results that arrive in time are returned; the rest are cut off.",
+    )
 
 class AgentRunResponse(BaseModel):
     output: str
     trace: list[dict] | None = None
 
-@router.get("/tools/schemas")
-def tool_schemas() -> dict:
-    registry = build_default_registry()
-    out = {}
-    for name, tool in registry.tools.items():
-        out[name] = {
-            "description": getattr(tool, "description", ""),
-            "input_schema": tool.input_schema,
-            "output_schema": tool.output_schema,
-        }
-    return out
+class AgentBatchRequest(BaseModel):
+    inputs: list[str] = Field(..., min_length=1, max_length=10_000, description="User inputs, planned with the rules planner.")
+    debug: bool = Field(False, description="If true, include each item's internal trace.")
+    max_concurrency: int = Field(16, ge=1, le=256, description="Maximum plans executing at once.")
+    deadline_ms: int | None = Field(None, ge=1, le=600_000, description="Time budget for the whole batch.")
 
-@router.post("/agent/run", response_model=AgentRunResponse)
-async def run_agent(req: AgentRunRequest) -> AgentRunResponse:
-    registry = build_default_registry()
-    executor = Executor(registry=registry)
 
-    provider_trace: list[dict[str, Any]] = []
-    if req.planner == "rules":
-        plan = RulesPlanner(registry=registry).plan(req.input)
-    else:
-        math_tool = registry.get("math")
-        tool_definition = {
-            "type": "function",
-            "function": {
-                "name": "math",
-                "description": math_tool.description,
-                "parameters": math_tool.input_schema,
-            },
-        }
-        started = time.perf_counter()
+def _deadline(deadline_ms: int | None, runtime: AgentRuntime) -> float:
+    return time.monotonic() + (deadline_ms or runtime.config.default_deadline_ms) / 1000
+
+
+def _ollama_http_error(exc: Exception) -> HTTPException:
+    if isinstance(exc, (httpx.TimeoutException, asyncio.TimeoutError)):
+        return HTTPException(status_code=504, detail={"code": "ollama_timeout"})
+    if isinstance(exc, httpx.HTTPStatusError):
+        return HTTPException(status_code=502, detail={"code": "ollama_status"})
+    if isinstance(exc, httpx.RequestError):
+        return HTTPException(status_code=502, detail={"code": "ollama_request"})
+    return HTTPException(status_code=502, detail={"code": "ollama_decode"})
+
+
+def _ollama_math_plan(user_input: str, payload: dict[str, Any], registry: ToolRegistry) -> Plan:
+    try:
+        plan = plan_from_ollama_response(user_input, payload, registry)
+    except ValueError as exc:
+        raise HTTPException(status_code=502, detail={"code": "ollama_adapter"}) from exc
+
+    first_step = plan.steps[0] if plan.steps else None
+    if (
+        first_step is None
+        or first_step.kind != "tool_call"
+        or first_step.tool_call is None
+        or first_step.tool_call.tool_name != "math"
+    ):
+        raise HTTPException(status_code=502, detail={"code": "ollama_non_math_call"})
+    return plan
+
+
+def _provider_trace_item(returned_model: Any, http_status: int | None, started: float, usage_payload: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "type": "provider_call",
+        "provider": "ollama",
+        "configured_model": OLLAMA_MODEL,
+        "returned_model": returned_model,
+        "ok": True,
+        "http_status": http_status,
+        "ms": int((time.perf_counter() - started) * 1000),
+        **_ollama_token_usage(usage_payload),
+        "provider_billed_cost_usd": 0.0,
+        "cost_basis": "local-unbilled",
+    }
+
+
+def _provider_error_item(
+    exc: HTTPException, returned_model: Any, http_status: int | None, started: float, usage_payload: Any
+) -> dict[str, Any]:
+    """provider_call for a failed exchange: what was observed before it failed, plus the error code."""
+    item = _provider_trace_item(
+        returned_model, http_status, started, usage_payload if isinstance(usage_payload, dict) else {}
+    )
+    item["ok"] = False
+    item["error"] = exc.detail
+    return item
+
+
+def _http_status(exc: Exception) -> int | None:
+    return exc.response.status_code if isinstance(exc, httpx.HTTPStatusError) else None
+
+
+async def _plan_with_ollama(
+    req: AgentRunRequest,
+    runtime: AgentRuntime,
+    deadline: float,
+    provider_trace: list[dict[str, Any]],
+) -> Plan:
+    """Plan with one Ollama chat call. Its provider_call item is appended to provider_trace, failed or not."""
+    body = runtime.ollama.chat_body(req.input, [runtime.ollama_math_tool_definition], stream=False)
+    started = time.perf_counter()
+    remaining = deadline - time.monotonic()
+    http_status: int | None = None
+    payload: Any = None
+    returned_model: Any = None
+    try:
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    "http://127.0.0.1:11434/api/chat",
-                    json={
-                        "model": "qwen3.5:9b-q4_K_M",
-                        "messages": [{"role": "user", "content": req.input}],
-                        "tools": [tool_definition],
-                        "stream": False,
-                        "think": False,
-                        "options": {"temperature": 0},
-                    },
-                )
-                response.raise_for_status()
-                payload = response.json()
-        except httpx.TimeoutException as exc:
-            raise HTTPException(status_code=504, detail={"code": "ollama_timeout"}) from exc
-        except httpx.HTTPStatusError as exc:
-            raise HTTPException(status_code=502, detail={"code": "ollama_status"}) from exc
-        except httpx.RequestError as exc:
-            raise HTTPException(status_code=502, detail={"code": "ollama_request"}) from exc
-        except ValueError as exc:
-            raise HTTPException(status_code=502, detail={"code": "ollama_decode"}) from exc
+            http_status, payload = await asyncio.wait_for(
+                runtime.ollama.chat(body, remaining_s=remaining),
+                max(remaining, 0.0),
+            )
+        except (httpx.HTTPError, ValueError, asyncio.TimeoutError) as exc:
+            http_status = _http_status(exc)
+            raise _ollama_http_error(exc) from exc
 
         if not isinstance(payload, dict):
             raise HTTPException(status_code=502, detail={"code": "ollama_provider_shape"})
         returned_model = payload.get("model")
-        if returned_model != "qwen3.5:9b-q4_K_M":
+        if returned_model != OLLAMA_MODEL:
             raise HTTPException(status_code=502, detail={"code": "ollama_model_mismatch"})
+        plan = _ollama_math_plan(req.input, payload, runtime.registry)
+    except HTTPException as exc:
+        provider_trace.append(_provider_error_item(exc, returned_model, http_status, started, payload))
+        raise
+    provider_call = _provider_trace_item(returned_model, http_status, started, payload)
+    runtime.api_metrics.plan_seconds.observe(time.perf_counter() - started, "ollama_math")
+    runtime.api_metrics.ollama_usage(provider_call, stream=False)
+    provider_trace.append(provider_call)
+    return plan
+
+
+def _rules_plan(user_input: str, runtime: AgentRuntime) -> Plan:
+    started = time.perf_counter()
+    plan = runtime.rules_planner.plan(user_input)
+    runtime.api_metrics.plan_seconds.observe(time.perf_counter() - started, "rules")
+    return plan
+
+
+async def _run_with_ollama_stream(
+    req: AgentRunRequest,
+    runtime: AgentRuntime,
+    deadline: float,
+    provider_trace: list[dict[str, Any]],
+    on_event: Callable[[dict[str, Any]], None] | None = None,
+) -> ExecutionResult:
+    """
+    Stream the chat completion and dispatch the tool call the moment it appears,
+    so the math tool runs while Ollama is still emitting the rest of the response.
+    The deadline bounds the stream here; the executor enforces it on the tool call, so a
+    slow tool still yields the partial result rather than a provider timeout.
+    The provider_call item is appended to provider_trace, failed or not. on_event receives
+    the executor's events, as with Executor.execute_stream.
+    """
+    body = runtime.ollama.chat_body(req.input, [runtime.ollama_math_tool_definition], stream=True)
+    started = time.perf_counter()
+    first_chunk_ms: int | None = None
+    tool_call_ms: int | None = None
+    http_status: int | None = None
+    returned_model: Any = None
+    native_calls: list[Any] = []
+    final_chunk: dict[str, Any] = {}
+    execution: asyncio.Task[ExecutionResult] | None = None
+    finished = False
+
+    async def read_stream() -> None:
+        nonlocal first_chunk_ms, tool_call_ms, http_status, returned_model, final_chunk, execution
+        async with runtime.ollama.stream_chat(body, remaining_s=deadline - time.monotonic()) as stream:
+            http_status = stream.status_code
+            async for chunk in stream.chunks():
+                if first_chunk_ms is None:
+                    first_chunk_ms = int((time.perf_counter() - started) * 1000)
+                returned_model = chunk.get("model")
+                if returned_model != OLLAMA_MODEL:
+                    raise HTTPException(status_code=502, detail={"code": "ollama_model_mismatch"})
+                message = chunk.get("message")
+                calls = message.get("tool_calls") if isinstance(message, dict) else None
+                if calls:
+                    if not isinstance(calls, list):
+                        raise HTTPException(status_code=502, detail={"code": "ollama_adapter"})
+                    native_calls.extend(calls)
+                    if execution is None:
+                        plan = _ollama_math_plan(req.input, {"message": {"tool_calls": calls}}, runtime.registry)
+                        planned_s = time.perf_counter() - started
+                        runtime.api_metrics.plan_seconds.observe(planned_s, "ollama_math")
+                        tool_call_ms = int(planned_s * 1000)
+                        run = runtime.executor.new_run(deadline=deadline, trace=_traced(req, runtime))
+                        run.on_event = on_event
+                        execution = asyncio.create_task(runtime.executor.execute(plan, run))
+                if chunk.get("done"):
+                    final_chunk = chunk
+
+    def stream_fields(item: dict[str, Any]) -> dict[str, Any]:
+        item["stream"] = True
+        item["time_to_first_token_ms"] = first_chunk_ms
+        item["time_to_tool_call_ms"] = tool_call_ms
+        return item
+
+    try:
         try:
-            plan = plan_from_ollama_response(req.input, payload, registry)
-        except ValueError as exc:
-            raise HTTPException(status_code=502, detail={"code": "ollama_adapter"}) from exc
-
-        first_step = plan.steps[0] if plan.steps else None
-        if (
-            first_step is None
-            or first_step.kind != "tool_call"
-            or first_step.tool_call is None
-            or first_step.tool_call.tool_name != "math"
-        ):
-            raise HTTPException(status_code=502, detail={"code": "ollama_non_math_call"})
+            await asyncio.wait_for(read_stream(), max(deadline - time.monotonic(), 0.0))
+        except (httpx.HTTPError, ValueError, asyncio.TimeoutError) as exc:
+            http_status = _http_status(exc) or http_status
+            raise _ollama_http_error(exc) from exc
+
+        # Enforce the same exactly-one-call contract as the non-streaming path.
+        _ollama_math_plan(req.input, {"message": {"tool_calls": native_calls}}, runtime.registry)
+        provider_call = stream_fields(_provider_trace_item(OLLAMA_MODEL, http_status, started, final_chunk))
+        runtime.api_metrics.ollama_usage(provider_call, stream=True)
+        # Appended before the tool result is awaited, so a run that fails there still journals it.
+        provider_trace.append(provider_call)
+        assert execution is not None
+        result = await execution
+        finished = True
+    except HTTPException as exc:
         provider_trace.append(
-            {
-                "type": "provider_call",
-                "provider": "ollama",
-                "configured_model": "qwen3.5:9b-q4_K_M",
-                "returned_model": returned_model,
-                "ok": True,
-                "http_status": response.status_code,
-                "ms": int((time.perf_counter() - started) * 1000),
-                **_ollama_token_usage(payload),
-                "provider_billed_cost_usd": 0.0,
-                "cost_basis": "local-unbilled",
-            }
+            stream_fields(_provider_error_item(exc, returned_model, http_status, started, final_chunk))
         )
+        raise
+    finally:
+        if execution is not None and not finished:
+            execution.cancel()
+    return result
+
+
+def _journal_error(exc: HTTPException) -> dict[str, Any]:
+    """Journal form of a failed request: the detail code plus the status it was answered with."""
+    return {"code": exc.detail["code"], "status": exc.status_code}
+
 
-    result = await executor.execute(plan)
+def _traced(req: AgentRunRequest, runtime: AgentRuntime) -> bool:
+    # The run journal keeps every run's trace, not only debug ones.
+    return req.debug or runtime.journal.recording
 
+
+async def _ollama_stream_events(
+    req: AgentRunRequest, runtime: AgentRuntime, deadline: float, provider_trace: list[dict[str, Any]]
+) -> AsyncIterator[dict[str, Any]]:
+    """Executor events of a streamed Ollama run, in the shape Executor.execute_stream yields them."""
+    events: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue()
+    task = asyncio.create_task(
+        _run_with_ollama_stream(req, runtime, deadline, provider_trace, on_event=events.put_nowait)
+    )
+    task.add_done_callback(lambda _: events.put_nowait(None))
+    try:
+        while (event := await events.get()) is not None:
+            yield event
+        result = task.result()
+        yield {"type": "final", "output": result.output, "trace": result.trace}
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+def _plan_call_count(plan: Plan) -> int:
+    count = 0
+    for step in plan.steps:
+        if step.kind == "tool_call":
+            count += 1
+        elif step.kind == "parallel_tool_calls" and step.parallel_calls:
+            count += len(step.parallel_calls)
+        elif step.kind == "tool_graph" and step.graph_calls:
+            count += len(step.graph_calls)
+    return count
+
+
+def _sse(event: str, data: Any) -> bytes:
+    return b"event: %s\ndata: %s\n\n" % (event.encode("utf-8"), dumps(data))
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # Weak comparison, as RFC 9110 prescribes for If-None-Match.
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+@router.get("/tools/schemas")
+def tool_schemas(request: Request, runtime: AgentRuntime = Depends(get_runtime)) -> Response:
+    """Serialized once per registry revision; clients polling with If-None-Match get an empty 304."""
+    headers = {"ETag": runtime.tool_schemas_etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), runtime.tool_schemas_etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=runtime.tool_schemas_bytes, media_type="application/json", headers=headers)
+
+@metrics_router.get("/metrics")
+def metrics(runtime: AgentRuntime = Depends(get_runtime)) -> Response:
+    """Prometheus text exposition of the runtime's metrics registry."""
+    return Response(content=runtime.metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@router.get("/runtime/stats")
+def runtime_stats(runtime: AgentRuntime = Depends(get_runtime)) -> dict:
+    return runtime.stats()
+
+def _journal(runtime: AgentRuntime):
+    if not runtime.journal.recording:
+        raise HTTPException(status_code=404, detail={"code": "journal_disabled"})
+    return runtime.journal
+
+@router.get("/runtime/journal/calls/{call_id}")
+async def journal_call(call_id: str, limit: int = 20, runtime: AgentRuntime = Depends(get_runtime)) -> Response:
+    """Journaled runs that made call_id, newest first."""
+    runs = await asyncio.to_thread(_journal(runtime).runs_for_call, call_id, max(1, min(limit, 1000)))
+    if not runs:
+        raise HTTPException(status_code=404, detail={"code": "not_found"})
+    return FastJSONResponse({"runs": runs})
+
+@router.get("/runtime/journal/runs")
+async def journal_runs(
+    since: float | None = None,
+    until: float | None = None,
+    limit: int = 100,
+    runtime: AgentRuntime = Depends(get_runtime),
+) -> Response:
+    """Journaled runs recorded between since and until (Unix seconds), oldest first."""
+    runs = await asyncio.to_thread(_journal(runtime).between, since, until, max(1, min(limit, 1000)))
+    return FastJSONResponse({"runs": runs})
+
+@router.post("/agent/run", response_model=AgentRunResponse)
+async def run_agent_endpoint(
+    req: AgentRunRequest,
+    request: Request,
+    runtime: AgentRuntime = Depends(get_runtime),
+) -> Response:
+    # response_model documents the shape; the response itself is encoded directly.
+    profiler = runtime.profiler
+    profile = profiler.start(request.headers.get(profiler.config.header)) if profiler.enabled else None
+    if profile is None:
+        result = await run_agent(req, runtime=runtime)
+        return FastJSONResponse({"output": result.output, "trace": result.trace})
+
+    try:
+        result = await run_agent(req, runtime=runtime)
+    finally:
+        summary = profiler.finish(profile)
     if req.debug:
-        return AgentRunResponse(output=result.output, trace=provider_trace + result.trace)
+        return FastJSONResponse({"output": result.output, "trace": [*(result.trace or []), summary]})
+    await asyncio.to_thread(profiler.save, summary)
+    return FastJSONResponse({"output": result.output, "trace": result.trace})
+
+
+async def run_agent(req: AgentRunRequest, runtime: AgentRuntime) -> AgentRunResponse:
+    """Plan and execute one request. The response is built from values we produced, so unvalidated."""
+    deadline = _deadline(req.deadline_ms, runtime)
+    provider_trace: list[dict[str, Any]] = []
+    trace = _traced(req, runtime)
+    try:
+        if req.planner == "rules":
+            plan = _rules_plan(req.input, runtime)
+            result = await runtime.executor.execute(plan, runtime.executor.new_run(deadline=deadline, trace=trace))
+        elif req.ollama_stream:
+            result = await _run_with_ollama_stream(req, runtime, deadline, provider_trace)
+        else:
+            plan = await _plan_with_ollama(req, runtime, deadline, provider_trace)
+            result = await runtime.executor.execute(plan, runtime.executor.new_run(deadline=deadline, trace=trace))
+    except ToolError as e:
+        runtime.journal.record(req.input, req.planner, provider_trace, error={"code": e.code, "message": str(e)})
+        raise
+    except HTTPException as e:
+        runtime.journal.record(req.input, req.planner, provider_trace, error=_journal_error(e))
+        raise
+    if runtime.journal.recording:
+        runtime.journal.record(req.input, req.planner, provider_trace + result.events, output=result.output)
+
+    if req.debug:
+        return AgentRunResponse.model_construct(output=result.output, trace=provider_trace + result.trace)
+
+    return AgentRunResponse.model_construct(output=result.output, trace=None)
+
+@router.post("/agent/run/stream")
+async def run_agent_stream(req: AgentRunRequest, runtime: AgentRuntime = Depends(get_runtime)) -> StreamingResponse:
+    """
+    Server-sent events variant of /agent/run. Debug requests receive every executor event;
+    others only see progress counts and the final output, keeping tools invisible.
+    Disconnecting cancels the tool calls still in flight. With ollama_stream the math call is
+    dispatched as soon as it appears in the completion; a provider failure after the response
+    has started arrives as an "error" event.
+    """
+    deadline = _deadline(req.deadline_ms, runtime)
+    provider_trace: list[dict[str, Any]] = []
+    if req.planner == "rules":
+        plan = _rules_plan(req.input, runtime)
+    elif req.ollama_stream:
+        plan = None
+    else:
+        try:
+            plan = await _plan_with_ollama(req, runtime, deadline, provider_trace)
+        except HTTPException as e:
+            runtime.journal.record(req.input, req.planner, provider_trace, error=_journal_error(e))
+            raise
+    # A streamed Ollama plan is exactly one math call.
+    total = 1 if plan is None else _plan_call_count(plan)
+
+    async def events():
+        completed = 0
+        sent = 0
+        try:
+            if plan is None:
+                stream = _ollama_stream_events(req, runtime, deadline, provider_trace)
+            else:
+                stream = runtime.executor.execute_stream(
+                    plan, runtime.executor.new_run(deadline=deadline, trace=_traced(req, runtime))
+                )
+            async for event in stream:
+                kind = event["type"]
+                if req.debug:
+                    # Provider items as soon as they exist: up front when planned, at the end of a stream.
+                    for item in provider_trace[sent:]:
+                        yield _sse(item["type"], item)
+                    sent = len(provider_trace)
+                if kind == "final":
+                    runtime.journal.record(req.input, req.planner, provider_trace + event["trace"], output=event["output"])
+                    trace = provider_trace + event["trace"] if req.debug else None
+                    yield _sse("final", {"output": event["output"], "trace": trace})
+                elif req.debug:
+                    yield _sse(kind, event)
+                elif kind == "tool_call":
+                    completed += 1
+                    yield _sse("progress", {"completed": completed, "total": total})
+        except ToolError as e:
+            runtime.journal.record(req.input, req.planner, provider_trace, error={"code": e.code, "message": str(e)})
+            yield _sse("error", {"code": e.code, "message": str(e)})
+        except HTTPException as e:
+            runtime.journal.record(req.input, req.planner, provider_trace, error=_journal_error(e))
+            yield _sse("error", e.detail)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.post("/agent/run_batch")
+async def run_agent_batch(req: AgentBatchRequest, runtime: AgentRuntime = Depends(get_runtime)) -> StreamingResponse:
+    """Stream one NDJSON line per input ({"index", "output"} or {"index", "error"}) as each completes."""
+    items = run_batch(
+        runtime,
+        req.inputs,
+        max_concurrency=req.max_concurrency,
+        debug=req.debug,
+        deadline=_deadline(req.deadline_ms, runtime),
+    )
+
+    async def ndjson():
+        async for item in items:
+            yield dumps(item) + b"\n"
 
-    return AgentRunResponse(output=result.output, trace=None)
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
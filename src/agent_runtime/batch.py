@@ -0,0 +1,82 @@
+from __future__ import annotations
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator
+
+from agent_runtime.tools.base import ToolError
+from agent_runtime.types import ExecutionResult, Plan
+
+if TYPE_CHECKING:
+    from agent_runtime.runtime import AgentRuntime
+
+
+async def run_batch(
+    runtime: AgentRuntime,
+    inputs: list[str],
+    *,
+    max_concurrency: int,
+    debug: bool = False,
+    deadline: float | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Run many inputs through the rules planner, yielding one item per input in completion order.
+
+    Inputs are normalized the same way the planner does (strip), planned and executed once per
+    distinct normalized input, and every idempotent tool call is executed at most once for the
+    whole batch. At most max_concurrency plans execute at the same time, all bounded by the
+    same deadline (time.monotonic() seconds). A failing input yields {"index", "error"} and the
+    rest keep streaming: the response status was sent with the first line.
+    """
+    indexes: dict[str, list[int]] = {}
+    for index, text in enumerate(inputs):
+        indexes.setdefault(text.strip(), []).append(index)
+
+    plans: dict[str, Plan | Exception] = {}
+    plan_seconds = runtime.api_metrics.plan_seconds
+    for text in indexes:
+        started = time.perf_counter()
+        try:
+            plans[text] = runtime.rules_planner.plan(text)
+        except Exception as e:
+            plans[text] = e
+        plan_seconds.observe(time.perf_counter() - started, "rules")
+    shared_calls: dict[str, asyncio.Future[dict[str, Any]]] = {}
+    slots = asyncio.Semaphore(max(1, int(max_concurrency)))
+    journal = runtime.journal
+    trace = debug or journal.recording
+
+    async def execute(text: str) -> tuple[str, ExecutionResult | None, dict[str, str] | None]:
+        async with slots:
+            run = runtime.executor.new_run(shared_calls=shared_calls, deadline=deadline, trace=trace)
+            try:
+                plan = plans[text]
+                if isinstance(plan, Exception):
+                    raise plan
+                result = await runtime.executor.execute(plan, run)
+            except Exception as e:
+                code = e.code if isinstance(e, ToolError) else "exception"
+                error = {"code": code, "message": str(e)}
+                journal.record(text, "rules", [], error=error)
+                return text, None, error
+            # Journaled once per distinct input, like the execution itself.
+            if journal.recording:
+                journal.record(text, "rules", result.events, output=result.output)
+            return text, result, None
+
+    tasks = [asyncio.create_task(execute(text)) for text in plans]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            text, result, error = await next_done
+            for index in indexes[text]:
+                if result is None:
+                    yield {"index": index, "error": error}
+                elif debug:
+                    yield {"index": index, "output": result.output, "trace": result.trace}
+                else:
+                    yield {"index": index, "output": result.output}
+    finally:
+        for task in tasks:
+            task.cancel()
+        for outcome in shared_calls.values():
+            if outcome.done() and not outcome.cancelled():
+                outcome.exception()  # retrieved: failures were already reported per item
@@ -0,0 +1,93 @@
+from __future__ import annotations
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from agent_runtime.tools.base import Tool
+
+
+class _Compartment:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.slots = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.waited = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    async def acquire(self) -> float:
+        if self.slots.locked():
+            self.waited += 1
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        waited_ms = (time.perf_counter() - started) * 1000
+        self.wait_ms_total += waited_ms
+        self.wait_ms_max = max(self.wait_ms_max, waited_ms)
+        self.in_flight += 1
+        return waited_ms
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self.slots.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "waited": self.waited,
+            "wait_ms_total": round(self.wait_ms_total, 3),
+            "wait_ms_max": round(self.wait_ms_max, 3),
+        }
+
+
+class Bulkheads:
+    """
+    Concurrency isolation for tool calls across every run in the process.
+    Each tool gets its own compartment (limit from RuntimeConfig.tool_concurrency, else the
+    tool's max_concurrency; unlimited if neither is set), and all calls share a global
+    in-flight cap. The tool slot is taken first so callers queued behind a saturated tool
+    never hold global slots that other tools could use.
+    """
+
+    def __init__(self, *, max_in_flight: int | None = None, tool_limits: dict[str, int] | None = None):
+        self._global = _Compartment(max_in_flight) if max_in_flight else None
+        self._tool_limits = dict(tool_limits or {})
+        self._tools: dict[str, _Compartment | None] = {}
+
+    def _compartment(self, tool: Tool) -> _Compartment | None:
+        if tool.name not in self._tools:
+            limit = self._tool_limits.get(tool.name) or tool.max_concurrency
+            self._tools[tool.name] = _Compartment(limit) if limit else None
+        return self._tools[tool.name]
+
+    @asynccontextmanager
+    async def slot(self, tool: Tool) -> AsyncIterator[float]:
+        """Hold one slot for tool (and one global slot); yields the queue wait in ms."""
+        compartment = self._compartment(tool)
+        waited_ms = 0.0
+        if compartment is not None:
+            waited_ms += await compartment.acquire()
+        try:
+            if self._global is not None:
+                waited_ms += await self._global.acquire()
+            try:
+                yield waited_ms
+            finally:
+                if self._global is not None:
+                    self._global.release()
+        finally:
+            if compartment is not None:
+                compartment.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "global": self._global.stats() if self._global is not None else None,
+            "tools": {name: c.stats() for name, c in self._tools.items() if c is not None},
+        }
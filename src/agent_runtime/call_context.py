@@ -0,0 +1,88 @@
+from __future__ import annotations
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Any, Callable
+
+# Ambient per-run values that tools can read without changing the Tool.run signature.
+# Executor.execute sets them for the duration of a run; asyncio tasks inherit them.
+
+_deadline: ContextVar[float | Callable[[], float | None] | None] = ContextVar("agent_runtime_deadline", default=None)
+
+
+def set_deadline(deadline: float | Callable[[], float | None] | None):
+    """
+    Set the run deadline (time.monotonic() seconds), or a callable returning it for deadlines
+    that move (a single-flight call follows its waiters'). Returns a token for reset_deadline.
+    """
+    return _deadline.set(deadline)
+
+
+def reset_deadline(token) -> None:
+    _deadline.reset(token)
+
+
+def remaining_s() -> float | None:
+    """Seconds left before the current run's deadline (may be negative), or None when unbounded."""
+    deadline = current_deadline()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def current_deadline() -> float | None:
+    """The current run's deadline (time.monotonic() seconds), or None when unbounded."""
+    deadline = _deadline.get()
+    return deadline() if callable(deadline) else deadline
+
+
+_call_notes: ContextVar[dict[str, Any] | None] = ContextVar("agent_runtime_call_notes", default=None)
+
+
+def set_call_notes(notes: dict[str, Any] | None):
+    """Executor-side: route annotate_call() into this call's trace item. Returns a reset token."""
+    return _call_notes.set(notes)
+
+
+def reset_call_notes(token) -> None:
+    _call_notes.reset(token)
+
+
+def annotate_call(**fields: Any) -> None:
+    """Tool-side: add fields to the current tool_call trace item. No-op outside a traced call."""
+    notes = _call_notes.get()
+    if notes is not None:
+        notes.update(fields)
+
+
+def append_call_note(key: str, value: Any) -> None:
+    """Tool-side: append value to a list field on the current tool_call trace item."""
+    notes = _call_notes.get()
+    if notes is not None:
+        notes.setdefault(key, []).append(value)
+
+
+# Task -> (tool, call_id) of the tool invocation that task is executing. Plain dict rather than a
+# ContextVar because the loop monitor reads it from its watchdog thread while the loop is stuck.
+_active_calls: dict[Any, tuple[str, str]] = {}
+
+
+def enter_call(tool: str, call_id: str):
+    """Executor-side: mark the current task as running tool/call_id. Returns a token for exit_call."""
+    task = asyncio.current_task()
+    previous = _active_calls.get(task)
+    _active_calls[task] = (tool, call_id)
+    return task, previous
+
+
+def exit_call(token) -> None:
+    task, previous = token
+    if previous is None:
+        _active_calls.pop(task, None)
+    else:
+        _active_calls[task] = previous
+
+
+def active_call(task: Any) -> tuple[str, str] | None:
+    """(tool, call_id) the task is executing, if any. Safe to call from another thread."""
+    return _active_calls.get(task)
@@ -0,0 +1,13 @@
+from __future__ import annotations
+import json
+from typing import Any
+
+
+def canonical_json(payload: Any) -> bytes:
+    """Stable JSON encoding (sorted keys, no whitespace) used for ids and cache keys."""
+    return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def call_key(tool_name: str, arguments: dict[str, Any]) -> str:
+    """Identity of a tool invocation: same tool + same canonical arguments => same key."""
+    return canonical_json({"tool": tool_name, "arguments": arguments}).decode("utf-8")
@@ -1,133 +1,539 @@
 from __future__ import annotations
 import asyncio
 import time
-from typing import Any
+from collections import deque
+from dataclasses import replace
+from typing import Any, AsyncIterator, Awaitable
 
-from agent_runtime.types import Plan, PlanStep, ToolCall, ExecutionResult
+from agent_runtime.bulkhead import Bulkheads
+from agent_runtime.call_context import (
+    current_deadline,
+    enter_call,
+    exit_call,
+    reset_call_notes,
+    reset_deadline,
+    set_call_notes,
+    set_deadline,
+)
+from agent_runtime.canonical import call_key, canonical_json
+from agent_runtime.metrics import ToolCallMetrics
+from agent_runtime.plan_graph import graph_dependencies, resolve_arguments
+from agent_runtime.pools import ExecutionPools
+from agent_runtime.single_flight import Flight, SingleFlight
+from agent_runtime.tool_cache import ToolResultCache
+from agent_runtime.trace_recorder import NULL_RECORDER, DeadlineExceededEvent, PlanEvent, ToolCallEvent, TraceEvent, TraceRecorder
+from agent_runtime.types import Plan, ToolCall, ExecutionResult, RunContext
 from agent_runtime.tools.registry import ToolRegistry
-from agent_runtime.tools.base import ToolError
+from agent_runtime.tools.base import Tool, ToolError
 
 
-# Trace event schema
+# Trace event schema (trace_types.py)
 # Every trace item includes a "type" discriminator, currently:
 # - {"type": "plan", ...}
 # - {"type": "tool_call", ...}
+# - {"type": "deadline_exceeded", ...}
+# Runs record compact events (trace_recorder.py); ExecutionResult.trace builds the dicts.
+# execute_stream() additionally yields {"type": "tool_call_start", ...} and a closing
+# {"type": "final", "output": ..., "trace": [...]} whose trace matches execute().
+
+# Templates the "multi" final template reuses for tools that have one.
+_SINGLE_TOOL_TEMPLATES = {"math": "math", "weather": "weather", "web_search": "search_summary"}
+
 
 class Executor:
-    def __init__(self, registry: ToolRegistry, *, max_tool_calls: int = 10):
+    """
+    Stateless across runs: one instance may execute many plans concurrently.
+    Per-run state (the call budget) lives in the RunContext passed to execute().
+    """
+
+    def __init__(
+        self,
+        registry: ToolRegistry,
+        *,
+        max_tool_calls: int = 10,
+        cache: ToolResultCache | None = None,
+        single_flight: SingleFlight | None = None,
+        max_step_concurrency: int | None = None,
+        bulkheads: Bulkheads | None = None,
+        pools: ExecutionPools | None = None,
+        metrics: ToolCallMetrics | None = None,
+    ):
         self.registry = registry
         self.max_tool_calls = int(max_tool_calls)
-        self._call_count = 0
+        self.cache = cache
+        self.single_flight = single_flight
+        # Cap on calls in flight within one parallel/graph step; None means no cap.
+        self.max_step_concurrency = max_step_concurrency
+        self.bulkheads = bulkheads
+        # Without pools, thread/process tools fall back to awaiting run() on the loop.
+        self.pools = pools
+        self.metrics = metrics
 
-    async def execute(self, plan: Plan) -> ExecutionResult:
-        ctx: dict[str, Any] = {"user_input": plan.user_input, "tool_results": []}
+    def new_run(
+        self,
+        *,
+        shared_calls: dict[str, asyncio.Future[dict[str, Any]]] | None = None,
+        deadline: float | None = None,
+        trace: bool = True,
+    ) -> RunContext:
+        """With trace=False the run records nothing and ExecutionResult.trace comes back empty."""
+        return RunContext(
+            max_tool_calls=self.max_tool_calls,
+            shared_calls=shared_calls,
+            deadline=deadline,
+            recorder=TraceRecorder() if trace else NULL_RECORDER,
+        )
 
-        trace: list[dict] = [{
-            "type": "plan",
-            "user_input": plan.user_input,
-            "steps": [self._serialize_step(s) for s in plan.steps],
-        }]
+    async def execute(self, plan: Plan, run: RunContext | None = None) -> ExecutionResult:
+        run = run or self.new_run()
+        trace = run.recorder.events
+        if self._tracing(run):
+            self._record(run, trace, PlanEvent(plan))
 
+        token = set_deadline(run.deadline)
+        try:
+            output = await self._execute_steps(plan, run, trace)
+        finally:
+            reset_deadline(token)
+
+        if run.deadline_exceeded and self._tracing(run):
+            assert run.deadline is not None
+            overrun_ms = max(0, int((time.monotonic() - run.deadline) * 1000))
+            self._record(run, trace, DeadlineExceededEvent(list(run.deadline_exceeded), overrun_ms))
+        return ExecutionResult(output=output, events=trace)
+
+    async def _execute_steps(self, plan: Plan, run: RunContext, trace: list[TraceEvent]) -> str:
+        ctx: dict[str, Any] = {"user_input": plan.user_input, "tool_results": []}
         for step in plan.steps:
             match step.kind:
                 case "tool_call":
                     assert step.tool_call is not None
-                    out = await self._run_one(step.tool_call, trace)
+                    out = await self._run_one(step.tool_call, run, trace)
                     ctx["tool_results"].append({"call": step.tool_call, "result": out})
 
-                case "parallel_tool_calls":
-                    assert step.parallel_calls is not None
-                    outs = await self._run_parallel(step.parallel_calls)
+                case "parallel_tool_calls" | "tool_graph":
+                    if step.kind == "parallel_tool_calls":
+                        calls = step.parallel_calls
+                        assert calls is not None
+                        deps = {c.call_id: () for c in calls}
+                    else:
+                        calls = step.graph_calls
+                        assert calls is not None
+                        try:
+                            deps = graph_dependencies(calls)
+                        except ValueError:
+                            return "Invalid plan step."
+                    if step.kind == "parallel_tool_calls":
+                        outs = await self._run_parallel(calls, run)
+                    else:
+                        outs = await self._run_graph(calls, deps, run)
                     # Merge results in the same order as the calls list (deterministic)
-                    for call in step.parallel_calls:
+                    for call in calls:
                         ctx["tool_results"].append({"call": call, "result": outs["results"].get(call.call_id, {})})
                     # Merge traces in call order (deterministic)
-                    for call in step.parallel_calls:
-                        trace.extend(outs["traces"].get(call.call_id, []))
+                    for call in calls:
+                        run.recorder.merge(trace, outs["traces"].get(call.call_id, []))
 
                 case "final":
-                    output = self._render_final(step.final_template or "default", ctx)
-                    return ExecutionResult(output=output, trace=trace)
+                    return self._render_final(step.final_template or "default", ctx)
 
                 case _:
-                    return ExecutionResult(output="Invalid plan step.", trace=trace)
-
-        return ExecutionResult(output=self._render_final("default", ctx), trace=trace)
-
-    def _serialize_step(self, step: PlanStep) -> dict[str, Any]:
-        if step.kind == "tool_call" and step.tool_call:
-            return {
-                "kind": "tool_call",
-                "tool": step.tool_call.tool_name,
-                "call_id": step.tool_call.call_id,
-                "arguments": step.tool_call.arguments,
-            }
-        if step.kind == "parallel_tool_calls" and step.parallel_calls:
-            return {
-                "kind": "parallel_tool_calls",
-                "calls": [
-                    {"tool": c.tool_name, "call_id": c.call_id, "arguments": c.arguments}
-                    for c in step.parallel_calls
-                ],
-            }
-        if step.kind == "final":
-            return {"kind": "final", "template": step.final_template}
-        return {"kind": step.kind}
-
-    def _bump_call_budget(self) -> None:
-        self._call_count += 1
-        if self._call_count > self.max_tool_calls:
+                    return "Invalid plan step."
+
+        return self._render_final("default", ctx)
+
+    async def execute_stream(self, plan: Plan, run: RunContext | None = None) -> AsyncIterator[dict[str, Any]]:
+        """
+        Execute plan, yielding events as they happen: the plan, each tool_call_start, each
+        tool_call (in completion order), then one final event carrying the output and the
+        same deterministically ordered trace execute() returns. Closing the generator early
+        cancels the outstanding tool calls.
+        """
+        run = run or self.new_run()
+        events: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue()
+        run.on_event = events.put_nowait
+        task = asyncio.create_task(self.execute(plan, run))
+        task.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+            result = task.result()
+            yield {"type": "final", "output": result.output, "trace": result.trace}
+        finally:
+            if not task.done():
+                task.cancel()
+
+    def _bump_call_budget(self, run: RunContext) -> None:
+        run.call_count += 1
+        if run.call_count > run.max_tool_calls:
+            if self.metrics is not None:
+                self.metrics.budget_exhausted.inc()
             raise ToolError("Max tool calls exceeded", code="rate_limit")
 
-    async def _run_one(self, call: ToolCall, trace: list[dict]) -> dict[str, Any]:
-        self._bump_call_budget()
+    async def _run_one(self, call: ToolCall, run: RunContext, trace: list[TraceEvent]) -> dict[str, Any]:
+        self._bump_call_budget(run)
         tool = self.registry.get(call.tool_name)
-        started = time.time()
+        started = time.perf_counter()
+        if run.on_event is not None:
+            run.on_event({"type": "tool_call_start", "call_id": call.call_id, "tool": call.tool_name})
+        marks: dict[str, Any] = {}
         try:
-            result = await tool.run(call.arguments)
-            trace.append({
-                "type": "tool_call",
-                "call_id": call.call_id,
-                "tool": call.tool_name,
-                "ok": True,
-                "ms": int((time.time() - started) * 1000),
-            })
-            return result
+            result = await self._within_deadline(self._resolve(tool, call, run, marks), run)
         except ToolError as e:
-            trace.append({
-                "type": "tool_call",
-                "call_id": call.call_id,
-                "tool": call.tool_name,
-                "ok": False,
-                "error": {"code": e.code, "message": str(e)},
-                "ms": int((time.time() - started) * 1000),
-            })
-            return {"error": {"code": e.code, "message": str(e)}}
+            if e.code == "deadline_exceeded":
+                run.deadline_exceeded.append(call.call_id)
+            error = {"code": e.code, "message": str(e)}
+            self._record_call(run, trace, call, started, error, marks)
+            return {"error": error}
         except Exception as e:
-            trace.append({
-                "type": "tool_call",
-                "call_id": call.call_id,
-                "tool": call.tool_name,
-                "ok": False,
-                "error": {"code": "exception", "message": str(e)},
-                "ms": int((time.time() - started) * 1000),
-            })
-            return {"error": {"code": "exception", "message": str(e)}}
-
-    async def _run_parallel(self, calls: list[ToolCall]) -> dict[str, Any]:
-        async def run_with_local_trace(c: ToolCall):
-            local_trace: list[dict] = []
-            result = await self._run_one(c, local_trace)
-            return c.call_id, result, local_trace
-
-        tasks = [run_with_local_trace(c) for c in calls]
-        outputs = await asyncio.gather(*tasks)
+            error = {"code": "exception", "message": str(e)}
+            self._record_call(run, trace, call, started, error, marks)
+            return {"error": error}
+
+        self._record_call(run, trace, call, started, None, marks)
+        return result
+
+    @staticmethod
+    async def _within_deadline(aw: Awaitable[Any], run: RunContext) -> Any:
+        """Await aw, cut off at the run's deadline with ToolError code deadline_exceeded."""
+        if run.deadline is None:
+            return await aw
+        remaining = run.deadline - time.monotonic()
+        if remaining <= 0:
+            if asyncio.iscoroutine(aw):
+                aw.close()
+            raise ToolError("Deadline exceeded before the call started", code="deadline_exceeded")
+        try:
+            return await asyncio.wait_for(aw, remaining)
+        except asyncio.TimeoutError:
+            if time.monotonic() < run.deadline:
+                raise
+            raise ToolError("Deadline exceeded", code="deadline_exceeded") from None
+
+    async def _invoke(
+        self,
+        tool: Tool,
+        arguments: Any,
+        marks: dict[str, Any],
+        call_id: str,
+        *,
+        many: bool = False,
+    ) -> Any:
+        """
+        Run the tool itself inside its bulkhead, recording how long the call queued for a slot.
+        With many=True, arguments is a list and the tool's run_many gets it in one invocation.
+        """
+        # Fields the tool passes to annotate_call() land in this call's trace item.
+        token = set_call_notes(marks)
+        # Lets the loop monitor name the call when a tool blocks the event loop.
+        active = enter_call(tool.name, call_id)
+        try:
+            if self.bulkheads is None:
+                return await self._dispatch(tool, arguments, marks, many)
+            async with self.bulkheads.slot(tool) as waited_ms:
+                marks["queue_ms"] = round(waited_ms, 3)
+                return await self._dispatch(tool, arguments, marks, many)
+        finally:
+            exit_call(active)
+            reset_call_notes(token)
+
+    async def _dispatch(self, tool: Tool, arguments: Any, marks: dict[str, Any], many: bool) -> Any:
+        if self.metrics is None:
+            return await self._execute_tool(tool, arguments, marks, many)
+        in_flight = self.metrics.in_flight
+        in_flight.inc(tool.name)
+        try:
+            return await self._execute_tool(tool, arguments, marks, many)
+        finally:
+            in_flight.dec(tool.name)
+
+    async def _execute_tool(self, tool: Tool, arguments: Any, marks: dict[str, Any], many: bool) -> Any:
+        if tool.execution == "async" or self.pools is None:
+            return await (tool.run_many(arguments) if many else tool.run(arguments))
+        return await self.pools.run(tool, arguments, marks, fn=tool.run_many_sync if many else tool.run_sync)
+
+    @staticmethod
+    def _tracing(run: RunContext) -> bool:
+        """Whether anyone will see trace events; if not, none are built."""
+        return run.recorder.enabled or run.on_event is not None
+
+    @staticmethod
+    def _record(run: RunContext, trace: list[TraceEvent], event: TraceEvent) -> None:
+        run.recorder.add(trace, event)
+        if run.on_event is not None:
+            run.on_event(event.as_dict())
+
+    def _record_call(
+        self,
+        run: RunContext,
+        trace: list[TraceEvent],
+        call: ToolCall,
+        started: float,
+        error: dict[str, str] | None = None,
+        marks: dict[str, Any] | None = None,
+    ) -> None:
+        """Every finished call passes here once: metrics always, the trace when someone is tracing."""
+        elapsed = time.perf_counter() - started
+        if self.metrics is not None:
+            self.metrics.finished(call.tool_name, elapsed, None if error is None else error["code"])
+        if not self._tracing(run):
+            return
+        ms = int(elapsed * 1000)
+        # Copied: a coalesced call's marks may still be written after this call has given up.
+        self._record(run, trace, ToolCallEvent(call, error, ms, dict(marks) if marks else None))
+
+    async def _resolve(self, tool: Tool, call: ToolCall, run: RunContext, marks: dict[str, Any]) -> dict[str, Any]:
+        """Batch memo first: an idempotent call already started elsewhere in the batch is awaited, not re-run."""
+        shared = run.shared_calls if tool.idempotent else None
+        if shared is None:
+            return await self._fetch(tool, call, marks)
+
+        key = call_key(call.tool_name, call.arguments)
+        outcome = shared.get(key)
+        if outcome is not None:
+            marks["deduplicated"] = True
+            return await asyncio.shield(outcome)
+
+        outcome = shared[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await self._fetch(tool, call, marks, key)
+        except Exception as e:
+            outcome.set_exception(e)
+            raise
+        except BaseException:
+            # Cancelled (e.g. by this run's deadline): later identical calls get an error, not our cancellation.
+            outcome.set_exception(ToolError("Shared call was cancelled", code="cancelled"))
+            raise
+        outcome.set_result(result)
+        return result
+
+    async def _fetch(self, tool: Tool, call: ToolCall, marks: dict[str, Any], key: str | None = None) -> dict[str, Any]:
+        """Result cache, then single-flight, then the tool itself. Records which one answered in marks."""
+        policy = tool.cache_policy if self.cache is not None else None
+        coalesce = self.single_flight is not None and tool.idempotent
+        if key is None and (policy is not None or coalesce):
+            key = call_key(call.tool_name, call.arguments)
+
+        if policy is not None:
+            hit = self.cache.get(call.tool_name, key)
+            if hit is not None:
+                marks["cached"] = True
+                return hit
+
+        joined = False
+        if coalesce:
+            flight, joined = self.single_flight.join(
+                key, lambda: self._invoke(tool, call.arguments, marks, call.call_id)
+            )
+            if joined:
+                marks["coalesced"] = True
+            # The shared invocation runs under the latest waiter's deadline, not this caller's.
+            result = await flight.wait(current_deadline())
+        else:
+            result = await self._invoke(tool, call.arguments, marks, call.call_id)
+
+        if policy is not None and not joined:
+            self.cache.put(call.tool_name, policy, key, result)
+        return result
+
+    async def _run_parallel(self, calls: list[ToolCall], run: RunContext) -> dict[str, Any]:
+        """
+        A parallel step. Two or more calls to one batchable tool go to a single run_many()
+        invocation; everything else goes through the scheduler. Either way results and traces
+        come back keyed by call_id.
+        """
+        groups: dict[str, list[ToolCall]] = {}
+        for call in calls:
+            tool = self.registry.tools.get(call.tool_name)
+            if tool is not None and tool.batchable:
+                groups.setdefault(call.tool_name, []).append(call)
+        groups = {name: group for name, group in groups.items() if len(group) > 1}
+        if not groups:
+            return await self._run_graph(calls, {c.call_id: () for c in calls}, run)
+
+        grouped = {c.call_id for group in groups.values() for c in group}
+        rest = [c for c in calls if c.call_id not in grouped]
+        jobs = [asyncio.ensure_future(self._run_many(self.registry.get(name), group, run)) for name, group in groups.items()]
+        if rest:
+            jobs.append(asyncio.ensure_future(self._run_graph(rest, {c.call_id: () for c in rest}, run)))
+        try:
+            outs = await asyncio.gather(*jobs)
+        except BaseException:
+            # e.g. the call budget ran out in one group: the others stop too, as in _run_graph.
+            for job in jobs:
+                job.cancel()
+            await asyncio.gather(*jobs, return_exceptions=True)
+            raise
+        merged: dict[str, Any] = {"results": {}, "traces": {}}
+        for out in outs:
+            merged["results"].update(out["results"])
+            merged["traces"].update(out["traces"])
+        return merged
+
+    async def _run_many(self, tool: Tool, calls: list[ToolCall], run: RunContext) -> dict[str, Any]:
+        """
+        Same-tool calls of one step as one run_many() invocation. The budget, cache, batch memo
+        and single-flight apply per call as in _run_one; identical arguments are sent once. Every
+        call still gets its own trace item, marked with the size of the invocation it rode in.
+        """
+        results: dict[str, dict[str, Any]] = {}
+        traces: dict[str, list[TraceEvent]] = {c.call_id: run.recorder.branch() for c in calls}
+        started = time.perf_counter()
+
+        def record(call: ToolCall, marks: dict[str, Any], outcome: Any) -> None:
+            if isinstance(outcome, BaseException):
+                error = self._error_of(outcome)
+                if error["code"] == "deadline_exceeded":
+                    run.deadline_exceeded.append(call.call_id)
+                self._record_call(run, traces[call.call_id], call, started, error, marks)
+                results[call.call_id] = {"error": error}
+            else:
+                self._record_call(run, traces[call.call_id], call, started, None, marks)
+                results[call.call_id] = outcome
+
+        policy = tool.cache_policy if self.cache is not None else None
+        shared = run.shared_calls if tool.idempotent else None
+        coalesce = self.single_flight is not None and tool.idempotent
+        batch: dict[str, list[tuple[ToolCall, dict[str, Any]]]] = {}
+        joins: list[tuple[ToolCall, dict[str, Any], asyncio.Future[dict[str, Any]] | Flight]] = []
+        for call in calls:
+            # Raises like _run_one does: an exhausted budget ends the run whether or not calls were batched.
+            self._bump_call_budget(run)
+            if run.on_event is not None:
+                run.on_event({"type": "tool_call_start", "call_id": call.call_id, "tool": call.tool_name})
+            key = call_key(call.tool_name, call.arguments)
+            if policy is not None:
+                hit = self.cache.get(call.tool_name, key)
+                if hit is not None:
+                    record(call, {"cached": True}, hit)
+                    continue
+            if key in batch:
+                batch[key].append((call, {"deduplicated": True}))
+            elif shared is not None and key in shared:
+                joins.append((call, {"deduplicated": True}, shared[key]))
+            elif coalesce and (inflight := self.single_flight.follow(key)) is not None:
+                joins.append((call, {"coalesced": True}, inflight))
+            else:
+                batch[key] = [(call, {})]
+
+        keys = list(batch)
+        owned = {}
+        if shared is not None or coalesce:
+            loop = asyncio.get_running_loop()
+            owned = {key: loop.create_future() for key in keys}
+            if shared is not None:
+                shared.update(owned)
+            if coalesce:
+                # Concurrent runs making the same call join this batch's result.
+                for key, outcome in owned.items():
+                    self.single_flight.lead(key, outcome)
+
+        async def joined(call: ToolCall, marks: dict[str, Any], outcome: asyncio.Future[dict[str, Any]] | Flight) -> None:
+            waited = outcome.wait(run.deadline) if isinstance(outcome, Flight) else asyncio.shield(outcome)
+            try:
+                record(call, marks, await self._within_deadline(waited, run))
+            except Exception as e:
+                record(call, marks, e)
+
+        waiting = [asyncio.create_task(joined(*j)) for j in joins]
+        shared_marks: dict[str, Any] = {"batched": len(keys)}
+        try:
+            outcomes: list[Any] = []
+            if keys:
+                arguments = [batch[key][0][0].arguments for key in keys]
+                label = batch[keys[0]][0][0].call_id + (f" (+{len(keys) - 1})" if len(keys) > 1 else "")
+                # Cut at this run's deadline below, so it runs under it too; followers from
+                # other runs wait at most that long.
+                invocation = self._invoke(tool, arguments, shared_marks, label, many=True)
+                try:
+                    outcomes = list(await self._within_deadline(invocation, run))
+                    if len(outcomes) != len(keys):
+                        raise ToolError(f"run_many returned {len(outcomes)} results for {len(keys)} calls", code="bad_output")
+                except Exception as e:
+                    outcomes = [e] * len(keys)
+            for key, outcome in zip(keys, outcomes):
+                if key in owned:
+                    if isinstance(outcome, BaseException):
+                        owned[key].set_exception(outcome)
+                    else:
+                        owned[key].set_result(outcome)
+                if policy is not None and not isinstance(outcome, BaseException):
+                    self.cache.put(tool.name, policy, key, outcome)
+                for call, marks in batch[key]:
+                    record(call, {**marks, **shared_marks}, outcome)
+            if waiting:
+                await asyncio.gather(*waiting)
+        finally:
+            for outcome in owned.values():
+                if not outcome.done():
+                    outcome.set_exception(ToolError("Shared call was cancelled", code="cancelled"))
+            for task in waiting:
+                task.cancel()
+        return {"results": results, "traces": traces}
+
+    @staticmethod
+    def _error_of(exc: BaseException) -> dict[str, str]:
+        if isinstance(exc, ToolError):
+            return {"code": exc.code, "message": str(exc)}
+        return {"code": "exception", "message": str(exc)}
+
+    async def _run_graph(self, calls: list[ToolCall], deps: dict[str, tuple[str, ...]], run: RunContext) -> dict[str, Any]:
+        """
+        Ready-queue scheduler: each call starts as soon as everything it depends on has finished,
+        with at most max_step_concurrency calls in flight. Calls whose dependency failed are not
+        run and report dependency_failed. Each call records into its own local trace so the
+        caller can merge traces in declaration order regardless of completion order.
+        """
+        by_id = {c.call_id: c for c in calls}
+        waiting = {cid: set(d) for cid, d in deps.items()}
+        dependents: dict[str, list[str]] = {c.call_id: [] for c in calls}
+        for c in calls:
+            for dep in deps[c.call_id]:
+                dependents[dep].append(c.call_id)
 
         results: dict[str, dict[str, Any]] = {}
-        traces: dict[str, list[dict]] = {}
-        for call_id, result, local_trace in outputs:
-            results[call_id] = result
-            traces[call_id] = local_trace
+        traces: dict[str, list[TraceEvent]] = {c.call_id: run.recorder.branch() for c in calls}
+        ready = deque(c.call_id for c in calls if not waiting[c.call_id])
+        running: dict[asyncio.Task[dict[str, Any]], str] = {}
+        limit = self.max_step_concurrency or len(calls) or 1
+
+        def finish(cid: str, result: dict[str, Any]) -> None:
+            results[cid] = result
+            for nxt in dependents[cid]:
+                waiting[nxt].discard(cid)
+                if not waiting[nxt]:
+                    ready.append(nxt)
+
+        try:
+            while ready or running:
+                while ready and len(running) < limit:
+                    cid = ready.popleft()
+                    call = by_id[cid]
+                    failed = [d for d in deps[cid] if "error" in results[d]]
+                    if failed:
+                        error = {"code": "dependency_failed", "message": f"Dependency failed: {', '.join(failed)}"}
+                        self._record_call(run, traces[cid], call, time.perf_counter(), error)
+                        finish(cid, {"error": error})
+                        continue
+                    if deps[cid]:
+                        try:
+                            arguments = resolve_arguments(call.arguments, results)
+                        except (KeyError, IndexError, ValueError, TypeError) as e:
+                            error = {"code": "bad_reference", "message": f"Unresolvable argument reference: {e}"}
+                            self._record_call(run, traces[cid], call, time.perf_counter(), error)
+                            finish(cid, {"error": error})
+                            continue
+                        call = replace(call, arguments=arguments)
+                    task = asyncio.create_task(self._run_one(call, run, traces[cid]))
+                    running[task] = cid
+                if not running:
+                    continue
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    finish(running.pop(task), task.result())
+        finally:
+            for task in running:
+                task.cancel()
 
         return {"results": results, "traces": traces}
 
@@ -141,10 +547,15 @@ class Executor:
                     return item.get("result", {})
             return None
 
+        def timed_out(r: dict[str, Any] | None) -> bool:
+            return r is not None and r.get("error", {}).get("code") == "deadline_exceeded"
+
         if template == "math":
             r = find("math")
             if r is None:
                 return "Math tool was not called."
+            if timed_out(r):
+                return "Math result did not arrive before the deadline."
             if "error" in r:
                 return f"Math tool failed: {r['error']['message']}"
             return self._format_math(ctx["user_input"], r)
@@ -153,6 +564,8 @@ class Executor:
             r = find("weather")
             if r is None:
                 return "Weather tool was not called."
+            if timed_out(r):
+                return "Weather did not arrive before the deadline."
             if "error" in r:
                 return f"Weather tool failed: {r['error']['message']}"
             return f"Weather for {r.get('location','Unknown')}: {r.get('summary','')}".strip()
@@ -161,15 +574,22 @@ class Executor:
             wr = find("weather")
             mr = find("math")
             parts: list[str] = []
+            # Render whatever arrived; parts cut off by the deadline are left out.
+            if timed_out(wr) and timed_out(mr):
+                return "No results arrived before the deadline."
 
-            if wr is None:
+            if timed_out(wr):
+                pass
+            elif wr is None:
                 parts.append("Weather tool was not called.")
             elif "error" in wr:
                 parts.append(f"Weather tool failed: {wr['error']['message']}")
             else:
                 parts.append(f"Weather for {wr.get('location','Unknown')}: {wr.get('summary','')}".strip())
 
-            if mr is None:
+            if timed_out(mr):
+                pass
+            elif mr is None:
                 parts.append("Math tool was not called.")
             elif "error" in mr:
                 parts.append(f"Math tool failed: {mr['error']['message']}")
@@ -182,6 +602,8 @@ class Executor:
             r = find("web_search")
             if r is None:
                 return "Search tool was not called."
+            if timed_out(r):
+                return "Search results did not arrive before the deadline."
             if "error" in r:
                 return f"Search tool failed: {r['error']['message']}"
             items = r.get("results", [])
@@ -192,6 +614,23 @@ class Executor:
             snippet = top.get("snippet", "")
             return f"{title}\n{snippet}".strip()
 
+        if template == "multi":
+            # One part per call in plan order, each rendered like its single-tool template.
+            done = [item for item in results if not timed_out(item.get("result"))]
+            if results and not done:
+                return "No results arrived before the deadline."
+            parts = []
+            for item in done:
+                name = item["call"].tool_name
+                single = _SINGLE_TOOL_TEMPLATES.get(name)
+                if single is not None:
+                    parts.append(self._render_final(single, {**ctx, "tool_results": [item]}))
+                elif "error" in item["result"]:
+                    parts.append(f"{name} tool failed: {item['result']['error']['message']}")
+                else:
+                    parts.append(f"{name}: {canonical_json(item['result']).decode('utf-8')}")
+            return "\n".join([p for p in parts if p])
+
         return "Done."
 
     def _format_math(self, user_input: str, r: dict[str, Any]) -> str:
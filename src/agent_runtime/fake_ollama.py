@@ -0,0 +1,205 @@
+"""
+Local stand-in for the Ollama server, replaying the ollama_math sessions recorded under sessions/.
+
+Each session directory holds our own request.json / response.json (the debug trace carries the
+provider_call, the model's native tool call id and its arguments) and the model list from the
+preflight. From those this app serves /api/chat (plain or NDJSON streaming) and /api/tags, with
+configurable latency, token counts and chunk timing, so the ollama_math path can be exercised
+and benchmarked without a model.
+
+    python -m agent_runtime.fake_ollama --sessions sessions --port 11434 [--latency-ms 0]
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from agent_runtime.fast_json import dumps
+
+
+@dataclass(frozen=True)
+class RecordedSession:
+    name: str
+    user_input: str
+    model: str
+    # Native Ollama tool calls: {"id", "function": {"name", "arguments"}}.
+    tool_calls: list[dict[str, Any]]
+    provider_ms: int | None
+    tags: dict[str, Any] | None
+
+
+@dataclass(frozen=True)
+class FakeOllamaConfig:
+    # Delay before answering; None replays each session's recorded provider time.
+    latency_ms: float | None = 0.0
+    prompt_tokens: int = 73
+    completion_tokens: int = 19
+    # Streaming: empty content chunks sent before the tool call, and the gap between chunks.
+    # The first chunk goes out after latency_ms.
+    stream_chunks: int = 3
+    chunk_interval_ms: float = 0.0
+    # Unknown inputs get the sessions in turn; strict answers 404 instead.
+    strict: bool = False
+
+
+def _read_json(path: Path) -> Any:
+    # The recorder wrote UTF-8 with a byte order mark.
+    return json.loads(path.read_text(encoding="utf-8-sig"))
+
+
+def load_sessions(directory: str | Path) -> list[RecordedSession]:
+    """Every session under directory with a replayable provider_call and plan, sorted by name."""
+    sessions = []
+    for path in sorted(Path(directory).iterdir()):
+        request_path, response_path = path / "request.json", path / "response.json"
+        if not (request_path.is_file() and response_path.is_file()):
+            continue
+        request = _read_json(request_path)
+        trace = _read_json(response_path).get("trace") or []
+        provider = next((t for t in trace if t.get("type") == "provider_call"), None)
+        plan = next((t for t in trace if t.get("type") == "plan"), None)
+        if request.get("planner") != "ollama_math" or provider is None or plan is None:
+            continue
+        calls = []
+        for step in plan["steps"]:
+            for call in [step] if step["kind"] == "tool_call" else step.get("calls", []):
+                if "call_id" in call:
+                    calls.append({
+                        "id": call["call_id"],
+                        "function": {"name": call["tool"], "arguments": call["arguments"]},
+                    })
+        preflight = path / "ollama-model-preflight.json"
+        sessions.append(
+            RecordedSession(
+                name=path.name,
+                user_input=request["input"],
+                model=provider.get("returned_model") or provider["configured_model"],
+                tool_calls=calls,
+                provider_ms=provider.get("ms"),
+                tags=_read_json(preflight) if preflight.is_file() else None,
+            )
+        )
+    return sessions
+
+
+@dataclass
+class FakeOllamaStats:
+    chat: int = 0
+    streamed: int = 0
+    unmatched: int = 0
+    by_session: dict[str, int] = field(default_factory=dict)
+
+
+def build_app(sessions: list[RecordedSession], config: FakeOllamaConfig | None = None) -> FastAPI:
+    if not sessions:
+        raise ValueError("No replayable sessions")
+    config = config or FakeOllamaConfig()
+    by_input = {s.user_input: s for s in sessions}
+    fallback = itertools.cycle(sessions)
+    stats = FakeOllamaStats()
+    app = FastAPI(title="Fake Ollama")
+    app.state.stats = stats
+
+    def pick(body: dict[str, Any]) -> RecordedSession | None:
+        messages = body.get("messages") or []
+        content = messages[-1].get("content") if messages else None
+        session = by_input.get(content)
+        if session is None:
+            stats.unmatched += 1
+            if config.strict:
+                return None
+            session = next(fallback)
+        stats.by_session[session.name] = stats.by_session.get(session.name, 0) + 1
+        return session
+
+    def latency_s(session: RecordedSession) -> float:
+        ms = session.provider_ms if config.latency_ms is None else config.latency_ms
+        return (ms or 0) / 1000
+
+    def final(session: RecordedSession, started: float) -> dict[str, Any]:
+        elapsed_ns = int((time.perf_counter() - started) * 1e9)
+        return {
+            "model": session.model,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": elapsed_ns,
+            "prompt_eval_count": config.prompt_tokens,
+            "eval_count": config.completion_tokens,
+        }
+
+    @app.get("/api/tags")
+    async def tags() -> JSONResponse:
+        for session in sessions:
+            if session.tags is not None:
+                return JSONResponse(session.tags)
+        return JSONResponse({"models": [{"name": sessions[0].model, "model": sessions[0].model}]})
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        started = time.perf_counter()
+        body = await request.json()
+        session = pick(body)
+        if session is None:
+            return JSONResponse({"error": "no recorded session for this input"}, status_code=404)
+        stats.chat += 1
+        message = {"role": "assistant", "content": "", "tool_calls": session.tool_calls}
+
+        if not body.get("stream", True):
+            await asyncio.sleep(latency_s(session))
+            return JSONResponse({**final(session, started), "message": message})
+
+        stats.streamed += 1
+
+        async def chunks() -> AsyncIterator[bytes]:
+            await asyncio.sleep(latency_s(session))
+            gap = config.chunk_interval_ms / 1000
+            partial = {"model": session.model, "done": False}
+            for _ in range(config.stream_chunks):
+                yield dumps({**partial, "message": {"role": "assistant", "content": ""}}) + b"\n"
+                await asyncio.sleep(gap)
+            yield dumps({**partial, "message": message}) + b"\n"
+            await asyncio.sleep(gap)
+            yield dumps({**final(session, started), "message": {"role": "assistant", "content": ""}}) + b"\n"
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", default="sessions")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency-ms", default="0", help='milliseconds, or "recorded"')
+    parser.add_argument("--prompt-tokens", type=int, default=73)
+    parser.add_argument("--completion-tokens", type=int, default=19)
+    parser.add_argument("--stream-chunks", type=int, default=3)
+    parser.add_argument("--chunk-interval-ms", type=float, default=0.0)
+    parser.add_argument("--strict", action="store_true")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = FakeOllamaConfig(
+        latency_ms=None if args.latency_ms == "recorded" else float(args.latency_ms),
+        prompt_tokens=args.prompt_tokens,
+        completion_tokens=args.completion_tokens,
+        stream_chunks=args.stream_chunks,
+        chunk_interval_ms=args.chunk_interval_ms,
+        strict=args.strict,
+    )
+    uvicorn.run(build_app(load_sessions(args.sessions), config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
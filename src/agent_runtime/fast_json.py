@@ -0,0 +1,37 @@
+from __future__ import annotations
+import json
+from typing import Any
+
+from starlette.responses import Response
+
+try:  # Optional: pip install agent-runtime[fast]
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def _dumps_std(payload: Any) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(payload: Any) -> bytes:
+    """Compact UTF-8 JSON. Uses orjson when installed, the standard library otherwise."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload)
+        except TypeError:
+            # Integers beyond 64 bits and other values orjson refuses; json handles them.
+            pass
+    return _dumps_std(payload)
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response for payloads the handler built itself: encoded once with dumps(), without
+    FastAPI's response-model validation and jsonable_encoder pass.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
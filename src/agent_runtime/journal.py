@@ -0,0 +1,447 @@
+from __future__ import annotations
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import uuid
+import zlib
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+from agent_runtime.fast_json import dumps
+
+# Segment files start with this; each record is then length, crc32 (both big-endian u32) and the
+# record as compact JSON. The .idx file beside a segment has one JSON line per record:
+# [ts, offset, run_id, [call_id, ...]], written only after the record bytes are flushed.
+_MAGIC = b"AGJ1"
+_HEADER = struct.Struct(">II")
+_STOP = object()
+
+
+@dataclass(frozen=True)
+class JournalConfig:
+    """Opt-in run journal. directory=None (the default) turns it off."""
+
+    directory: str | None = None
+    # Start a new segment once the current one reaches either limit.
+    segment_bytes: int = 64 * 1024 * 1024
+    segment_max_age_s: float = 3600.0
+    # Sealed segments beyond the newest retention_segments, or last written retention_s ago, are deleted.
+    retention_segments: int | None = 48
+    retention_s: float | None = 7 * 24 * 3600.0
+    # Records waiting for the writer; record() drops (and counts) runs beyond this rather than block.
+    queue_size: int = 10_000
+    # Most records written per batch; after the first record of a batch the writer waits
+    # linger_s for more, so a busy process pays the write (and the GIL hand-off) once per batch.
+    batch_max: int = 512
+    linger_s: float = 0.01
+    # How long an idle writer sleeps between segment age checks.
+    idle_s: float = 0.5
+    # fsync every batch. Off: a crash can lose the last batches the OS had not written out.
+    fsync: bool = False
+
+
+@dataclass
+class _Segment:
+    seq: int
+    path: Path
+    created: float
+    size: int = 0
+    first_ts: float | None = None
+    last_ts: float | None = None
+    # Parallel lists, one entry per record, in write order.
+    times: list[float] = field(default_factory=list)
+    offsets: list[int] = field(default_factory=list)
+    # call_ids and run_ids in this segment, to unindex them when it is deleted.
+    keys: list[str] = field(default_factory=list)
+
+    @property
+    def index_path(self) -> Path:
+        return self.path.with_suffix(".idx")
+
+
+class RunJournal:
+    """
+    Append-only journal of every run: input, planner, the full trace (provider_call, plan,
+    tool_call events) and the output or error.
+
+    record() only stamps the run and queues it; a writer thread serializes queued runs in
+    batches, appends them to the current segment and updates an in-memory index by call_id,
+    run_id and time, so a lookup costs one dict access and one seek. Writes are asynchronous:
+    a run shows up in lookups once its batch is written (flush() waits for that).
+    """
+
+    def __init__(self, config: JournalConfig | None = None):
+        self.config = config or JournalConfig()
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=self.config.queue_size)
+        self._lock = threading.Lock()
+        self._segments: dict[int, _Segment] = {}
+        self._by_call: dict[str, list[tuple[int, int]]] = {}
+        self._by_run: dict[str, tuple[int, int]] = {}
+        self._current: _Segment | None = None
+        self._file: Any = None
+        self._index_file: Any = None
+        self._thread: threading.Thread | None = None
+        self._next_seq = 0
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.bytes_written = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.directory is not None
+
+    @property
+    def recording(self) -> bool:
+        """Whether record() keeps runs; callers trace their runs only when it does."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Load the existing index and start the writer. No-op when disabled or already running."""
+        if not self.enabled or self._thread is not None:
+            return
+        directory = Path(self.config.directory)  # type: ignore[arg-type]
+        directory.mkdir(parents=True, exist_ok=True)
+        for path in sorted(directory.glob("*.seg")):
+            self._load_segment(path)
+        self._apply_retention(time.time())
+        self._thread = threading.Thread(target=self._write_loop, name="agent-run-journal", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Write everything queued, then stop the writer."""
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join()
+
+    def flush(self) -> None:
+        """Block until every run recorded so far is written."""
+        if self.recording:
+            self._queue.join()
+
+    def record(
+        self,
+        user_input: str,
+        planner: str,
+        trace: list[Any],
+        *,
+        output: str | None = None,
+        error: dict[str, Any] | None = None,
+    ) -> str | None:
+        """
+        Queue one finished run; returns its run_id, or None when disabled or the queue is full.
+        trace may mix trace dicts and TraceRecorder events; events are turned into dicts by the writer.
+        """
+        if not self.recording:
+            return None
+        run_id = uuid.uuid4().hex
+        try:
+            self._queue.put_nowait((time.time(), run_id, user_input, planner, trace, output, error))
+        except queue.Full:
+            self.dropped += 1
+            return None
+        self.recorded += 1
+        return run_id
+
+    # Lookups. These read segment files: call them off the event loop.
+
+    def get_call(self, call_id: str) -> dict[str, Any] | None:
+        """The most recent run that made call_id."""
+        with self._lock:
+            locations = self._by_call.get(call_id)
+            location = locations[-1] if locations else None
+        return self._read(location) if location else None
+
+    def runs_for_call(self, call_id: str, limit: int = 20) -> list[dict[str, Any]]:
+        """Runs that made call_id, newest first. Rules plans reuse call_ids for the same input."""
+        with self._lock:
+            locations = list(reversed(self._by_call.get(call_id, [])))[:limit]
+        return [record for record in map(self._read, locations) if record is not None]
+
+    def get_run(self, run_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            location = self._by_run.get(run_id)
+        return self._read(location) if location else None
+
+    def between(self, since: float | None = None, until: float | None = None, limit: int = 100) -> list[dict[str, Any]]:
+        """Runs recorded in [since, until] (time.time() seconds), oldest first."""
+        since = float("-inf") if since is None else since
+        until = float("inf") if until is None else until
+        locations = []
+        with self._lock:
+            for seq in sorted(self._segments):
+                segment = self._segments[seq]
+                if segment.last_ts is None or segment.last_ts < since or segment.first_ts > until:  # type: ignore[operator]
+                    continue
+                for i in range(bisect_left(segment.times, since), len(segment.times)):
+                    if segment.times[i] > until or len(locations) >= limit:
+                        break
+                    locations.append((seq, segment.offsets[i]))
+                if len(locations) >= limit:
+                    break
+        return [record for record in map(self._read, locations) if record is not None]
+
+    def _read(self, location: tuple[int, int]) -> dict[str, Any] | None:
+        seq, offset = location
+        with self._lock:
+            segment = self._segments.get(seq)
+        if segment is None:
+            return None
+        try:
+            with open(segment.path, "rb") as f:
+                f.seek(offset)
+                length, crc = _HEADER.unpack(f.read(_HEADER.size))
+                payload = f.read(length)
+        except (OSError, struct.error):
+            # Deleted by retention between the index lookup and the read.
+            return None
+        if zlib.crc32(payload) != crc:
+            return None
+        return json.loads(payload)
+
+    # Writer thread.
+
+    def _write_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                batch = [self._queue.get(timeout=self.config.idle_s)]
+            except queue.Empty:
+                self._on_idle(time.time())
+                continue
+            if batch[-1] is not _STOP and self.config.linger_s > 0:
+                time.sleep(self.config.linger_s)
+            while batch[-1] is not _STOP and len(batch) < self.config.batch_max:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is _STOP:
+                stopping = True
+            runs = batch[:-1] if stopping else batch
+            try:
+                if runs:
+                    self._write_batch(runs)
+            except OSError:
+                self.failed += len(runs)
+                self._close_files()
+            except Exception:
+                # Whatever a batch throws, the writer keeps going: a dead thread would leave
+                # record() queueing runs nobody writes and flush() waiting forever.
+                self.failed += len(runs)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        self._close_files()
+
+    def _write_batch(self, batch: list[tuple[Any, ...]]) -> None:
+        # Records go to the segment file; their index lines and in-memory entries follow once the
+        # bytes are flushed, at the end of the batch or before a rotation seals the segment.
+        pending: list[tuple[float, int, str, list[str]]] = []
+        written = 0
+        for ts, run_id, user_input, planner, trace, output, error in batch:
+            try:
+                record: dict[str, Any] = {
+                    "ts": ts,
+                    "run_id": run_id,
+                    "input": user_input,
+                    "planner": planner,
+                    "trace": [item if isinstance(item, dict) else item.as_dict() for item in trace],
+                }
+                if error is None:
+                    record["output"] = output
+                else:
+                    record["error"] = error
+                payload = dumps(record)
+            except Exception:
+                # One unencodable run (a lone surrogate in the input, an odd trace value) is
+                # counted and skipped; the rest of the batch is still written.
+                self.failed += 1
+                continue
+            size = _HEADER.size + len(payload)
+            if self._rotation_due(ts, size):
+                self._commit(pending)
+                pending = []
+                self._rotate(ts)
+            segment = self._current
+            assert segment is not None
+            pending.append((ts, segment.size, run_id, _call_ids(record)))
+            self._file.write(_HEADER.pack(len(payload), zlib.crc32(payload)))
+            self._file.write(payload)
+            segment.size += size
+            self.bytes_written += size
+            written += 1
+        self._commit(pending)
+        self.written += written
+        self.batches += 1
+
+    def _commit(self, entries: list[tuple[float, int, str, list[str]]]) -> None:
+        if not entries:
+            return
+        segment = self._current
+        assert segment is not None
+        self._file.flush()
+        if self.config.fsync:
+            os.fsync(self._file.fileno())
+        self._index_file.write(b"".join(dumps(list(entry)) + b"\n" for entry in entries))
+        self._index_file.flush()
+        with self._lock:
+            for entry in entries:
+                self._index(segment, *entry)
+
+    def _index(self, segment: _Segment, ts: float, offset: int, run_id: str, call_ids: list[str]) -> None:
+        if segment.first_ts is None:
+            segment.first_ts = ts
+        segment.last_ts = ts
+        segment.times.append(ts)
+        segment.offsets.append(offset)
+        location = (segment.seq, offset)
+        self._by_run[run_id] = location
+        segment.keys.append(run_id)
+        for call_id in call_ids:
+            self._by_call.setdefault(call_id, []).append(location)
+            segment.keys.append(call_id)
+
+    def _rotation_due(self, now: float, incoming: int) -> bool:
+        current = self._current
+        if current is None:
+            return True
+        # An oversized record still gets a segment of its own.
+        if current.size + incoming > self.config.segment_bytes and current.size > len(_MAGIC):
+            return True
+        return now - current.created >= self.config.segment_max_age_s
+
+    def _rotate(self, now: float) -> None:
+        self._close_files()
+        self._apply_retention(now)
+        self._next_seq += 1
+        segment = _Segment(self._next_seq, Path(self.config.directory) / f"{self._next_seq:010d}.seg", created=now)  # type: ignore[arg-type]
+        self._file = open(segment.path, "wb")
+        self._file.write(_MAGIC)
+        self._index_file = open(segment.index_path, "wb")
+        segment.size = len(_MAGIC)
+        with self._lock:
+            self._segments[segment.seq] = segment
+        self._current = segment
+
+    def _on_idle(self, now: float) -> None:
+        # Seal an old segment even when nothing arrives, so age-based retention can drop it.
+        current = self._current
+        if current is not None and now - current.created >= self.config.segment_max_age_s:
+            self._close_files()
+        self._apply_retention(now)
+
+    def _close_files(self) -> None:
+        for f in (self._file, self._index_file):
+            if f is not None:
+                try:
+                    f.close()
+                except OSError:
+                    pass
+        self._file = self._index_file = None
+        self._current = None
+
+    def _apply_retention(self, now: float) -> None:
+        config = self.config
+        with self._lock:
+            sealed = sorted(seq for seq in self._segments if self._current is None or seq != self._current.seq)
+            doomed = []
+            if config.retention_segments is not None:
+                doomed += sealed[: max(0, len(sealed) - config.retention_segments)]
+            if config.retention_s is not None:
+                cutoff = now - config.retention_s
+                doomed += [
+                    seq for seq in sealed
+                    if (self._segments[seq].last_ts or self._segments[seq].created) < cutoff
+                ]
+            removed = [self._segments.pop(seq) for seq in sorted(set(doomed))]
+            for segment in removed:
+                self._unindex(segment)
+        for segment in removed:
+            segment.path.unlink(missing_ok=True)
+            segment.index_path.unlink(missing_ok=True)
+
+    def _unindex(self, segment: _Segment) -> None:
+        for key in segment.keys:
+            if self._by_run.get(key, (None,))[0] == segment.seq:
+                del self._by_run[key]
+                continue
+            locations = self._by_call.get(key)
+            if locations:
+                kept = [loc for loc in locations if loc[0] != segment.seq]
+                if kept:
+                    self._by_call[key] = kept
+                else:
+                    del self._by_call[key]
+
+    # Startup.
+
+    def _load_segment(self, path: Path) -> None:
+        try:
+            seq = int(path.stem)
+        except ValueError:
+            return
+        self._next_seq = max(self._next_seq, seq)
+        stat = path.stat()
+        segment = _Segment(seq, path, created=stat.st_mtime, size=stat.st_size)
+        with self._lock:
+            self._segments[seq] = segment
+            for ts, offset, run_id, call_ids in self._index_entries(segment):
+                self._index(segment, ts, offset, run_id, call_ids)
+
+    def _index_entries(self, segment: _Segment) -> Iterator[tuple[float, int, str, list[str]]]:
+        if segment.index_path.is_file():
+            for line in segment.index_path.read_bytes().splitlines():
+                try:
+                    ts, offset, run_id, call_ids = json.loads(line)
+                except ValueError:
+                    return  # torn last line: the writer died mid-batch
+                if offset < segment.size:
+                    yield ts, offset, run_id, call_ids
+            return
+        # No index beside the segment: rebuild it from the records, stopping at a torn tail.
+        with open(segment.path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                return
+            offset = len(_MAGIC)
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    return
+                length, crc = _HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    return
+                record = json.loads(payload)
+                yield record["ts"], offset, record["run_id"], _call_ids(record)
+                offset += _HEADER.size + length
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            segments = len(self._segments)
+            size = sum(s.size for s in self._segments.values())
+        return {
+            "enabled": self.enabled,
+            "running": self.recording,
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+            "queued": self._queue.qsize(),
+            "segments": segments,
+            "bytes": size,
+        }
+
+
+def _call_ids(record: dict[str, Any]) -> list[str]:
+    return [item["call_id"] for item in record["trace"] if item.get("type") == "tool_call"]
@@ -0,0 +1,56 @@
+from __future__ import annotations
+from collections import deque
+from typing import Iterable, Mapping
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick matcher: finds every label whose keywords occur in a text, case-insensitively,
+    in one pass over the text. Cost depends on the text length, not on how many keywords exist.
+    """
+
+    def __init__(self, keywords: Mapping[str, Iterable[str]]):
+        # Trie: goto[state][char] -> state; out[state] -> labels whose keyword ends here.
+        goto: list[dict[str, int]] = [{}]
+        out: list[set[str]] = [set()]
+        for label, words in keywords.items():
+            for word in words:
+                word = word.lower()
+                if not word:
+                    continue
+                state = 0
+                for ch in word:
+                    nxt = goto[state].get(ch)
+                    if nxt is None:
+                        nxt = goto[state][ch] = len(goto)
+                        goto.append({})
+                        out.append(set())
+                    state = nxt
+                out[state].add(label)
+
+        # Breadth-first fail links, folded into a complete transition table so matching never
+        # follows a fail chain. Characters outside every keyword fall back to the root.
+        delta: list[dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            out[state] |= out[fail[state]]
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0) if state else 0
+                queue.append(nxt)
+
+        self._delta = delta
+        self._out = [frozenset(o) for o in out]
+        self.labels = frozenset(keywords)
+
+    def find(self, text: str) -> set[str]:
+        delta, out = self._delta, self._out
+        hits: set[str] = set()
+        state = 0
+        for ch in text.lower():
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                hits |= out[state]
+        return hits
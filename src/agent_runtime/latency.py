@@ -0,0 +1,53 @@
+from __future__ import annotations
+import math
+
+
+class LatencySketch:
+    """
+    Streaming latency quantiles over log-spaced buckets (relative error about alpha).
+    Memory is bounded by the latency range, not the sample count. Once max_count samples
+    accumulate every bucket is halved, so the estimate follows recent traffic.
+    """
+
+    def __init__(
+        self,
+        *,
+        alpha: float = 0.02,
+        min_samples: int = 20,
+        max_count: int = 2000,
+        min_value_s: float = 1e-4,
+    ):
+        self._gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self._gamma)
+        self.min_samples = min_samples
+        self.max_count = max_count
+        self.min_value_s = min_value_s
+        self._counts: dict[int, float] = {}
+        self.count = 0.0
+
+    def add(self, value_s: float) -> None:
+        bucket = math.ceil(math.log(max(value_s, self.min_value_s)) / self._log_gamma)
+        self._counts[bucket] = self._counts.get(bucket, 0.0) + 1.0
+        self.count += 1.0
+        if self.count >= self.max_count:
+            self._counts = {k: c / 2 for k, c in self._counts.items() if c >= 1.0}
+            self.count = sum(self._counts.values())
+
+    def quantile(self, q: float) -> float | None:
+        """Estimated q-quantile in seconds, or None until min_samples have been seen."""
+        if self.count < self.min_samples:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0.0
+        for bucket in sorted(self._counts):
+            seen += self._counts[bucket]
+            if seen > rank:
+                return 2 * self._gamma ** bucket / (self._gamma + 1)
+        return 2 * self._gamma ** max(self._counts) / (self._gamma + 1)
+
+    def stats(self) -> dict[str, float | None]:
+        def ms(q: float) -> float | None:
+            v = self.quantile(q)
+            return None if v is None else round(v * 1000, 3)
+
+        return {"samples": round(self.count), "p50_ms": ms(0.5), "p95_ms": ms(0.95), "p99_ms": ms(0.99)}
@@ -0,0 +1,154 @@
+from __future__ import annotations
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+from agent_runtime.call_context import active_call
+from agent_runtime.metrics import MetricsRegistry
+
+
+@dataclass(frozen=True)
+class LoopMonitorConfig:
+    enabled: bool = True
+    # The sampler sleeps this long; anything beyond it when it wakes up is loop lag.
+    interval_s: float = 0.05
+    # The loop not answering for this long is a stall: the watchdog thread records what was running.
+    stall_s: float = 0.1
+    # Recent stalls kept for stats().
+    keep: int = 50
+    # Innermost frames of the blocked loop thread kept per stall.
+    stack_depth: int = 8
+
+
+class LoopMonitor:
+    """
+    Event-loop lag sampler plus a watchdog thread for stalls.
+
+    A coroutine sleeps interval_s in a loop and records how late it wakes up (loop lag). A
+    daemon thread watches that coroutine's heartbeat; when it goes quiet for stall_s the thread
+    looks at the task the loop is running, the tool call that task is executing (enter_call
+    in the executor) and the blocked thread's innermost frames. The sampler completes the
+    record with the stall's length once the loop is back.
+    """
+
+    def __init__(self, config: LoopMonitorConfig | None = None, *, metrics: MetricsRegistry | None = None):
+        self.config = config or LoopMonitorConfig()
+        self.stalls: deque[dict[str, Any]] = deque(maxlen=self.config.keep)
+        self.max_lag_s = 0.0
+        self.samples = 0
+        self._pending: list[dict[str, Any]] = []
+        self._beat = time.perf_counter()
+        self._task: asyncio.Task[None] | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._lag = self._stall_count = None
+        if metrics is not None:
+            self._lag = metrics.histogram(
+                "agent_event_loop_lag_seconds",
+                "How late the loop sampler woke up.",
+                buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+            )
+            self._stall_count = metrics.counter(
+                "agent_event_loop_stalls_total", "Loop stalls, by the tool running when it stalled.", ("tool",)
+            )
+
+    def start(self) -> None:
+        """Start sampling on the running loop. No-op when disabled or already running."""
+        if not self.config.enabled or self._task is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._beat = time.perf_counter()
+        self._stop.clear()
+        self._task = loop.create_task(self._sample(), name="agent-loop-monitor")
+        self._thread = threading.Thread(
+            target=self._watch,
+            args=(loop, threading.get_ident()),
+            name="agent-loop-watchdog",
+            daemon=True,
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=1.0)
+
+    async def _sample(self) -> None:
+        interval = self.config.interval_s
+        while True:
+            before = self._beat
+            await asyncio.sleep(interval)
+            now = self._beat = time.perf_counter()
+            lag = max(0.0, now - before - interval)
+            self.samples += 1
+            self.max_lag_s = max(self.max_lag_s, lag)
+            if self._lag is not None:
+                self._lag.observe(lag)
+            if self._pending or lag >= self.config.stall_s:
+                self._finish_stalls(before, lag)
+
+    def _finish_stalls(self, beat: float, lag: float) -> None:
+        # list.pop is atomic, so the watchdog may keep appending while this drains.
+        pending = []
+        while self._pending:
+            stall = self._pending.pop(0)
+            # A snapshot that lost the race with the loop's return belongs to a stall already recorded.
+            if stall.pop("beat") == beat:
+                pending.append(stall)
+        if lag < self.config.stall_s:
+            return
+        if not pending:
+            # Shorter than the watchdog's poll: the lag is all we know.
+            pending = [{"tool": None, "call_id": None, "task": None, "stack": [], "at": time.time()}]
+        for stall in pending:
+            stall["lag_ms"] = round(lag * 1000, 3)
+            self.stalls.append(stall)
+            if self._stall_count is not None:
+                self._stall_count.inc(stall["tool"] or "")
+
+    def _watch(self, loop: asyncio.AbstractEventLoop, loop_thread: int) -> None:
+        poll = min(self.config.interval_s, self.config.stall_s) / 2
+        reported = None
+        while not self._stop.wait(poll):
+            beat = self._beat
+            if beat == reported or time.perf_counter() - beat - self.config.interval_s < self.config.stall_s:
+                continue
+            reported = beat
+            stall = self._snapshot(loop, loop_thread)
+            stall["beat"] = beat
+            self._pending.append(stall)
+
+    def _snapshot(self, loop: asyncio.AbstractEventLoop, loop_thread: int) -> dict[str, Any]:
+        task = asyncio.current_task(loop)
+        call = active_call(task) if task is not None else None
+        frame = sys._current_frames().get(loop_thread)
+        stack = []
+        if frame is not None:
+            summary = traceback.extract_stack(frame)[-self.config.stack_depth:]
+            stack = [f"{f.filename}:{f.lineno} {f.name}" for f in reversed(summary)]
+        return {
+            "tool": call[0] if call else None,
+            "call_id": call[1] if call else None,
+            "task": task.get_name() if task is not None else None,
+            "stack": stack,
+            "at": time.time(),
+        }
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "samples": self.samples,
+            "max_lag_ms": round(self.max_lag_s * 1000, 3),
+            "stalls": len(self.stalls),
+            "recent_stalls": list(self.stalls)[-5:],
+        }
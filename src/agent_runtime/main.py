@@ -1,6 +1,22 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from agent_runtime.api import router as api_router
+from agent_runtime.api import metrics_router, router as api_router
+from agent_runtime.runtime import AgentRuntime
 from agent_runtime import __version__
 
-app = FastAPI(title="Agent Runtime", version=__version__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    runtime = AgentRuntime()
+    runtime.start()
+    app.state.runtime = runtime
+    try:
+        yield
+    finally:
+        await runtime.aclose()
+
+
+app = FastAPI(title="Agent Runtime", version=__version__, lifespan=lifespan)
 app.include_router(api_router, prefix="/v1")
+app.include_router(metrics_router)
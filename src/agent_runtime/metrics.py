@@ -0,0 +1,199 @@
+from __future__ import annotations
+import math
+from bisect import bisect_left
+from typing import Any, Callable, Iterable
+
+# Seconds. Spans a cached plan (microseconds) up to a slow upstream call.
+DEFAULT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# (name, type, help, labels, value) from a collector; rendered as one sample.
+Sample = tuple[str, str, str, dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in self.values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) - amount
+
+    def set(self, *labels: str, value: float) -> None:
+        self.values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self.values: dict[tuple[str, ...], list[Any]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def render(self) -> list[str]:
+        lines = []
+        for labels, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Process-wide metrics in the Prometheus text format. Instruments are plain dict updates on
+    the event loop, cheap enough to stay on for every request. Collectors turn existing
+    stats() snapshots into samples at scrape time, so those counters cost nothing until read.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], Iterable[Sample]]] = []
+
+    def _register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collect: Callable[[], Iterable[Sample]]) -> None:
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines += metric.header()
+            lines += metric.render()
+        described: set[str] = set()
+        for collect in self._collectors:
+            for name, kind, help, labels, value in collect():
+                if name not in described:
+                    described.add(name)
+                    lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                names = tuple(labels)
+                lines.append(f"{name}{_labels(names, tuple(labels[n] for n in names))} {_number(float(value))}")
+        return "\n".join(lines) + "\n"
+
+
+class ToolCallMetrics:
+    """The executor's instruments: one observation per tool_call, whether or not it is traced."""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.calls = registry.counter("agent_tool_calls_total", "Tool calls finished, by tool.", ("tool",))
+        self.errors = registry.counter(
+            "agent_tool_errors_total", "Tool calls that failed, by tool and ToolError code.", ("tool", "code")
+        )
+        self.seconds = registry.histogram(
+            "agent_tool_call_seconds", "Tool call latency as seen by the run, cache hits included.", ("tool",)
+        )
+        self.in_flight = registry.gauge(
+            "agent_tool_invocations_in_flight", "Tool invocations (run or run_many) currently executing.", ("tool",)
+        )
+        self.budget_exhausted = registry.counter(
+            "agent_call_budget_exhausted_total", "Calls refused because the run's max_tool_calls was reached."
+        )
+
+    def finished(self, tool: str, elapsed_s: float, error_code: str | None) -> None:
+        self.calls.inc(tool)
+        self.seconds.observe(elapsed_s, tool)
+        if error_code is not None:
+            self.errors.inc(tool, error_code)
+
+
+class ApiMetrics:
+    """Instruments the API handlers record into: planning latency and Ollama usage."""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.plan_seconds = registry.histogram(
+            "agent_plan_seconds", "Time to a plan, by planner (ollama_math includes the model call).", ("planner",)
+        )
+        self.ollama_calls = registry.counter("agent_ollama_calls_total", "Ollama chat requests answered.", ("stream",))
+        self.ollama_tokens = registry.counter(
+            "agent_ollama_tokens_total", "Tokens Ollama reported, by kind (input, output).", ("kind",)
+        )
+
+    def ollama_usage(self, usage: dict[str, int | None], *, stream: bool) -> None:
+        self.ollama_calls.inc("true" if stream else "false")
+        for kind in ("input", "output"):
+            tokens = usage.get(f"{kind}_tokens")
+            if tokens is not None:
+                self.ollama_tokens.inc(kind, amount=tokens)
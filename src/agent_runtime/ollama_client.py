@@ -0,0 +1,74 @@
+from __future__ import annotations
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+import httpx
+
+OLLAMA_BASE_URL = "http://127.0.0.1:11434"
+OLLAMA_MODEL = "qwen3.5:9b-q4_K_M"
+
+
+class OllamaStream:
+    """Incremental reader over Ollama's NDJSON chat stream."""
+
+    def __init__(self, response: httpx.Response):
+        self.status_code = response.status_code
+        self._response = response
+
+    async def chunks(self) -> AsyncIterator[dict[str, Any]]:
+        async for line in self._response.aiter_lines():
+            line = line.strip()
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if not isinstance(chunk, dict):
+                raise ValueError("Ollama stream chunk must be an object")
+            yield chunk
+
+
+class OllamaClient:
+    """
+    Persistent loopback client for the local Ollama server.
+    One instance lives on the runtime so every request reuses the same keep-alive connection.
+    """
+
+    def __init__(
+        self,
+        *,
+        base_url: str = OLLAMA_BASE_URL,
+        model: str = OLLAMA_MODEL,
+        timeout_s: float = 30.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.model = model
+        self.timeout_s = float(timeout_s)
+        self._http = httpx.AsyncClient(base_url=base_url, timeout=self.timeout_s, transport=transport)
+
+    def chat_body(self, user_input: str, tools: list[dict[str, Any]], *, stream: bool) -> dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": user_input}],
+            "tools": tools,
+            "stream": stream,
+            "think": False,
+            "options": {"temperature": 0},
+        }
+
+    def _timeout(self, remaining_s: float | None) -> float:
+        return self.timeout_s if remaining_s is None else max(0.001, min(self.timeout_s, remaining_s))
+
+    async def chat(self, body: dict[str, Any], *, remaining_s: float | None = None) -> tuple[int, Any]:
+        """POST a non-streaming chat request; returns (http_status, decoded payload)."""
+        response = await self._http.post("/api/chat", json=body, timeout=self._timeout(remaining_s))
+        response.raise_for_status()
+        return response.status_code, response.json()
+
+    @asynccontextmanager
+    async def stream_chat(self, body: dict[str, Any], *, remaining_s: float | None = None) -> AsyncIterator[OllamaStream]:
+        async with self._http.stream("POST", "/api/chat", json=body, timeout=self._timeout(remaining_s)) as response:
+            response.raise_for_status()
+            yield OllamaStream(response)
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+from typing import Any, Mapping
+
+from agent_runtime.types import ToolCall
+
+# An argument value of the form {"$ref": "<call_id>", "path": "a.b"} is replaced, just before the
+# call runs, by that call's result (or the value at the dotted path inside it). A reference
+# implies a dependency, so it does not also need to be listed in depends_on.
+REF_KEY = "$ref"
+
+
+def _refs(value: Any, out: list[str]) -> list[str]:
+    if isinstance(value, dict):
+        if REF_KEY in value:
+            out.append(str(value[REF_KEY]))
+        else:
+            for v in value.values():
+                _refs(v, out)
+    elif isinstance(value, list):
+        for v in value:
+            _refs(v, out)
+    return out
+
+
+def graph_dependencies(calls: list[ToolCall]) -> dict[str, tuple[str, ...]]:
+    """
+    Map each call_id to the call_ids it waits for (explicit depends_on plus argument refs).
+    Raises ValueError for duplicate ids, unknown dependencies, or cycles.
+    """
+    ids = [c.call_id for c in calls]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Duplicate call_id in tool graph")
+    known = set(ids)
+
+    deps: dict[str, tuple[str, ...]] = {}
+    for call in calls:
+        wanted = list(dict.fromkeys([*call.depends_on, *_refs(call.arguments, [])]))
+        unknown = [d for d in wanted if d not in known]
+        if unknown:
+            raise ValueError(f"Call {call.call_id} depends on unknown call(s): {', '.join(unknown)}")
+        deps[call.call_id] = tuple(wanted)
+
+    # Kahn's algorithm: anything left unvisited sits on a cycle.
+    remaining = {cid: len(d) for cid, d in deps.items()}
+    dependents: dict[str, list[str]] = {cid: [] for cid in ids}
+    for cid, d in deps.items():
+        for dep in d:
+            dependents[dep].append(cid)
+    frontier = [cid for cid in ids if remaining[cid] == 0]
+    visited = 0
+    while frontier:
+        cid = frontier.pop()
+        visited += 1
+        for nxt in dependents[cid]:
+            remaining[nxt] -= 1
+            if remaining[nxt] == 0:
+                frontier.append(nxt)
+    if visited != len(ids):
+        raise ValueError("Tool graph contains a cycle")
+    return deps
+
+
+def resolve_arguments(value: Any, results: Mapping[str, dict[str, Any]]) -> Any:
+    """Substitute $ref values with earlier results. Raises KeyError for a path that does not exist."""
+    if isinstance(value, dict):
+        if REF_KEY in value:
+            target: Any = results[str(value[REF_KEY])]
+            path = value.get("path")
+            if path:
+                for part in str(path).split("."):
+                    target = target[int(part)] if isinstance(target, list) else target[part]
+            return target
+        return {k: resolve_arguments(v, results) for k, v in value.items()}
+    if isinstance(value, list):
+        return [resolve_arguments(v, results) for v in value]
+    return value
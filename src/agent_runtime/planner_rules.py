@@ -1,93 +1,135 @@
 from __future__ import annotations
 import re
-import json
 import hashlib
+from collections import OrderedDict
+from json.encoder import encode_basestring_ascii as _json_str
 
+from agent_runtime.canonical import canonical_json
+from agent_runtime.keyword_automaton import KeywordAutomaton
 from agent_runtime.types import Plan, PlanStep, ToolCall
 from agent_runtime.tools.registry import ToolRegistry
 
+_DIGIT = re.compile(r"\d")
+# Same runs as [0-9\s+\-*/^().]+ once stripped, but never starting at whitespace, so the
+# spaces between words in plain prose do not each produce a match.
+_MATH_CANDIDATE = re.compile(r"[0-9\+\-\*/\^\(\)\.][0-9\s\+\-\*/\^\(\)\.]*")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_MATH_OPS = ("+", "-", "*", "/", "^")
+
+
+def _scan_math(text: str) -> tuple[bool, str | None]:
+    """
+    (contains a digit, first math candidate). The candidate walk only runs when there is a digit.
+    """
+    if _DIGIT.search(text) is None:
+        return False, None
+    for candidate in _MATH_CANDIDATE.findall(text):
+        candidate = candidate.rstrip()
+        if any(op in candidate for op in _MATH_OPS) and _DIGIT.search(candidate):
+            return True, candidate
+    return True, None
+
+
+# Final templates for the intent combinations that have a dedicated rendering.
+_TEMPLATES = {
+    ("math",): "math",
+    ("weather",): "weather",
+    ("weather", "math"): "weather_plus_math",
+}
+
+
 class RulesPlanner:
     """
     Deterministic rules-first planner.
     Produces stable call_ids so plans can be compared and audited without re-running.
+
+    Tools opt in with Tool.triggers; one keyword automaton over every registered trigger finds
+    all matching tools in a single pass, so planning cost does not grow with the registry.
+    Two intents deliberately stay outside the trigger mechanism, so they need those tool names
+    registered: any digit plans a math call (with the expression extracted here, not by
+    MathTool.plan_arguments), and an input that matched nothing falls back to web_search.
+    Plans are immutable, so finished ones are kept in an LRU keyed by the stripped input.
     """
 
-    def __init__(self, registry: ToolRegistry):
+    def __init__(self, registry: ToolRegistry, *, cache_size: int = 1024):
         self.registry = registry
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, Plan] = OrderedDict()
+        self._revision = -1
+        self._automaton = KeywordAutomaton({})
+        self._trigger_order: dict[str, int] = {}
+
+    def _refresh(self) -> None:
+        """Rebuild the trigger automaton (and drop cached plans) when the registry has changed."""
+        if self._revision == self.registry.revision:
+            return
+        tools = self.registry.tools
+        self._automaton = KeywordAutomaton({name: tool.triggers for name, tool in tools.items() if tool.triggers})
+        self._trigger_order = {name: i for i, name in enumerate(tools)}
+        self._cache.clear()
+        self._revision = self.registry.revision
 
     def plan(self, user_input: str) -> Plan:
+        self._refresh()
         text = user_input.strip()
-
-        wants_weather = self._mentions_weather(text)
-        wants_math = self._looks_like_math(text) or self._contains_numbers(text)
-
-        if wants_weather and wants_math:
-            city = self._extract_city(text) or "San Francisco"
-            expr = self._extract_math_expr(text)
-
-            call_weather = self._call(text, 0, "weather", {"location": city})
-            call_math = self._call(text, 1, "math", {"expression": expr})
-
-            steps = [
-                PlanStep(kind="parallel_tool_calls", parallel_calls=[call_weather, call_math]),
-                PlanStep(kind="final", final_template="weather_plus_math"),
-            ]
-            return Plan(user_input=text, steps=steps)
-
-        if wants_math:
-            expr = self._extract_math_expr(text)
-            call = self._call(text, 0, "math", {"expression": expr})
-            steps = [PlanStep(kind="tool_call", tool_call=call), PlanStep(kind="final", final_template="math")]
-            return Plan(user_input=text, steps=steps)
-
-        if wants_weather:
-            city = self._extract_city(text) or "San Francisco"
-            call = self._call(text, 0, "weather", {"location": city})
-            steps = [PlanStep(kind="tool_call", tool_call=call), PlanStep(kind="final", final_template="weather")]
+        plan = self._cache.get(text)
+        if plan is not None:
+            self._cache.move_to_end(text)
+            return plan
+        plan = self._plan(text)
+        if self.cache_size > 0:
+            self._cache[text] = plan
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return plan
+
+    def _plan(self, text: str) -> Plan:
+        # Keyword intents in registry order, then math: anything with a digit (a bare "5" included).
+        intents = sorted(self._automaton.find(text), key=self._trigger_order.__getitem__)
+        has_digit, math_expr = _scan_math(text)
+        if has_digit:
+            intents.append("math")
+
+        if not intents:
+            call = self._call(text, 0, "web_search", {"query": text})
+            steps = [PlanStep(kind="tool_call", tool_call=call), PlanStep(kind="final", final_template="search_summary")]
             return Plan(user_input=text, steps=steps)
 
-        call = self._call(text, 0, "web_search", {"query": text})
-        steps = [PlanStep(kind="tool_call", tool_call=call), PlanStep(kind="final", final_template="search_summary")]
-        return Plan(user_input=text, steps=steps)
+        calls = []
+        for ordinal, name in enumerate(intents):
+            if name == "math":
+                arguments = {"expression": self._math_expr(text, math_expr)}
+            else:
+                arguments = self.registry.tools[name].plan_arguments(text)
+            calls.append(self._call(text, ordinal, name, arguments))
+
+        template = _TEMPLATES.get(tuple(intents), "multi")
+        if len(calls) == 1:
+            first = PlanStep(kind="tool_call", tool_call=calls[0])
+        else:
+            first = PlanStep(kind="parallel_tool_calls", parallel_calls=calls)
+        return Plan(user_input=text, steps=[first, PlanStep(kind="final", final_template=template)])
 
     def _call(self, user_input: str, ordinal: int, tool_name: str, arguments: dict) -> ToolCall:
         call_id = self._make_call_id(user_input, ordinal, tool_name, arguments)
         return ToolCall(tool_name=tool_name, arguments=arguments, call_id=call_id)
 
     def _make_call_id(self, user_input: str, ordinal: int, tool_name: str, arguments: dict) -> str:
-        payload = {
-            "user_input": user_input,
-            "ordinal": ordinal,
-            "tool": tool_name,
-            "arguments": arguments,
-        }
-        blob = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        # Byte-for-byte canonical_json({"user_input", "ordinal", "tool", "arguments"}), written out
+        # in sorted key order so only the arguments go through the generic encoder.
+        blob = b'{"arguments":%s,"ordinal":%d,"tool":%s,"user_input":%s}' % (
+            canonical_json(arguments),
+            ordinal,
+            _json_str(tool_name).encode("ascii"),
+            _json_str(user_input).encode("ascii"),
+        )
         digest = hashlib.sha256(blob).hexdigest()[:12]
         return f"{tool_name}_{ordinal}_{digest}"
 
-    def _looks_like_math(self, text: str) -> bool:
-        return bool(re.search(r"\d\s*[\+\-\*/\^]\s*\d", text))
-
-    def _contains_numbers(self, text: str) -> bool:
-        return bool(re.search(r"\d", text))
-
-    def _mentions_weather(self, text: str) -> bool:
-        t = text.lower()
-        return "weather" in t or "forecast" in t or "temperature" in t
-
-    def _extract_city(self, text: str) -> str | None:
-        m = re.search(r"(?:weather|forecast|temperature)\s+(?:in|for)\s+([A-Za-z .'-]+)", text, flags=re.IGNORECASE)
-        if not m:
-            return None
-        return m.group(1).strip()
-
-    def _extract_math_expr(self, text: str) -> str:
-        candidates = re.findall(r"[0-9\s\+\-\*/\^\(\)\.]+", text)
-        candidates = [c.strip() for c in candidates if c.strip()]
-        for c in candidates:
-            if any(op in c for op in ["+", "-", "*", "/", "^"]) and re.search(r"\d", c):
-                return c
-        nums = re.findall(r"\d+(?:\.\d+)?", text)
-        if nums:
-            return nums[0]
+    def _math_expr(self, text: str, candidate: str | None) -> str:
+        if candidate is not None:
+            return candidate
+        m = _NUMBER.search(text)
+        if m:
+            return m.group()
         return "0"
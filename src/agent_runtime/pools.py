@@ -0,0 +1,105 @@
+from __future__ import annotations
+import asyncio
+import contextvars
+import os
+import time
+from concurrent.futures import Executor as _PoolExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+from agent_runtime.tools.base import Tool
+
+
+def _timed(fn: Callable[[Any], Any], arguments: Any) -> tuple[float, float, Any]:
+    # Runs in the worker. perf_counter is the system-wide monotonic clock on Linux, so the
+    # start/end stamps are comparable with the submitting process.
+    started = time.perf_counter()
+    result = fn(arguments)
+    return started, time.perf_counter(), result
+
+
+class _Pool:
+    def __init__(self, kind: str, workers: int):
+        self.kind = kind
+        self.workers = workers
+        self._executor: _PoolExecutor | None = None
+        self.in_flight = 0
+        self.submitted = 0
+
+    @property
+    def executor(self) -> _PoolExecutor:
+        # Created on first use: most deployments never start a process pool.
+        if self._executor is None:
+            if self.kind == "thread":
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="agent-tool")
+            else:
+                self._executor = ProcessPoolExecutor(self.workers)
+        return self._executor
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "started": self._executor is not None,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.workers),
+            "submitted": self.submitted,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class ExecutionPools:
+    """
+    Worker pools for tools whose Tool.execution is "thread" or "process", so their
+    Tool.run_sync does not block the event loop. Process tools must be picklable.
+    """
+
+    def __init__(self, *, thread_workers: int | None = None, process_workers: int | None = None):
+        cpus = os.cpu_count() or 1
+        self._pools = {
+            "thread": _Pool("thread", thread_workers or min(32, cpus + 4)),
+            "process": _Pool("process", process_workers or cpus),
+        }
+
+    async def run(
+        self,
+        tool: Tool,
+        arguments: Any,
+        marks: dict[str, Any],
+        *,
+        fn: Callable[[Any], Any] | None = None,
+    ) -> Any:
+        """
+        Run fn(arguments) (default tool.run_sync) in the tool's pool; records queueing and
+        run time in marks.
+        """
+        fn = fn or tool.run_sync
+        pool = self._pools[tool.execution]
+        marks["pool"] = pool.kind
+        marks["pool_queue_depth"] = max(0, pool.in_flight - pool.workers)
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        if pool.kind == "thread":
+            # Threads keep the caller's context (deadline, call annotations); processes cannot.
+            ctx = contextvars.copy_context()
+            future = loop.run_in_executor(pool.executor, ctx.run, _timed, fn, arguments)
+        else:
+            future = loop.run_in_executor(pool.executor, _timed, fn, arguments)
+        pool.in_flight += 1
+        pool.submitted += 1
+        try:
+            started, finished, result = await future
+        finally:
+            pool.in_flight -= 1
+        marks["pool_queue_ms"] = round(max(0.0, started - submitted) * 1000, 3)
+        marks["run_ms"] = round((finished - started) * 1000, 3)
+        return result
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {kind: pool.stats() for kind, pool in self._pools.items()}
+
+    def shutdown(self) -> None:
+        for pool in self._pools.values():
+            pool.shutdown()
@@ -0,0 +1,153 @@
+from __future__ import annotations
+import cProfile
+import json
+import os
+import pstats
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Literal
+
+ProfileMode = Literal["cprofile", "tracemalloc"]
+_MODES = ("cprofile", "tracemalloc")
+
+
+@dataclass(frozen=True)
+class ProfilingConfig:
+    """Internal, opt-in request profiling. Everything is off by default."""
+
+    # Honour the header below ("cprofile", "tracemalloc" or "1" for default_mode).
+    allow_header: bool = False
+    header: str = "x-agent-profile"
+    # Fraction of /v1/agent/run requests profiled without the header.
+    sample_rate: float = 0.0
+    default_mode: ProfileMode = "cprofile"
+    # Summaries of non-debug requests go here (newest keep files); None drops them.
+    directory: str | None = None
+    keep: int = 20
+    # Rows in a summary.
+    top: int = 15
+
+
+class RequestProfile:
+    """One request's profile. Both profilers are process-wide, so the profiler lets one run at a time."""
+
+    def __init__(self, mode: ProfileMode, top: int):
+        self.mode = mode
+        self.top = top
+        self.started = time.perf_counter()
+        self._profile: cProfile.Profile | None = None
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._stop_tracing = False
+        if mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._stop_tracing = not tracemalloc.is_tracing()
+            if self._stop_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._snapshot = tracemalloc.take_snapshot()
+
+    def stop(self) -> dict[str, Any]:
+        """Stop profiling and summarize as a trace item."""
+        wall_ms = round((time.perf_counter() - self.started) * 1000, 3)
+        if self._profile is not None:
+            self._profile.disable()
+            rows = self._cprofile_rows(self._profile)
+        else:
+            assert self._snapshot is not None
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if self._stop_tracing:
+                tracemalloc.stop()
+            rows = [
+                {
+                    "where": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "size_kb": round(stat.size_diff / 1024, 3),
+                    "count": stat.count_diff,
+                }
+                for stat in after.compare_to(self._snapshot, "lineno")[: self.top]
+            ]
+            rows.append({"where": "peak", "size_kb": round(peak / 1024, 3), "count": None})
+        return {"type": "profile", "mode": self.mode, "wall_ms": wall_ms, "top": rows}
+
+    def _cprofile_rows(self, profile: cProfile.Profile) -> list[dict[str, Any]]:
+        stats = pstats.Stats(profile)
+        rows = []
+        for (filename, lineno, name), (_, calls, tottime, cumtime, _) in stats.stats.items():  # type: ignore[attr-defined]
+            rows.append({
+                "function": f"{filename}:{lineno}({name})",
+                "calls": calls,
+                "tot_ms": round(tottime * 1000, 3),
+                "cum_ms": round(cumtime * 1000, 3),
+            })
+        rows.sort(key=lambda r: r["cum_ms"], reverse=True)
+        return rows[: self.top]
+
+
+class Profiler:
+    """
+    Decides which requests are profiled and stores the summaries. Profiles cover the whole
+    process while they run (other requests on the loop show up too), so keep sampling rare.
+    """
+
+    def __init__(self, config: ProfilingConfig | None = None, *, rand: Callable[[], float] = random.random):
+        self.config = config or ProfilingConfig()
+        self._rand = rand
+        self._active: RequestProfile | None = None
+        self.profiled = 0
+        self.skipped_busy = 0
+        self._written = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.allow_header or self.config.sample_rate > 0
+
+    def start(self, header_value: str | None) -> RequestProfile | None:
+        """A running profile if this request should be profiled, else None."""
+        mode = self._mode(header_value)
+        if mode is None:
+            return None
+        if self._active is not None:
+            self.skipped_busy += 1
+            return None
+        self._active = RequestProfile(mode, self.config.top)
+        self.profiled += 1
+        return self._active
+
+    def finish(self, profile: RequestProfile) -> dict[str, Any]:
+        try:
+            return profile.stop()
+        finally:
+            self._active = None
+
+    def _mode(self, header_value: str | None) -> ProfileMode | None:
+        if header_value and self.config.allow_header:
+            value = header_value.strip().lower()
+            if value in _MODES:
+                return value  # type: ignore[return-value]
+            if value in ("1", "true", "yes"):
+                return self.config.default_mode
+        if self.config.sample_rate > 0 and self._rand() < self.config.sample_rate:
+            return self.config.default_mode
+        return None
+
+    def save(self, summary: dict[str, Any]) -> Path | None:
+        """Write summary to the profile directory, dropping the oldest beyond keep."""
+        if self.config.directory is None:
+            return None
+        directory = Path(self.config.directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self._written += 1
+        path = directory / f"profile-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._written:06d}.json"
+        path.write_text(json.dumps(summary, separators=(",", ":")), encoding="utf-8")
+        profiles = sorted(directory.glob("profile-*.json"), key=lambda p: (p.stat().st_mtime, p.name))
+        for old in profiles[: max(0, len(profiles) - self.config.keep)]:
+            old.unlink(missing_ok=True)
+        return path
+
+    def stats(self) -> dict[str, Any]:
+        return {"profiled": self.profiled, "skipped_busy": self.skipped_busy, "active": self._active is not None}
@@ -0,0 +1,250 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from agent_runtime.bulkhead import Bulkheads
+from agent_runtime.executor import Executor
+from agent_runtime.journal import JournalConfig, RunJournal
+from agent_runtime.loop_monitor import LoopMonitor, LoopMonitorConfig
+from agent_runtime.metrics import ApiMetrics, MetricsRegistry, Sample, ToolCallMetrics
+from agent_runtime.ollama_client import OLLAMA_BASE_URL, OllamaClient
+from agent_runtime.planner_rules import RulesPlanner
+from agent_runtime.pools import ExecutionPools
+from agent_runtime.profiling import Profiler, ProfilingConfig
+from agent_runtime.single_flight import SingleFlight
+from agent_runtime.tool_cache import ToolResultCache
+from agent_runtime.tools.http_pool import HttpClientPool, HttpPoolConfig, set_shared_http_pool, shared_http_pool
+from agent_runtime.tools.registry import ToolRegistry, build_default_registry
+from agent_runtime.tools.resilience import BreakerConfig, Resilience, RetryBudgetConfig, set_shared_resilience, shared_resilience
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    max_tool_calls: int = 10
+    # Finished RulesPlanner plans kept per process; 0 disables the cache.
+    plan_cache_size: int = 1024
+    # Applied when a request does not send deadline_ms.
+    default_deadline_ms: int = 60_000
+    max_step_concurrency: int | None = None
+    max_in_flight_calls: int | None = 512
+    # Per-tool concurrency limits; override Tool.max_concurrency by tool name.
+    tool_concurrency: dict[str, int] = field(default_factory=dict)
+    # Workers for Tool.execution "thread" / "process"; None sizes from the CPU count.
+    thread_pool_workers: int | None = None
+    process_pool_workers: int | None = None
+    http_pool: HttpPoolConfig = field(default_factory=HttpPoolConfig)
+    circuit_breaker: BreakerConfig = field(default_factory=BreakerConfig)
+    retry_budget: RetryBudgetConfig = field(default_factory=RetryBudgetConfig)
+    loop_monitor: LoopMonitorConfig = field(default_factory=LoopMonitorConfig)
+    profiling: ProfilingConfig = field(default_factory=ProfilingConfig)
+    journal: JournalConfig = field(default_factory=JournalConfig)
+    ollama_base_url: str = OLLAMA_BASE_URL
+    ollama_timeout_s: float = 30.0
+
+
+class AgentRuntime:
+    """
+    Process-lifetime container for the objects every request shares.
+    Built once by the app lifespan; anything that changes per run lives in RunContext.
+    """
+
+    def __init__(
+        self,
+        registry: ToolRegistry | None = None,
+        *,
+        config: RuntimeConfig | None = None,
+        ollama: OllamaClient | None = None,
+    ):
+        self.config = config or RuntimeConfig()
+        self.metrics = MetricsRegistry()
+        self.api_metrics = ApiMetrics(self.metrics)
+        self.http_pool = HttpClientPool(self.config.http_pool)
+        self.resilience = Resilience(self.config.circuit_breaker, self.config.retry_budget)
+        self._previous_shared: tuple[HttpClientPool | None, Resilience | None] | None = None
+        self.ollama = ollama or OllamaClient(
+            base_url=self.config.ollama_base_url,
+            timeout_s=self.config.ollama_timeout_s,
+        )
+        self.registry = registry or build_default_registry()
+        self.rules_planner = RulesPlanner(registry=self.registry, cache_size=self.config.plan_cache_size)
+        self.tool_cache = ToolResultCache()
+        self.single_flight = SingleFlight()
+        self.bulkheads = Bulkheads(
+            max_in_flight=self.config.max_in_flight_calls,
+            tool_limits=self.config.tool_concurrency,
+        )
+        self.pools = ExecutionPools(
+            thread_workers=self.config.thread_pool_workers,
+            process_workers=self.config.process_pool_workers,
+        )
+        self.executor = Executor(
+            registry=self.registry,
+            max_tool_calls=self.config.max_tool_calls,
+            cache=self.tool_cache,
+            single_flight=self.single_flight,
+            max_step_concurrency=self.config.max_step_concurrency,
+            bulkheads=self.bulkheads,
+            pools=self.pools,
+            metrics=ToolCallMetrics(self.metrics),
+        )
+        self.metrics.add_collector(self._stats_samples)
+        self.loop_monitor = LoopMonitor(self.config.loop_monitor, metrics=self.metrics)
+        self.profiler = Profiler(self.config.profiling)
+        self.journal = RunJournal(self.config.journal)
+
+        self._schemas_revision = -1
+        self._refresh_schemas()
+
+    def _refresh_schemas(self) -> None:
+        """Rebuild what is derived from the tool set when ToolRegistry.register() has changed it."""
+        if self._schemas_revision == self.registry.revision:
+            return
+        self._tool_schemas = self._build_tool_schemas()
+        self._tool_schemas_bytes = json.dumps(self._tool_schemas, separators=(",", ":")).encode("utf-8")
+        self._tool_schemas_etag = '"%s"' % hashlib.sha256(self._tool_schemas_bytes).hexdigest()[:32]
+        self._ollama_math_tool_definition = self._build_ollama_tool_definition("math")
+        self._schemas_revision = self.registry.revision
+
+    @property
+    def tool_schemas(self) -> dict[str, dict[str, Any]]:
+        self._refresh_schemas()
+        return self._tool_schemas
+
+    @property
+    def tool_schemas_bytes(self) -> bytes:
+        self._refresh_schemas()
+        return self._tool_schemas_bytes
+
+    @property
+    def tool_schemas_etag(self) -> str:
+        self._refresh_schemas()
+        return self._tool_schemas_etag
+
+    @property
+    def ollama_math_tool_definition(self) -> dict[str, Any] | None:
+        self._refresh_schemas()
+        return self._ollama_math_tool_definition
+
+    def _build_tool_schemas(self) -> dict[str, dict[str, Any]]:
+        out = {}
+        for name, tool in self.registry.tools.items():
+            out[name] = {
+                "description": getattr(tool, "description", ""),
+                "input_schema": tool.input_schema,
+                "output_schema": tool.output_schema,
+            }
+        return out
+
+    def _build_ollama_tool_definition(self, tool_name: str) -> dict[str, Any] | None:
+        if tool_name not in self.registry.tools:
+            return None
+        tool = self.registry.get(tool_name)
+        return {
+            "type": "function",
+            "function": {
+                "name": tool_name,
+                "description": tool.description,
+                "parameters": self._tool_schemas[tool_name]["input_schema"],
+            },
+        }
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "http_pool": self.http_pool.stats(),
+            "tool_cache": self.tool_cache.stats(),
+            "single_flight": self.single_flight.stats(),
+            "bulkheads": self.bulkheads.stats(),
+            "upstreams": self.resilience.stats(),
+            "pools": self.pools.stats(),
+            "loop": self.loop_monitor.stats(),
+            "profiling": self.profiler.stats(),
+            "journal": self.journal.stats(),
+        }
+
+    def _stats_samples(self) -> Iterator[Sample]:
+        """The stats() counters as metrics samples, read at scrape time."""
+        for tool, part in self.tool_cache.stats().items():
+            for key in ("hits", "misses", "evictions", "expirations", "uncacheable"):
+                yield f"agent_tool_cache_{key}_total", "counter", f"Tool result cache {key}.", {"tool": tool}, part[key]
+            yield "agent_tool_cache_entries", "gauge", "Tool result cache entries.", {"tool": tool}, part["entries"]
+            yield "agent_tool_cache_bytes", "gauge", "Tool result cache size in bytes.", {"tool": tool}, part["bytes"]
+
+        flights = self.single_flight.stats()
+        yield "agent_single_flight_in_flight", "gauge", "Coalesced calls in flight.", {}, flights["in_flight"]
+        yield "agent_single_flight_leaders_total", "counter", "Calls that ran the tool.", {}, flights["leaders"]
+        yield "agent_single_flight_followers_total", "counter", "Calls that joined one in flight.", {}, flights["followers"]
+        yield "agent_single_flight_abandoned_total", "counter", "Shared calls cancelled after every caller gave up.", {}, flights["abandoned"]
+
+        bulkheads = self.bulkheads.stats()
+        compartments = {"*": bulkheads["global"]} if bulkheads["global"] is not None else {}
+        compartments.update(bulkheads["tools"])
+        for tool, part in compartments.items():
+            labels = {"tool": tool}
+            yield "agent_bulkhead_limit", "gauge", "Bulkhead slots (tool \"*\" is the global cap).", labels, part["limit"]
+            yield "agent_bulkhead_waiting", "gauge", "Calls queued for a bulkhead slot.", labels, part["waiting"]
+            yield "agent_bulkhead_waited_total", "counter", "Calls that had to queue for a slot.", labels, part["waited"]
+            yield "agent_bulkhead_wait_seconds_total", "counter", "Time spent queued.", labels, part["wait_ms_total"] / 1000
+
+        for origin, part in self.http_pool.stats().items():
+            labels = {"origin": origin}
+            yield "agent_http_connections_in_use", "gauge", "Pooled connections in use.", labels, part["in_use"]
+            if part["idle"] is not None:
+                yield "agent_http_connections_idle", "gauge", "Idle pooled connections.", labels, part["idle"]
+            yield "agent_http_requests_total", "counter", "Requests sent through the pool.", labels, part["requests"]
+            yield "agent_http_pool_wait_seconds_total", "counter", "Time spent waiting for a connection.", labels, part["wait_ms_total"] / 1000
+
+        upstreams = self.resilience.stats()
+        for origin, part in upstreams["breakers"].items():
+            labels = {"origin": origin}
+            yield "agent_circuit_open", "gauge", "1 while the origin's breaker is not closed.", labels, int(part["state"] != "closed")
+            yield "agent_circuit_rejected_total", "counter", "Calls failed fast by an open breaker.", labels, part["rejected"]
+            for edge, count in part["transitions"].items():
+                source, target = edge.split("->")
+                labels_edge = {**labels, "from": source, "to": target}
+                yield "agent_circuit_transitions_total", "counter", "Breaker state changes.", labels_edge, count
+        budget = upstreams["retry_budget"]
+        yield "agent_retry_budget_rejected_total", "counter", "Retries refused by the retry budget.", {}, budget["rejected"]
+
+        for kind, part in self.pools.stats().items():
+            labels = {"pool": kind}
+            yield "agent_pool_in_flight", "gauge", "Calls submitted to a worker pool and not finished.", labels, part["in_flight"]
+            yield "agent_pool_queued", "gauge", "Calls waiting for a pool worker.", labels, part["queued"]
+            yield "agent_pool_submitted_total", "counter", "Calls submitted to a worker pool.", labels, part["submitted"]
+
+        if self.journal.enabled:
+            journal = self.journal.stats()
+            yield "agent_journal_records_total", "counter", "Runs written to the run journal.", {}, journal["written"]
+            yield "agent_journal_dropped_total", "counter", "Runs dropped because the journal queue was full.", {}, journal["dropped"]
+            yield "agent_journal_failed_total", "counter", "Runs lost to journal write errors.", {}, journal["failed"]
+            yield "agent_journal_queued", "gauge", "Runs waiting for the journal writer.", {}, journal["queued"]
+            yield "agent_journal_bytes", "gauge", "Size of the journal segments on disk.", {}, journal["bytes"]
+
+    def start(self) -> None:
+        """
+        Start the background work: the loop monitor (needs the running loop) and the run journal.
+        Also makes this runtime's HTTP pool and breakers the process-wide ones that HttpTools
+        built without their own use, until aclose() puts the previous ones back.
+        """
+        self.loop_monitor.start()
+        self.journal.start()
+        if self._previous_shared is None:
+            self._previous_shared = (set_shared_http_pool(self.http_pool), set_shared_resilience(self.resilience))
+
+    async def aclose(self) -> None:
+        """Release shared resources. Safe to call more than once."""
+        await self.loop_monitor.stop()
+        if self._previous_shared is not None:
+            pool, resilience = self._previous_shared
+            self._previous_shared = None
+            # A runtime started after this one keeps what it installed.
+            if shared_http_pool() is self.http_pool:
+                set_shared_http_pool(pool)
+            if shared_resilience() is self.resilience:
+                set_shared_resilience(resilience)
+        await asyncio.to_thread(self.journal.close)
+        await self.http_pool.aclose()
+        await self.ollama.aclose()
+        self.pools.shutdown()
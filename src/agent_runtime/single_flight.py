@@ -0,0 +1,110 @@
+from __future__ import annotations
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from agent_runtime.call_context import reset_deadline, set_deadline
+
+
+class Flight:
+    """One call in flight for a key, plus the deadlines of the callers waiting on it."""
+
+    future: asyncio.Future[Any]
+
+    def __init__(self, owner: SingleFlight, key: str) -> None:
+        self._owner = owner
+        self.key = key
+        self._deadlines: list[float | None] = []
+
+    def deadline(self) -> float | None:
+        """The latest waiter's deadline (None while any waiter is unbounded). Started flights run under it."""
+        if not self._deadlines or None in self._deadlines:
+            return None
+        return max(self._deadlines)  # type: ignore[type-var]
+
+    async def wait(self, deadline: float | None) -> Any:
+        """Await the shared result as one waiter. The last waiter to give up cancels a started flight."""
+        self._deadlines.append(deadline)
+        try:
+            return await asyncio.shield(self.future)
+        finally:
+            self._deadlines.remove(deadline)
+            if not self._deadlines and not self.future.done():
+                self._owner._abandon(self)
+
+
+class SingleFlight:
+    """
+    Request coalescing for idempotent tool calls.
+    Concurrent callers that join with the same key share one underlying task; its result
+    or exception is delivered to every waiter. The key is forgotten as soon as the task
+    finishes, so this never serves stale data (that is the result cache's job). The task runs
+    under the latest waiting caller's deadline and is cancelled once every caller has given up.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, Flight] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.abandoned = 0
+
+    def join(self, key: str, start: Callable[[], Awaitable[Any]]) -> tuple[Flight, bool]:
+        """Return (flight, joined_existing). Await the result with Flight.wait(caller's deadline)."""
+        flight = self.follow(key)
+        if flight is not None:
+            return flight, True
+        flight = Flight(self, key)
+        self._register(flight, asyncio.ensure_future(self._run(flight, start)))
+        return flight, False
+
+    def follow(self, key: str) -> Flight | None:
+        """The flight in progress for key, if any (counted as a follower)."""
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.followers += 1
+        return flight
+
+    def lead(self, key: str, future: asyncio.Future[Any]) -> Flight:
+        """
+        Register a future the caller completes itself (e.g. one item of a batch) as key's flight.
+        Such a flight belongs to its caller: it is not cancelled when its followers give up.
+        """
+        flight = Flight(self, key)
+        self._register(flight, future)
+        return flight
+
+    def _register(self, flight: Flight, future: asyncio.Future[Any]) -> None:
+        flight.future = future
+        self._inflight[flight.key] = flight
+        self.leaders += 1
+        future.add_done_callback(lambda done: self._forget(flight))
+
+    @staticmethod
+    async def _run(flight: Flight, start: Callable[[], Awaitable[Any]]) -> Any:
+        token = set_deadline(flight.deadline)
+        try:
+            return await start()
+        finally:
+            reset_deadline(token)
+
+    def _forget(self, flight: Flight) -> None:
+        if self._inflight.get(flight.key) is flight:
+            del self._inflight[flight.key]
+        if not flight.future.cancelled():
+            flight.future.exception()  # mark retrieved even if every waiter was cancelled
+
+    def _abandon(self, flight: Flight) -> None:
+        if not isinstance(flight.future, asyncio.Task):
+            return
+        # Forgotten first: a caller arriving now starts a fresh flight instead of joining a cancelled one.
+        if self._inflight.get(flight.key) is flight:
+            del self._inflight[flight.key]
+        flight.future.cancel()
+        self.abandoned += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "abandoned": self.abandoned,
+        }
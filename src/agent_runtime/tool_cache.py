@@ -0,0 +1,96 @@
+from __future__ import annotations
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from agent_runtime.canonical import canonical_json
+from agent_runtime.tools.base import CachePolicy
+
+
+@dataclass
+class _Entry:
+    expires_at: float
+    value: dict[str, Any]
+    size: int
+
+
+class _ToolCache:
+    def __init__(self) -> None:
+        self.entries: OrderedDict[str, _Entry] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.uncacheable = 0
+
+    def drop(self, key: str) -> None:
+        entry = self.entries.pop(key)
+        self.bytes -= entry.size
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "uncacheable": self.uncacheable,
+        }
+
+
+class ToolResultCache:
+    """
+    In-process TTL + LRU cache of successful tool results, partitioned per tool.
+    Keys are canonical (tool, arguments) strings; limits come from each tool's CachePolicy.
+    Cached values are shared between runs and must be treated as read-only.
+    """
+
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._tools: dict[str, _ToolCache] = {}
+
+    def _partition(self, tool_name: str) -> _ToolCache:
+        part = self._tools.get(tool_name)
+        if part is None:
+            part = self._tools[tool_name] = _ToolCache()
+        return part
+
+    def get(self, tool_name: str, key: str) -> dict[str, Any] | None:
+        part = self._partition(tool_name)
+        entry = part.entries.get(key)
+        if entry is None:
+            part.misses += 1
+            return None
+        if entry.expires_at <= self._clock():
+            part.drop(key)
+            part.expirations += 1
+            part.misses += 1
+            return None
+        part.entries.move_to_end(key)
+        part.hits += 1
+        return entry.value
+
+    def put(self, tool_name: str, policy: CachePolicy, key: str, value: dict[str, Any]) -> None:
+        try:
+            size = len(canonical_json(value))
+        except (TypeError, ValueError):
+            # Not JSON-encodable (a datetime, a set, a cycle): the call still succeeded, it is just not cached.
+            self._partition(tool_name).uncacheable += 1
+            return
+        if size > policy.max_bytes or policy.max_entries <= 0:
+            return
+        part = self._partition(tool_name)
+        if key in part.entries:
+            part.drop(key)
+        part.entries[key] = _Entry(expires_at=self._clock() + policy.ttl_s, value=value, size=size)
+        part.bytes += size
+        while len(part.entries) > policy.max_entries or part.bytes > policy.max_bytes:
+            oldest = next(iter(part.entries))
+            part.drop(oldest)
+            part.evictions += 1
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {name: part.stats() for name, part in self._tools.items()}
@@ -1,10 +1,32 @@
 from __future__ import annotations
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from dataclasses import dataclass
+from typing import Any, Dict, Literal
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Per-tool result cache policy. Only declare it on tools whose output depends on arguments alone."""
+    ttl_s: float
+    max_entries: int = 1024
+    max_bytes: int = 1_048_576
 
 class Tool(ABC):
     name: str
     description: str
+    cache_policy: CachePolicy | None = None
+    # Same arguments => same effect and result; allows coalescing concurrent identical calls.
+    idempotent: bool = False
+    # Process-wide cap on concurrent runs of this tool (None: only the global cap applies).
+    max_concurrency: int | None = None
+    # Where the executor runs the tool: "async" awaits run() on the event loop; "thread" and
+    # "process" call run_sync() in the runtime's worker pools so CPU-bound work does not block it.
+    execution: Literal["async", "thread", "process"] = "async"
+    # The executor hands two or more calls to this tool within one parallel step to run_many()
+    # (or run_many_sync() in a worker pool) as a single invocation.
+    batchable: bool = False
+    # Keywords (case-insensitive, matched anywhere in the input) that make RulesPlanner call this tool.
+    triggers: tuple[str, ...] = ()
 
     @property
     def input_schema(self) -> Dict[str, Any]:
@@ -16,11 +38,37 @@ class Tool(ABC):
         """JSON Schema for tool outputs (best-effort). Override when available."""
         return {"type": "object"}
 
+    def plan_arguments(self, text: str) -> dict[str, Any]:
+        """Arguments for a call RulesPlanner plans because one of this tool's triggers matched text."""
+        return {"input": text}
+
     @abstractmethod
     async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
         raise NotImplementedError
 
+    def run_sync(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        """Blocking implementation used when execution is "thread" or "process"."""
+        raise NotImplementedError(f"{type(self).__name__} declares execution={self.execution!r} but no run_sync")
+
+    async def run_many(self, arguments: list[dict[str, Any]]) -> list[dict[str, Any] | Exception]:
+        """One result, or the exception that call raised, per item and in order. Default: run() each concurrently."""
+        return list(await asyncio.gather(*(self.run(a) for a in arguments), return_exceptions=True))
+
+    def run_many_sync(self, arguments: list[dict[str, Any]]) -> list[dict[str, Any] | Exception]:
+        """Blocking run_many for "thread"/"process" tools. Default: run_sync() each in turn."""
+        out: list[dict[str, Any] | Exception] = []
+        for a in arguments:
+            try:
+                out.append(self.run_sync(a))
+            except Exception as e:
+                out.append(e)
+        return out
+
 class ToolError(Exception):
     def __init__(self, message: str, *, code: str = "tool_error"):
         super().__init__(message)
         self.code = code
+
+    def __reduce__(self):
+        # Keep the code when a process-pool worker sends the error back.
+        return (type(self), (str(self),), self.__dict__)
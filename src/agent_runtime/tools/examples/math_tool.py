@@ -1,10 +1,15 @@
 from __future__ import annotations
 import ast
+import math
 import operator as op
-from typing import Any, Dict
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict
 from pydantic import BaseModel, Field, ValidationError
 
-from agent_runtime.tools.base import Tool, ToolError
+from agent_runtime.tools.base import CachePolicy, Tool, ToolError
+from agent_runtime.tools.validation import type_adapter, validate_arguments
 
 _ALLOWED = {
     ast.Add: op.add,
@@ -15,6 +20,9 @@ _ALLOWED = {
     ast.USub: op.neg,
 }
 
+class _OverBudget(Exception):
+    pass
+
 class MathToolInput(BaseModel):
     expression: str = Field(
         ...,
@@ -30,6 +38,30 @@ class MathToolOutput(BaseModel):
 class MathTool(Tool):
     name = "math"
     description = "Evaluates a safe arithmetic expression."
+    cache_policy = CachePolicy(ttl_s=3600.0, max_entries=4096)
+    idempotent = True
+    execution = "thread"
+    batchable = True
+
+    def __init__(
+        self,
+        *,
+        max_nodes: int = 100,
+        max_depth: int = 32,
+        max_result_digits: int = 308,
+        max_eval_ms: float = 50.0,
+        cache_size: int = 512,
+    ):
+        # Budgets: expressions beyond them fail with code "budget_exceeded" instead of hogging the loop.
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        # Anything past float range (~1e308) cannot be returned anyway.
+        self.max_result_digits = max_result_digits
+        self.max_eval_s = max_eval_ms / 1000
+        self.cache_size = cache_size
+        # Compiled evaluators by expression, least recently used first.
+        self._compiled: OrderedDict[str, Callable[[float], Any]] = OrderedDict()
+        self._compiled_lock = threading.Lock()
 
     @property
     def input_schema(self) -> Dict[str, Any]:
@@ -40,27 +72,130 @@ class MathTool(Tool):
         return MathToolOutput.model_json_schema()
 
     async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
-        try:
-            inputs = MathToolInput(**arguments)
-        except ValidationError as e:
-            raise ToolError(f"Invalid input: {e.errors()}", code="bad_input")
+        return self.run_sync(arguments)
+
+    async def run_many(self, arguments: list[dict[str, Any]]) -> list[dict[str, Any] | Exception]:
+        # Pure CPU: one pass over the batch beats a coroutine per expression.
+        return self.run_many_sync(arguments)
 
-        expr = inputs.expression.strip().replace("^", "**")
+    def run_sync(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        expr = self._expression(arguments)
         try:
-            value = float(self._eval(expr))
-            return MathToolOutput(result=value).model_dump()
+            # Already the MathToolOutput shape; no need to build the model just to dump it.
+            return {"result": float(self._eval(expr))}
         except Exception as e:
-            raise ToolError(f"Invalid expression: {e}", code="bad_input")
+            raise self._error(e) from e
+
+    def run_many_sync(self, arguments: list[dict[str, Any]]) -> list[dict[str, Any] | Exception]:
+        """
+        One pass over the batch: validate everything, resolve every distinct expression's
+        evaluator under a single cache lookup (compiling the misses once), then evaluate
+        each distinct expression once.
+        """
+        exprs: list[str | Exception] = []
+        try:
+            # One validator call for the whole batch; per item only to pin down which one failed.
+            inputs = type_adapter(list[MathToolInput]).validate_python(arguments)
+            exprs.extend(i.expression.strip().replace("^", "**") for i in inputs)
+        except ValidationError:
+            for a in arguments:
+                try:
+                    exprs.append(self._expression(a))
+                except ToolError as e:
+                    exprs.append(e)
+        distinct = {e for e in exprs if isinstance(e, str)}
+        evaluators: dict[str, Callable[[float], Any] | Exception] = {}
+        with self._compiled_lock:
+            for expr in distinct:
+                evaluate = self._compiled.get(expr)
+                if evaluate is not None:
+                    self._compiled.move_to_end(expr)
+                    evaluators[expr] = evaluate
+        compiled = {}
+        for expr in distinct - evaluators.keys():
+            try:
+                compiled[expr] = evaluators[expr] = self._compile(expr)
+            except Exception as e:
+                evaluators[expr] = e
+        if compiled:
+            with self._compiled_lock:
+                self._compiled.update(compiled)
+                while len(self._compiled) > self.cache_size:
+                    self._compiled.popitem(last=False)
+
+        results: dict[str, dict[str, Any] | Exception] = {}
+        for expr in distinct:
+            evaluate = evaluators[expr]
+            if isinstance(evaluate, Exception):
+                results[expr] = self._error(evaluate)
+                continue
+            try:
+                results[expr] = {"result": float(evaluate(time.perf_counter() + self.max_eval_s))}
+            except Exception as e:
+                results[expr] = self._error(e)
+        return [e if isinstance(e, Exception) else results[e] for e in exprs]
+
+    @staticmethod
+    def _expression(arguments: dict[str, Any]) -> str:
+        inputs = validate_arguments(MathToolInput, arguments)
+        return inputs.expression.strip().replace("^", "**")
+
+    @staticmethod
+    def _error(e: Exception) -> ToolError:
+        if isinstance(e, _OverBudget):
+            return ToolError(f"Expression too expensive: {e}", code="budget_exceeded")
+        return ToolError(f"Invalid expression: {e}", code="bad_input")
 
     def _eval(self, expr: str) -> float:
+        with self._compiled_lock:
+            evaluate = self._compiled.get(expr)
+            if evaluate is not None:
+                self._compiled.move_to_end(expr)
+        if evaluate is None:
+            evaluate = self._compile(expr)
+            with self._compiled_lock:
+                self._compiled[expr] = evaluate
+                if len(self._compiled) > self.cache_size:
+                    self._compiled.popitem(last=False)
+        return float(evaluate(time.perf_counter() + self.max_eval_s))
+
+    def _compile(self, expr: str) -> Callable[[float], Any]:
+        """Parse and budget-check expr once; returns evaluate(deadline) -> number."""
         node = ast.parse(expr, mode="eval").body
-        return float(self._eval_node(node))
-
-    def _eval_node(self, node):
-        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
-            return node.value
-        if isinstance(node, ast.BinOp) and type(node.op) in _ALLOWED:
-            return _ALLOWED[type(node.op)](self._eval_node(node.left), self._eval_node(node.right))
-        if isinstance(node, ast.UnaryOp) and type(node.op) in _ALLOWED:
-            return _ALLOWED[type(node.op)](self._eval_node(node.operand))
-        raise ValueError("Unsupported operation")
+        nodes = 0
+
+        def build(node: ast.AST, depth: int) -> Callable[[float], Any]:
+            nonlocal nodes
+            nodes += 1
+            if nodes > self.max_nodes:
+                raise _OverBudget(f"more than {self.max_nodes} nodes")
+            if depth > self.max_depth:
+                raise _OverBudget(f"nested deeper than {self.max_depth}")
+            if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+                value = node.value
+                return lambda deadline: value
+            if isinstance(node, ast.BinOp) and type(node.op) in _ALLOWED:
+                fn = self._power if isinstance(node.op, ast.Pow) else _ALLOWED[type(node.op)]
+                left, right = build(node.left, depth + 1), build(node.right, depth + 1)
+
+                def binop(deadline: float) -> Any:
+                    a, b = left(deadline), right(deadline)
+                    if time.perf_counter() > deadline:
+                        raise _OverBudget(f"took longer than {self.max_eval_s * 1000:g} ms")
+                    return fn(a, b)
+
+                return binop
+            if isinstance(node, ast.UnaryOp) and type(node.op) in _ALLOWED:
+                fn = _ALLOWED[type(node.op)]
+                operand = build(node.operand, depth + 1)
+                return lambda deadline: fn(operand(deadline))
+            raise ValueError("Unsupported operation")
+
+        return build(node, 0)
+
+    def _power(self, base: Any, exponent: Any) -> Any:
+        # Estimate the result's size before computing it: 9^9^9 would otherwise grind through
+        # a ~370-million-digit integer on the event loop.
+        if base != 0 and exponent * math.log10(abs(base)) > self.max_result_digits:
+            raise _OverBudget(f"result would exceed 10^{self.max_result_digits}")
+        return op.pow(base, exponent)
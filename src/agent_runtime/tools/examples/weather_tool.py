@@ -1,8 +1,12 @@
 from __future__ import annotations
+import re
 from typing import Any, Dict
-from pydantic import BaseModel, Field, ValidationError
+from pydantic import BaseModel, Field
 
-from agent_runtime.tools.base import Tool, ToolError
+from agent_runtime.tools.base import CachePolicy, Tool
+from agent_runtime.tools.validation import validate_arguments
+
+_CITY = re.compile(r"(?:weather|forecast|temperature)\s+(?:in|for)\s+([A-Za-z .'-]+)", flags=re.IGNORECASE)
 
 class WeatherToolInput(BaseModel):
     location: str = Field(..., min_length=1, max_length=120)
@@ -14,6 +18,13 @@ class WeatherToolOutput(BaseModel):
 class WeatherTool(Tool):
     name = "weather"
     description = "Stub weather tool. Replace with a real API adapter."
+    cache_policy = CachePolicy(ttl_s=300.0, max_entries=2048)
+    idempotent = True
+    triggers = ("weather", "forecast", "temperature")
+
+    def plan_arguments(self, text: str) -> dict[str, Any]:
+        m = _CITY.search(text)
+        return {"location": (m.group(1).strip() if m else None) or "San Francisco"}
 
     @property
     def input_schema(self) -> Dict[str, Any]:
@@ -24,10 +35,7 @@ class WeatherTool(Tool):
         return WeatherToolOutput.model_json_schema()
 
     async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
-        try:
-            inputs = WeatherToolInput(**arguments)
-        except ValidationError as e:
-            raise ToolError(f"Invalid input: {e.errors()}", code="bad_input")
+        inputs = validate_arguments(WeatherToolInput, arguments)
 
         # Replace with a real API call.
-        return WeatherToolOutput(location=inputs.location.strip(), summary="Stub: 72F, clear skies.").model_dump()
+        return {"location": inputs.location.strip(), "summary": "Stub: 72F, clear skies."}
@@ -1,8 +1,9 @@
 from __future__ import annotations
 from typing import Any, Dict, List
-from pydantic import BaseModel, Field, ValidationError
+from pydantic import BaseModel, Field
 
-from agent_runtime.tools.base import Tool, ToolError
+from agent_runtime.tools.base import CachePolicy, Tool
+from agent_runtime.tools.validation import validate_arguments
 
 class WebSearchToolInput(BaseModel):
     query: str = Field(..., min_length=1, max_length=300)
@@ -18,6 +19,8 @@ class WebSearchToolOutput(BaseModel):
 class WebSearchTool(Tool):
     name = "web_search"
     description = "Stub search tool. Replace with a real search provider."
+    cache_policy = CachePolicy(ttl_s=60.0, max_entries=2048, max_bytes=8 * 1_048_576)
+    idempotent = True
 
     @property
     def input_schema(self) -> Dict[str, Any]:
@@ -28,12 +31,6 @@ class WebSearchTool(Tool):
         return WebSearchToolOutput.model_json_schema()
 
     async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
-        try:
-            inputs = WebSearchToolInput(**arguments)
-        except ValidationError as e:
-            raise ToolError(f"Invalid input: {e.errors()}", code="bad_input")
-
-        return WebSearchToolOutput(
-            query=inputs.query.strip(),
-            results=[WebSearchItem(title="Stub result", snippet=f"Search results for: {inputs.query.strip()}")],
-        ).model_dump()
+        inputs = validate_arguments(WebSearchToolInput, arguments)
+        query = inputs.query.strip()
+        return {"query": query, "results": [{"title": "Stub result", "snippet": f"Search results for: {query}"}]}
@@ -0,0 +1,201 @@
+from __future__ import annotations
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+from urllib.parse import urlsplit
+
+import httpcore
+import httpx
+
+
+def origin(url: str) -> str:
+    """scheme://host[:port] of url; the unit HttpTool state is shared and limited by."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+@dataclass(frozen=True)
+class HttpPoolConfig:
+    max_connections_per_host: int = 20
+    max_keepalive_per_host: int = 10
+    keepalive_expiry_s: float = 30.0
+    http2: bool = False  # requires the optional `h2` package (pip install agent-runtime[http2])
+    # With http2, each connection carries up to this many concurrent requests (streams).
+    http2_streams_per_connection: int = 100
+
+    @property
+    def max_requests_per_host(self) -> int:
+        """Concurrent requests per origin: one per connection, or one per stream over HTTP/2."""
+        if self.http2:
+            return self.max_connections_per_host * self.http2_streams_per_connection
+        return self.max_connections_per_host
+
+
+# httpcore raises its own exception types; HttpTool and callers expect httpx's, which share the names.
+_HTTPCORE_ERRORS = (
+    httpcore.TimeoutException,
+    httpcore.NetworkError,
+    httpcore.ProtocolError,
+    httpcore.ProxyError,
+    httpcore.UnsupportedProtocol,
+)
+
+
+def _httpx_error(exc: Exception, request: httpx.Request) -> httpx.TransportError:
+    error_type = getattr(httpx, type(exc).__name__, None)
+    if not (isinstance(error_type, type) and issubclass(error_type, httpx.TransportError)):
+        error_type = httpx.TransportError
+    return error_type(str(exc) or type(exc).__name__, request=request)
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream: Any, request: httpx.Request) -> None:
+        self._stream = stream
+        self._request = request
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            async for part in self._stream:
+                yield part
+        except _HTTPCORE_ERRORS as exc:
+            raise _httpx_error(exc, self._request) from exc
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+
+class _PoolTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport over an httpcore connection pool we hold ourselves, so the pool's
+    public connection list can be read for stats (httpx keeps its own pool private).
+    """
+
+    def __init__(self, config: HttpPoolConfig) -> None:
+        self.pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=config.max_connections_per_host,
+            max_keepalive_connections=config.max_keepalive_per_host,
+            keepalive_expiry=config.keepalive_expiry_s,
+            http2=config.http2,
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        try:
+            response = await self.pool.handle_async_request(core_request)
+        except _HTTPCORE_ERRORS as exc:
+            raise _httpx_error(exc, request) from exc
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_ResponseStream(response.stream, request),
+            extensions=response.extensions,
+        )
+
+    def idle_connections(self) -> int:
+        return sum(1 for connection in self.pool.connections if connection.is_idle())
+
+    async def aclose(self) -> None:
+        await self.pool.aclose()
+
+
+class _HostPool:
+    def __init__(self, origin: str, config: HttpPoolConfig, transport: httpx.AsyncBaseTransport | None):
+        self.origin = origin
+        self.transport = transport or _PoolTransport(config)
+        self.client = httpx.AsyncClient(transport=self.transport)
+        # Mirrors the transport's request capacity so queueing is observable from here.
+        self.slots = asyncio.Semaphore(config.max_requests_per_host)
+        self.in_use = 0
+        self.requests = 0
+        self.waited = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "in_use": self.in_use,
+            # Keep-alive connections ready for reuse; None for a transport passed in from outside.
+            "idle": self.transport.idle_connections() if isinstance(self.transport, _PoolTransport) else None,
+            "requests": self.requests,
+            "waited": self.waited,
+            "wait_ms_total": round(self.wait_ms_total, 3),
+            "wait_ms_max": round(self.wait_ms_max, 3),
+        }
+
+
+class HttpClientPool:
+    """
+    Keep-alive httpx clients shared by every HttpTool, one per upstream origin.
+    Each origin gets its own connection limit so one slow host cannot starve the others.
+    """
+
+    def __init__(self, config: HttpPoolConfig | None = None, *, transport: httpx.AsyncBaseTransport | None = None):
+        self.config = config or HttpPoolConfig()
+        self._transport = transport
+        self._hosts: dict[str, _HostPool] = {}
+
+    def _host(self, url: str) -> _HostPool:
+        key = origin(url)
+        host = self._hosts.get(key)
+        if host is None:
+            host = self._hosts[key] = _HostPool(key, self.config, self._transport)
+        return host
+
+    @asynccontextmanager
+    async def client(self, url: str) -> AsyncIterator[httpx.AsyncClient]:
+        """Borrow the pooled client for url's origin, holding one connection slot."""
+        host = self._host(url)
+        if host.slots.locked():
+            host.waited += 1
+        started = time.perf_counter()
+        await host.slots.acquire()
+        waited_ms = (time.perf_counter() - started) * 1000
+        host.requests += 1
+        host.wait_ms_total += waited_ms
+        host.wait_ms_max = max(host.wait_ms_max, waited_ms)
+        host.in_use += 1
+        try:
+            yield host.client
+        finally:
+            host.in_use -= 1
+            host.slots.release()
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {origin: host.stats() for origin, host in self._hosts.items()}
+
+    async def aclose(self) -> None:
+        hosts, self._hosts = self._hosts, {}
+        for host in hosts.values():
+            await host.client.aclose()
+
+
+_shared_pool: HttpClientPool | None = None
+
+
+def shared_http_pool() -> HttpClientPool:
+    """The process-wide pool HttpTools use unless given one explicitly."""
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = HttpClientPool()
+    return _shared_pool
+
+
+def set_shared_http_pool(pool: HttpClientPool | None) -> HttpClientPool | None:
+    """Install pool as the process-wide one; returns the previous pool so it can be restored."""
+    global _shared_pool
+    previous, _shared_pool = _shared_pool, pool
+    return previous
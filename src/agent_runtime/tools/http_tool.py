@@ -1,29 +1,136 @@
 from __future__ import annotations
-from typing import Any
+from typing import Any, Callable
+import asyncio
 import json
+import time
 import httpx
+from pydantic import ValidationError
 
-from agent_runtime.tools.base import Tool, ToolError
+from agent_runtime.call_context import annotate_call, remaining_s
+from agent_runtime.latency import LatencySketch
+from agent_runtime.tools.base import CachePolicy, Tool, ToolError
+from agent_runtime.tools.http_pool import HttpClientPool, shared_http_pool
+from agent_runtime.tools.resilience import CircuitBreaker, Permit, Resilience, backoff_s, shared_resilience
+from agent_runtime.tools.validation import json_decoder, type_adapter
+
+Decode = Callable[[bytes], Any]
 
 class HttpTool(Tool):
-    def __init__(self, *, name: str, description: str, url: str, timeout_s: float = 10.0, retries: int = 1):
+    def __init__(
+        self,
+        *,
+        name: str,
+        description: str,
+        url: str,
+        timeout_s: float = 10.0,
+        retries: int = 1,
+        pool: HttpClientPool | None = None,
+        cache_policy: CachePolicy | None = None,
+        idempotent: bool = False,
+        max_concurrency: int | None = None,
+        min_attempt_s: float = 0.05,
+        backoff_base_s: float = 0.05,
+        backoff_cap_s: float = 1.0,
+        resilience: Resilience | None = None,
+        hedge: bool = False,
+        adaptive_timeout: bool = False,
+        min_timeout_s: float = 0.25,
+        timeout_multiplier: float = 3.0,
+        bulk_url: str | None = None,
+        output_model: Any = None,
+    ):
         self.name = name
         self.description = description
         self.url = url
         self.timeout_s = float(timeout_s)
         self.retries = max(0, int(retries))
+        self._pool = pool
+        self.cache_policy = cache_policy
+        self.idempotent = idempotent
+        self.max_concurrency = max_concurrency
+        # An attempt is not started when less than this much of the run deadline is left.
+        self.min_attempt_s = float(min_attempt_s)
+        self.backoff_base_s = float(backoff_base_s)
+        self.backoff_cap_s = float(backoff_cap_s)
+        self._resilience = resilience
+        # Hedging re-sends a request, so it is only honoured for idempotent tools.
+        self.hedge = hedge
+        # With adaptive_timeout, each attempt waits timeout_multiplier * observed p99
+        # (never less than min_timeout_s); timeout_s stays the ceiling. Timed-out attempts count
+        # as samples at their timeout, and each consecutive timeout doubles the next one, so a
+        # slower upstream raises the timeout instead of failing every attempt. Breaker probes
+        # always get timeout_s.
+        self.adaptive_timeout = adaptive_timeout
+        self.min_timeout_s = float(min_timeout_s)
+        self.timeout_multiplier = float(timeout_multiplier)
+        self.latency = LatencySketch()
+        self._timeout_streak = 0
+        # Upstream endpoint taking a JSON array of argument objects and answering with a JSON
+        # array of results in the same order; when set, the executor batches calls into it.
+        self.bulk_url = bulk_url
+        self.batchable = bulk_url is not None
+        self._bulk_latency = LatencySketch()
+        # Pydantic model (or any type) the response body must match. Bodies are validated
+        # straight from bytes; without a model they are only parsed as JSON.
+        self.output_model = output_model
+        self._decode = json_decoder(output_model)
+        self._decode_bulk = json_decoder(None if output_model is None else list[output_model])
+
+    @property
+    def output_schema(self) -> dict[str, Any]:
+        if self.output_model is None:
+            return super().output_schema
+        return type_adapter(self.output_model).json_schema()
+
+    @property
+    def pool(self) -> HttpClientPool:
+        return self._pool or shared_http_pool()
+
+    @property
+    def resilience(self) -> Resilience:
+        return self._resilience or shared_resilience()
 
     async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        return await self._request(self.url, arguments, self.latency, self._decode)
+
+    async def run_many(self, arguments: list[dict[str, Any]]) -> list[dict[str, Any] | Exception]:
+        if self.bulk_url is None:
+            return await super().run_many(arguments)
+        out = await self._request(self.bulk_url, arguments, self._bulk_latency, self._decode_bulk)
+        if not isinstance(out, list) or len(out) != len(arguments):
+            raise ToolError(f"Bulk response must be a list of {len(arguments)} results", code="http_invalid_response")
+        return out
+
+    async def _request(self, url: str, payload: Any, latency: LatencySketch, decode: Decode) -> Any:
+        """POST payload to url with retries, backoff, the circuit breaker and hedging."""
+        guard = self.resilience
+        breaker = guard.breaker(url)
+        guard.retry_budget.record_request()
+        hedging = {"hedges": 0, "hedge_wins": 0}
         last_err: Exception | None = None
         for attempt in range(self.retries + 1):
+            if attempt:
+                if not guard.retry_budget.try_retry():
+                    annotate_call(attempts=attempt, retry_budget_exhausted=True)
+                    raise ToolError(f"HTTP failed, retry budget exhausted: {last_err}", code="http_retry_exhausted")
+                delay = backoff_s(attempt, base_s=self.backoff_base_s, cap_s=self.backoff_cap_s)
+                remaining = remaining_s()
+                if remaining is not None and remaining < delay + self.min_attempt_s:
+                    annotate_call(attempts=attempt)
+                    raise ToolError(f"Deadline exceeded after {attempt} attempt(s): {last_err}", code="deadline_exceeded")
+                await asyncio.sleep(delay)
+            remaining = remaining_s()
+            if remaining is not None and remaining < self.min_attempt_s:
+                detail = f" after {attempt} attempt(s): {last_err}" if attempt else ""
+                raise ToolError(f"Deadline exceeded{detail}", code="deadline_exceeded")
+            permit = breaker.acquire()
+            if permit is None:
+                annotate_call(attempts=attempt)
+                raise ToolError(f"Circuit open for {breaker.name}", code="circuit_open")
+            annotate_call(attempts=attempt + 1)
             try:
-                async with httpx.AsyncClient(timeout=self.timeout_s) as client:
-                    r = await client.post(self.url, json=arguments)
-                    r.raise_for_status()
-                    try:
-                        return r.json()
-                    except json.JSONDecodeError as e:
-                        raise ToolError(f"Invalid JSON response: {e}", code="http_invalid_response")
+                timeout = self._attempt_timeout(remaining, latency, probe=permit.probe)
+                return await self._attempt(url, payload, timeout, breaker, permit, hedging, latency, decode)
             except httpx.TimeoutException as e:
                 last_err = e
             except ToolError as e:
@@ -38,3 +145,123 @@ class HttpTool(Tool):
                 last_err = e
 
         raise ToolError(f"HTTP failed after retries: {last_err}", code="http_retry_exhausted")
+
+    def _attempt_timeout(
+        self, remaining: float | None, latency: LatencySketch | None = None, *, probe: bool = False
+    ) -> float:
+        timeout = self.timeout_s
+        if self.adaptive_timeout and not probe:
+            p99 = (latency or self.latency).quantile(0.99)
+            if p99 is not None:
+                adaptive = max(self.min_timeout_s, p99 * self.timeout_multiplier) * 2 ** self._timeout_streak
+                timeout = min(timeout, adaptive)
+        return timeout if remaining is None else min(timeout, remaining)
+
+    async def _attempt(
+        self,
+        url: str,
+        payload: Any,
+        timeout: float,
+        breaker: CircuitBreaker,
+        permit: Permit,
+        hedging: dict[str, int],
+        latency: LatencySketch,
+        decode: Decode,
+    ) -> Any:
+        """
+        One attempt. A hedged tool that has not heard back by its p95 sends a second copy
+        and takes whichever succeeds first; the loser is cancelled.
+        """
+        delay = latency.quantile(0.95) if self.hedge and self.idempotent else None
+        if delay is None or delay >= timeout:
+            return await self._send(url, payload, timeout, breaker, permit, latency, decode)
+
+        primary = asyncio.ensure_future(self._send(url, payload, timeout, breaker, permit, latency, decode))
+        hedge: asyncio.Future | None = None
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                # A hedge is extra load on the upstream: it needs a breaker permit and a retry token.
+                hedge_permit = breaker.acquire()
+                if hedge_permit is not None and not self.resilience.retry_budget.try_retry():
+                    breaker.release(hedge_permit)
+                    hedge_permit = None
+                if hedge_permit is not None:
+                    hedge_timeout = max(self.min_attempt_s, timeout - delay)
+                    hedge = asyncio.ensure_future(
+                        self._send(url, payload, hedge_timeout, breaker, hedge_permit, latency, decode)
+                    )
+                    pending.add(hedge)
+                    hedging["hedges"] += 1
+                    annotate_call(hedges=hedging["hedges"])
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            error: BaseException | None = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            hedging["hedge_wins"] += 1
+                            annotate_call(hedge_wins=hedging["hedge_wins"])
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    assert error is not None
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _send(
+        self,
+        url: str,
+        payload: Any,
+        timeout: float,
+        breaker: CircuitBreaker,
+        permit: Permit,
+        latency: LatencySketch,
+        decode: Decode,
+    ) -> Any:
+        """One POST through the pool; reports the outcome to the breaker and the latency sketch."""
+        started = time.perf_counter()
+        ok = False
+        cancelled = False
+        timed_out = False
+        try:
+            async with self.pool.client(url) as client:
+                r = await client.post(url, json=payload, timeout=timeout)
+            # The upstream answered; a 4xx says nothing about its health.
+            ok = r.status_code < 500
+            r.raise_for_status()
+            try:
+                return decode(r.content)
+            except json.JSONDecodeError as e:
+                ok = False
+                raise ToolError(f"Invalid JSON response: {e}", code="http_invalid_response")
+            except ValidationError as e:
+                # A body that parses but breaks the contract is an upstream fault too.
+                ok = False
+                raise ToolError(f"Invalid response: {e.errors(include_url=False)}", code="http_invalid_response")
+        except httpx.TimeoutException:
+            timed_out = True
+            raise
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            if cancelled:
+                breaker.release(permit)
+            else:
+                elapsed = time.perf_counter() - started
+                breaker.record(permit, ok, elapsed)
+                if ok:
+                    latency.add(elapsed)
+                    self._timeout_streak = 0
+                elif timed_out:
+                    # Censored sample: the latency was at least the timeout. Without it p99
+                    # could never rise past a timeout that is now too short.
+                    latency.add(timeout)
+                    self._timeout_streak = min(self._timeout_streak + 1, 16)
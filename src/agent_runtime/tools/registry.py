@@ -7,9 +7,15 @@ from agent_runtime.tools.examples.math_tool import MathTool
 from agent_runtime.tools.examples.weather_tool import WeatherTool
 from agent_runtime.tools.examples.web_search_tool import WebSearchTool
 
-@dataclass(frozen=True)
+@dataclass
 class ToolRegistry:
     tools: Dict[str, Tool]
+    # Bumped by register(); planners rebuild what they derive from the tool set when it changes.
+    revision: int = 0
+
+    def register(self, tool: Tool) -> None:
+        self.tools[tool.name] = tool
+        self.revision += 1
 
     def get(self, name: str) -> Tool:
         if name not in self.tools:
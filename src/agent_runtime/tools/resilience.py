@@ -0,0 +1,239 @@
+from __future__ import annotations
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from agent_runtime.call_context import append_call_note
+from agent_runtime.tools.http_pool import origin
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True)
+class BreakerConfig:
+    window_s: float = 30.0
+    # The breaker does not judge an upstream on fewer calls than this in the window.
+    min_calls: int = 20
+    failure_rate: float = 0.5
+    # Calls slower than slow_call_s count towards slow_call_rate even when they succeed.
+    slow_call_s: float | None = 5.0
+    slow_call_rate: float = 0.8
+    open_s: float = 10.0
+    # Trial calls admitted while half-open; all must succeed to close again.
+    half_open_probes: int = 1
+
+
+@dataclass(frozen=True)
+class RetryBudgetConfig:
+    # Retries may add at most this fraction on top of first attempts in the window...
+    ratio: float = 0.2
+    # ...plus this floor, so low-traffic processes can still retry at all.
+    min_retries_per_s: float = 1.0
+    window_s: float = 10.0
+
+
+def backoff_s(retry: int, *, base_s: float, cap_s: float, rand: Callable[[], float] = random.random) -> float:
+    """Full-jitter exponential backoff before the retry-th retry (1-based)."""
+    return rand() * min(cap_s, base_s * (2 ** (retry - 1)))
+
+
+class _Window:
+    """Event counts over the trailing window_s seconds, kept in coarse time buckets."""
+
+    def __init__(self, window_s: float, fields: tuple[str, ...], clock: Callable[[], float], buckets: int = 10):
+        self._width = window_s / buckets
+        self._span = buckets
+        self._fields = fields
+        self._clock = clock
+        self._buckets: deque[tuple[int, dict[str, int]]] = deque()
+
+    def _trim(self, now_slot: int) -> None:
+        while self._buckets and self._buckets[0][0] <= now_slot - self._span:
+            self._buckets.popleft()
+
+    def add(self, **counts: int) -> None:
+        slot = int(self._clock() / self._width)
+        self._trim(slot)
+        if not self._buckets or self._buckets[-1][0] != slot:
+            self._buckets.append((slot, dict.fromkeys(self._fields, 0)))
+        bucket = self._buckets[-1][1]
+        for name, n in counts.items():
+            bucket[name] += n
+
+    def totals(self) -> dict[str, int]:
+        self._trim(int(self._clock() / self._width))
+        out = dict.fromkeys(self._fields, 0)
+        for _, bucket in self._buckets:
+            for name, n in bucket.items():
+                out[name] += n
+        return out
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+class Permit:
+    __slots__ = ("probe",)
+
+    def __init__(self, probe: bool):
+        self.probe = probe
+
+
+class CircuitBreaker:
+    """
+    Closed -> open when the rolling failure or slow-call rate crosses its threshold,
+    open -> half-open after open_s, half-open -> closed once the trial calls succeed.
+    """
+
+    def __init__(self, name: str, config: BreakerConfig | None = None, *, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.config = config or BreakerConfig()
+        self._clock = clock
+        self._window = _Window(self.config.window_s, ("calls", "failures", "slow"), clock)
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.rejected = 0
+        self.transitions: dict[str, int] = {}
+
+    def _transition(self, to: str) -> None:
+        edge = f"{self.state}->{to}"
+        self.transitions[edge] = self.transitions.get(edge, 0) + 1
+        append_call_note("circuit", {"upstream": self.name, "from": self.state, "to": to})
+        self.state = to
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if to == OPEN:
+            self._opened_at = self._clock()
+        elif to == CLOSED:
+            self._window.clear()
+
+    def acquire(self) -> Permit | None:
+        """A permit to call the upstream, or None to fail fast."""
+        if self.state == OPEN:
+            if self._clock() - self._opened_at < self.config.open_s:
+                self.rejected += 1
+                return None
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probes_in_flight + self._probe_successes >= self.config.half_open_probes:
+                self.rejected += 1
+                return None
+            self._probes_in_flight += 1
+            return Permit(probe=True)
+        return Permit(probe=False)
+
+    def record(self, permit: Permit, ok: bool, elapsed_s: float) -> None:
+        cfg = self.config
+        slow = cfg.slow_call_s is not None and elapsed_s >= cfg.slow_call_s
+        if permit.probe:
+            if self.state != HALF_OPEN:
+                return
+            self._probes_in_flight -= 1
+            if not ok or slow:
+                self._transition(OPEN)
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= cfg.half_open_probes:
+                self._transition(CLOSED)
+            return
+        if self.state != CLOSED:
+            # Started before the breaker opened; the verdict is already in.
+            return
+        self._window.add(calls=1, failures=0 if ok else 1, slow=1 if slow else 0)
+        totals = self._window.totals()
+        calls = totals["calls"]
+        if calls >= cfg.min_calls and (
+            totals["failures"] / calls >= cfg.failure_rate or totals["slow"] / calls >= cfg.slow_call_rate
+        ):
+            self._transition(OPEN)
+
+    def release(self, permit: Permit) -> None:
+        """Give a permit back without an outcome (the caller was cancelled)."""
+        if permit.probe and self.state == HALF_OPEN:
+            self._probes_in_flight -= 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            **self._window.totals(),
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions),
+        }
+
+
+class RetryBudget:
+    """Caps retries process-wide at ratio * recent first attempts + a small per-second floor."""
+
+    def __init__(self, config: RetryBudgetConfig | None = None, *, clock: Callable[[], float] = time.monotonic):
+        self.config = config or RetryBudgetConfig()
+        self._window = _Window(self.config.window_s, ("requests", "retries"), clock)
+        self.rejected = 0
+
+    def record_request(self) -> None:
+        self._window.add(requests=1)
+
+    def try_retry(self) -> bool:
+        cfg = self.config
+        totals = self._window.totals()
+        allowed = cfg.ratio * totals["requests"] + cfg.min_retries_per_s * cfg.window_s
+        if totals["retries"] + 1 > allowed:
+            self.rejected += 1
+            return False
+        self._window.add(retries=1)
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {**self._window.totals(), "rejected": self.rejected}
+
+
+class Resilience:
+    """Circuit breakers per upstream origin plus the retry budget every HttpTool draws from."""
+
+    def __init__(
+        self,
+        breaker: BreakerConfig | None = None,
+        retry_budget: RetryBudgetConfig | None = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.breaker_config = breaker or BreakerConfig()
+        self._clock = clock
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self.retry_budget = RetryBudget(retry_budget, clock=clock)
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        key = origin(url)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(key, self.breaker_config, clock=self._clock)
+        return breaker
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "breakers": {name: b.stats() for name, b in self._breakers.items()},
+            "retry_budget": self.retry_budget.stats(),
+        }
+
+
+_shared_resilience: Resilience | None = None
+
+
+def shared_resilience() -> Resilience:
+    """The process-wide breakers and retry budget HttpTools use unless given their own."""
+    global _shared_resilience
+    if _shared_resilience is None:
+        _shared_resilience = Resilience()
+    return _shared_resilience
+
+
+def set_shared_resilience(resilience: Resilience | None) -> Resilience | None:
+    """Install resilience as the process-wide one; returns the previous one so it can be restored."""
+    global _shared_resilience
+    previous, _shared_resilience = _shared_resilience, resilience
+    return previous
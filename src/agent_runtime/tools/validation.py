@@ -0,0 +1,44 @@
+from __future__ import annotations
+import json
+from functools import lru_cache
+from typing import Any, TypeVar
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from agent_runtime.tools.base import ToolError
+
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=None)
+def type_adapter(tp: Any) -> TypeAdapter:
+    """One TypeAdapter per type for the life of the process; building one compiles its validator."""
+    return TypeAdapter(tp)
+
+
+def validate_arguments(model: type[T], arguments: Any) -> T:
+    """Tool input validation with the repo's standard bad_input error."""
+    try:
+        return type_adapter(model).validate_python(arguments)
+    except ValidationError as e:
+        raise ToolError(f"Invalid input: {e.errors()}", code="bad_input")
+
+
+def json_decoder(model: Any = None):
+    """
+    bytes -> plain JSON value. With a model, the bytes are validated against it in one step
+    (validate_json, no intermediate dict) and models are dumped back to plain data.
+    """
+    if model is None:
+        return json.loads
+    adapter = type_adapter(model)
+
+    def decode(content: bytes) -> Any:
+        value = adapter.validate_json(content)
+        if isinstance(value, BaseModel):
+            return value.model_dump(mode="json")
+        if isinstance(value, list):
+            return [v.model_dump(mode="json") if isinstance(v, BaseModel) else v for v in value]
+        return value
+
+    return decode
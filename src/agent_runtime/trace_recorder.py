@@ -0,0 +1,132 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Union
+
+from agent_runtime.trace_types import DeadlineExceededTraceItem, PlanStepTrace, PlanTraceItem, ToolCallTraceItem
+
+if TYPE_CHECKING:
+    from agent_runtime.types import Plan, PlanStep, ToolCall
+
+
+def serialize_step(step: PlanStep) -> PlanStepTrace:
+    if step.kind == "tool_call" and step.tool_call:
+        return {
+            "kind": "tool_call",
+            "tool": step.tool_call.tool_name,
+            "call_id": step.tool_call.call_id,
+            "arguments": step.tool_call.arguments,
+        }
+    if step.kind == "parallel_tool_calls" and step.parallel_calls:
+        return {
+            "kind": "parallel_tool_calls",
+            "calls": [
+                {"tool": c.tool_name, "call_id": c.call_id, "arguments": c.arguments}
+                for c in step.parallel_calls
+            ],
+        }
+    if step.kind == "tool_graph" and step.graph_calls:
+        return {
+            "kind": "tool_graph",
+            "calls": [
+                {"tool": c.tool_name, "call_id": c.call_id, "arguments": c.arguments, "depends_on": list(c.depends_on)}
+                for c in step.graph_calls
+            ],
+        }
+    if step.kind == "final":
+        return {"kind": "final", "template": step.final_template}
+    return {"kind": step.kind}
+
+
+class PlanEvent:
+    __slots__ = ("plan",)
+
+    def __init__(self, plan: Plan):
+        self.plan = plan
+
+    def as_dict(self) -> PlanTraceItem:
+        return {
+            "type": "plan",
+            "user_input": self.plan.user_input,
+            "steps": [serialize_step(s) for s in self.plan.steps],
+        }
+
+
+class ToolCallEvent:
+    __slots__ = ("call", "error", "ms", "marks")
+
+    def __init__(self, call: ToolCall, error: dict[str, str] | None, ms: int, marks: dict[str, Any] | None):
+        self.call = call
+        self.error = error
+        self.ms = ms
+        self.marks = marks
+
+    def as_dict(self) -> ToolCallTraceItem:
+        item: dict[str, Any] = {
+            "type": "tool_call",
+            "call_id": self.call.call_id,
+            "tool": self.call.tool_name,
+            "ok": self.error is None,
+        }
+        if self.error is not None:
+            item["error"] = self.error
+        item["ms"] = self.ms
+        if self.marks:
+            item.update(self.marks)
+        return item  # type: ignore[return-value]
+
+
+class DeadlineExceededEvent:
+    __slots__ = ("calls", "overrun_ms")
+
+    def __init__(self, calls: list[str], overrun_ms: int):
+        self.calls = calls
+        self.overrun_ms = overrun_ms
+
+    def as_dict(self) -> DeadlineExceededTraceItem:
+        return {"type": "deadline_exceeded", "calls": self.calls, "overrun_ms": self.overrun_ms}
+
+
+TraceEvent = Union[PlanEvent, ToolCallEvent, DeadlineExceededEvent]
+
+
+class TraceRecorder:
+    """
+    Collects one run's trace as compact events; as_dict() turns each into the matching
+    trace_types item only when the trace is actually read. Concurrent calls record into
+    their own branch(), merged back in plan order.
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.events: list[TraceEvent] = []
+
+    def branch(self) -> list[TraceEvent]:
+        return []
+
+    def add(self, into: list[TraceEvent], event: TraceEvent) -> None:
+        into.append(event)
+
+    def merge(self, into: list[TraceEvent], branch: list[TraceEvent]) -> None:
+        into.extend(branch)
+
+
+class NullRecorder(TraceRecorder):
+    """Records nothing. The executor checks enabled and does not build events at all."""
+
+    enabled = False
+
+    def __init__(self) -> None:
+        self.events = []
+
+    def branch(self) -> list[TraceEvent]:
+        return self.events
+
+    def add(self, into: list[TraceEvent], event: TraceEvent) -> None:
+        pass
+
+    def merge(self, into: list[TraceEvent], branch: list[TraceEvent]) -> None:
+        pass
+
+
+# Stateless, so every untraced run shares it.
+NULL_RECORDER = NullRecorder()
@@ -6,7 +6,7 @@ class PlanStepTrace(TypedDict, total=False):
     tool: str
     call_id: str
     arguments: dict[str, Any]
-    calls: list[dict[str, Any]]
+    calls: list[dict[str, Any]]  # parallel_tool_calls / tool_graph; graph calls also carry depends_on
     template: str
 
 class PlanTraceItem(TypedDict):
@@ -18,6 +18,9 @@ class ToolErrorTrace(TypedDict):
     code: str
     message: str
 
+# Functional form: "from" is a keyword. States are "closed" / "open" / "half_open".
+CircuitTransitionTrace = TypedDict("CircuitTransitionTrace", {"upstream": str, "from": str, "to": str})
+
 class ToolCallTraceItem(TypedDict, total=False):
     type: Literal["tool_call"]
     call_id: str
@@ -25,3 +28,31 @@ class ToolCallTraceItem(TypedDict, total=False):
     ok: bool
     ms: int
     error: ToolErrorTrace
+    cached: bool
+    coalesced: bool
+    deduplicated: bool
+    queue_ms: float
+    # Thread/process tools (Tool.execution): pool kind, calls queued ahead, queue and run time.
+    pool: Literal["thread", "process"]
+    pool_queue_depth: int
+    pool_queue_ms: float
+    run_ms: float
+    # Calls sharing this call's Tool.run_many() invocation.
+    batched: int
+    # HttpTool: attempts, retry budget refusal, breaker transitions and hedging during the call.
+    attempts: int
+    retry_budget_exhausted: bool
+    circuit: list[CircuitTransitionTrace]
+    hedges: int
+    hedge_wins: int
+
+class DeadlineExceededTraceItem(TypedDict):
+    type: Literal["deadline_exceeded"]
+    calls: list[str]
+    overrun_ms: int
+
+class ProfileTraceItem(TypedDict):
+    type: Literal["profile"]
+    mode: Literal["cprofile", "tracemalloc"]
+    wall_ms: float
+    top: list[dict[str, Any]]  # cprofile: function/calls/tot_ms/cum_ms; tracemalloc: where/size_kb/count
@@ -1,18 +1,25 @@
 from __future__ import annotations
+import asyncio
 from dataclasses import dataclass, field
-from typing import Any, Literal
+from functools import cached_property
+from typing import Any, Callable, Literal
+
+from agent_runtime.trace_recorder import TraceEvent, TraceRecorder
 
 @dataclass(frozen=True)
 class ToolCall:
     tool_name: str
     arguments: dict[str, Any]
     call_id: str
+    # Only meaningful inside a tool_graph step: call_ids that must finish before this one starts.
+    depends_on: tuple[str, ...] = ()
 
 @dataclass(frozen=True)
 class PlanStep:
-    kind: Literal["tool_call", "parallel_tool_calls", "final"]
+    kind: Literal["tool_call", "parallel_tool_calls", "tool_graph", "final"]
     tool_call: ToolCall | None = None
     parallel_calls: list[ToolCall] | None = None
+    graph_calls: list[ToolCall] | None = None
     final_template: str | None = None
 
 @dataclass(frozen=True)
@@ -23,4 +30,26 @@ class Plan:
 @dataclass
 class ExecutionResult:
     output: str
-    trace: list[dict] = field(default_factory=list)
+    # Compact trace events; empty when the run was not traced.
+    events: list[TraceEvent] = field(default_factory=list)
+
+    @cached_property
+    def trace(self) -> list[dict]:
+        """The trace as trace_types dicts, built on first access."""
+        return [event.as_dict() for event in self.events]
+
+@dataclass
+class RunContext:
+    """Mutable state for a single plan execution. Executors and tools are shared; this is not."""
+    max_tool_calls: int
+    call_count: int = 0
+    # Batch runs share this: canonical call key -> outcome of an idempotent call already started in the batch.
+    shared_calls: dict[str, asyncio.Future[dict[str, Any]]] | None = None
+    # time.monotonic() by which the run must finish; None means unbounded.
+    deadline: float | None = None
+    # call_ids that were cut off (or never started) because the deadline passed.
+    deadline_exceeded: list[str] = field(default_factory=list)
+    # Set by Executor.execute_stream: receives plan / tool_call_start / tool_call events as they happen.
+    on_event: Callable[[dict[str, Any]], None] | None = None
+    # Executor.new_run(trace=False) installs the shared NULL_RECORDER instead.
+    recorder: TraceRecorder = field(default_factory=TraceRecorder)
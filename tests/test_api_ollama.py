@@ -1,56 +1,76 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import sys
 import unittest
 from pathlib import Path
-from unittest.mock import patch
 
+import httpx
 from fastapi import HTTPException
 
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 sys.path.insert(0, str(SRC))
 
-from agent_runtime.api import AgentRunRequest, run_agent
+from agent_runtime.api import AgentRunRequest, run_agent, run_agent_stream
+from agent_runtime.ollama_client import OllamaClient
+from agent_runtime.runtime import AgentRuntime
+from agent_runtime.tools.examples.math_tool import MathTool
+from agent_runtime.tools.registry import ToolRegistry
 
 
-class _Response:
-    def __init__(self, payload: object, status_code: int = 200):
+class _Ollama:
+    """Records the posted request and answers with a canned payload (or NDJSON chunks)."""
+
+    def __init__(self, payload: object = None, *, chunks: list[dict] | None = None):
         self.payload = payload
-        self.status_code = status_code
+        self.chunks = chunks
+        self.request: httpx.Request | None = None
+
+    @property
+    def posted_json(self) -> dict:
+        assert self.request is not None
+        return json.loads(self.request.content)
 
-    def raise_for_status(self) -> None:
-        return None
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.request = request
+        if self.chunks is not None:
+            body = "".join(json.dumps(c) + "\n" for c in self.chunks)
+            return httpx.Response(200, content=body.encode("utf-8"))
+        return httpx.Response(200, json=self.payload)
 
-    def json(self) -> object:
-        return self.payload
+    def run(self, req: AgentRunRequest, registry: ToolRegistry | None = None):
+        runtime = AgentRuntime(registry, ollama=OllamaClient(transport=httpx.MockTransport(self)))
+        return asyncio.run(run_agent(req, runtime=runtime))
 
+    def sse(self, req: AgentRunRequest) -> list[tuple[str, dict]]:
+        """(event, data) pairs from /agent/run/stream."""
+        runtime = AgentRuntime(ollama=OllamaClient(transport=httpx.MockTransport(self)))
 
-class _Client:
-    response: _Response
-    posted_url: str | None = None
-    posted_json: dict | None = None
-    timeout: float | None = None
+        async def go():
+            response = await run_agent_stream(req, runtime=runtime)
+            return b"".join([chunk async for chunk in response.body_iterator]).decode("utf-8")
 
-    def __init__(self, *, timeout: float):
-        type(self).timeout = timeout
+        events = []
+        for block in asyncio.run(go()).strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in block.splitlines())
+            events.append((lines["event"], json.loads(lines["data"])))
+        return events
 
-    async def __aenter__(self) -> _Client:
-        return self
 
-    async def __aexit__(self, exc_type, exc, traceback) -> None:
-        return None
+class _SlowMath(MathTool):
+    execution = "async"
+    cache_policy = None
 
-    async def post(self, url: str, *, json: dict) -> _Response:
-        type(self).posted_url = url
-        type(self).posted_json = json
-        return type(self).response
+    async def run(self, arguments: dict) -> dict:
+        await asyncio.sleep(0.5)
+        return self.run_sync(arguments)
 
 
 class OllamaApiTests(unittest.TestCase):
     def test_ollama_math_executes_one_math_call_and_prepends_provider_trace(self) -> None:
-        _Client.response = _Response(
+        ollama = _Ollama(
             {
                 "model": "qwen3.5:9b-q4_K_M",
                 "prompt_eval_count": 73,
@@ -66,19 +86,16 @@ class OllamaApiTests(unittest.TestCase):
             }
         )
 
-        with patch("agent_runtime.api.httpx.AsyncClient", _Client):
-            result = asyncio.run(
-                run_agent(AgentRunRequest(input="12*13", planner="ollama_math", debug=True))
-            )
+        result = ollama.run(AgentRunRequest(input="12*13", planner="ollama_math", debug=True))
 
         self.assertEqual(result.output, "12*13 = 156")
-        self.assertEqual(_Client.timeout, 30.0)
-        self.assertEqual(_Client.posted_url, "http://127.0.0.1:11434/api/chat")
-        self.assertEqual(_Client.posted_json["model"], "qwen3.5:9b-q4_K_M")
-        self.assertFalse(_Client.posted_json["stream"])
-        self.assertFalse(_Client.posted_json["think"])
-        self.assertEqual(_Client.posted_json["options"], {"temperature": 0})
-        self.assertEqual([tool["function"]["name"] for tool in _Client.posted_json["tools"]], ["math"])
+        self.assertEqual(ollama.request.extensions["timeout"]["read"], 30.0)
+        self.assertEqual(str(ollama.request.url), "http://127.0.0.1:11434/api/chat")
+        self.assertEqual(ollama.posted_json["model"], "qwen3.5:9b-q4_K_M")
+        self.assertFalse(ollama.posted_json["stream"])
+        self.assertFalse(ollama.posted_json["think"])
+        self.assertEqual(ollama.posted_json["options"], {"temperature": 0})
+        self.assertEqual([tool["function"]["name"] for tool in ollama.posted_json["tools"]], ["math"])
         self.assertEqual(result.trace[0]["type"], "provider_call")
         self.assertEqual(result.trace[0]["provider"], "ollama")
         self.assertEqual(result.trace[0]["configured_model"], "qwen3.5:9b-q4_K_M")
@@ -92,7 +109,7 @@ class OllamaApiTests(unittest.TestCase):
         self.assertEqual(result.trace[0]["cost_basis"], "local-unbilled")
 
     def test_ollama_math_does_not_invent_missing_usage(self) -> None:
-        _Client.response = _Response(
+        ollama = _Ollama(
             {
                 "model": "qwen3.5:9b-q4_K_M",
                 "message": {
@@ -106,25 +123,117 @@ class OllamaApiTests(unittest.TestCase):
             }
         )
 
-        with patch("agent_runtime.api.httpx.AsyncClient", _Client):
-            result = asyncio.run(
-                run_agent(AgentRunRequest(input="2+2", planner="ollama_math", debug=True))
-            )
+        result = ollama.run(AgentRunRequest(input="2+2", planner="ollama_math", debug=True))
 
         self.assertIsNone(result.trace[0]["input_tokens"])
         self.assertIsNone(result.trace[0]["output_tokens"])
         self.assertIsNone(result.trace[0]["total_tokens"])
 
     def test_ollama_math_rejects_returned_model_mismatch(self) -> None:
-        _Client.response = _Response({"model": "other", "message": {"tool_calls": []}})
+        ollama = _Ollama({"model": "other", "message": {"tool_calls": []}})
 
-        with patch("agent_runtime.api.httpx.AsyncClient", _Client):
-            with self.assertRaises(HTTPException) as raised:
-                asyncio.run(run_agent(AgentRunRequest(input="12*13", planner="ollama_math")))
+        with self.assertRaises(HTTPException) as raised:
+            ollama.run(AgentRunRequest(input="12*13", planner="ollama_math"))
 
         self.assertEqual(raised.exception.status_code, 502)
         self.assertEqual(raised.exception.detail, {"code": "ollama_model_mismatch"})
 
+    def test_streamed_tool_call_is_dispatched_and_timed(self) -> None:
+        model = "qwen3.5:9b-q4_K_M"
+        ollama = _Ollama(
+            chunks=[
+                {
+                    "model": model,
+                    "message": {
+                        "role": "assistant",
+                        "content": "",
+                        "tool_calls": [
+                            {
+                                "id": "call_math_19",
+                                "function": {"name": "math", "arguments": {"expression": "12*13"}},
+                            }
+                        ],
+                    },
+                    "done": False,
+                },
+                {"model": model, "message": {"role": "assistant", "content": ""}, "done": False},
+                {
+                    "model": model,
+                    "message": {"role": "assistant", "content": ""},
+                    "done": True,
+                    "prompt_eval_count": 70,
+                    "eval_count": 20,
+                },
+            ]
+        )
+
+        result = ollama.run(AgentRunRequest(input="12*13", planner="ollama_math", ollama_stream=True, debug=True))
+
+        self.assertTrue(ollama.posted_json["stream"])
+        self.assertEqual(result.output, "12*13 = 156")
+        provider_call = result.trace[0]
+        self.assertTrue(provider_call["stream"])
+        self.assertEqual(provider_call["total_tokens"], 90)
+        self.assertIsInstance(provider_call["time_to_first_token_ms"], int)
+        self.assertIsInstance(provider_call["time_to_tool_call_ms"], int)
+        self.assertEqual(result.trace[2]["call_id"], "call_math_19")
+
+    def test_sse_endpoint_streams_the_ollama_completion(self) -> None:
+        model = "qwen3.5:9b-q4_K_M"
+        call = {"id": "call_math_31", "function": {"name": "math", "arguments": {"expression": "12*13"}}}
+        ollama = _Ollama(chunks=[{"model": model, "message": {"tool_calls": [call]}, "done": True, "eval_count": 5}])
+
+        events = ollama.sse(AgentRunRequest(input="12*13", planner="ollama_math", ollama_stream=True, debug=True))
+
+        self.assertTrue(ollama.posted_json["stream"])
+        names = [name for name, _ in events]
+        self.assertEqual(names[-1], "final")
+        self.assertIn("provider_call", names)
+        self.assertIn("tool_call", names)
+        final = events[-1][1]
+        self.assertEqual(final["output"], "12*13 = 156")
+        self.assertTrue(final["trace"][0]["stream"])
+
+        plain = _Ollama(chunks=ollama.chunks).sse(AgentRunRequest(input="12*13", planner="ollama_math", ollama_stream=True))
+        self.assertEqual(plain, [("progress", {"completed": 1, "total": 1}), ("final", {"output": "12*13 = 156", "trace": None})])
+
+    def test_sse_endpoint_reports_a_streamed_provider_failure_as_an_error_event(self) -> None:
+        call = {"function": {"name": "math", "arguments": {"expression": "12*13"}}}
+        ollama = _Ollama(chunks=[{"model": "other:1b", "message": {"tool_calls": [call]}, "done": True}])
+
+        events = ollama.sse(AgentRunRequest(input="12*13", planner="ollama_math", ollama_stream=True))
+
+        self.assertEqual(events, [("error", {"code": "ollama_model_mismatch"})])
+
+    def test_streamed_call_past_the_deadline_returns_the_partial_result(self) -> None:
+        model = "qwen3.5:9b-q4_K_M"
+        call = {"id": "call_math_22", "function": {"name": "math", "arguments": {"expression": "1+1"}}}
+        ollama = _Ollama(chunks=[{"model": model, "message": {"tool_calls": [call]}, "done": True}])
+
+        result = ollama.run(
+            AgentRunRequest(input="1+1", planner="ollama_math", ollama_stream=True, deadline_ms=100, debug=True),
+            ToolRegistry(tools={"math": _SlowMath()}),
+        )
+
+        # The tool overran, not Ollama: the executor's partial result, not a 504.
+        self.assertEqual(result.output, "Math result did not arrive before the deadline.")
+        self.assertEqual(result.trace[-1]["calls"], ["call_math_22"])
+
+    def test_streamed_second_tool_call_is_rejected(self) -> None:
+        model = "qwen3.5:9b-q4_K_M"
+        call = {"id": "call_math_20", "function": {"name": "math", "arguments": {"expression": "1+1"}}}
+        ollama = _Ollama(
+            chunks=[
+                {"model": model, "message": {"tool_calls": [call]}, "done": False},
+                {"model": model, "message": {"tool_calls": [dict(call, id="call_math_21")]}, "done": True},
+            ]
+        )
+
+        with self.assertRaises(HTTPException) as raised:
+            ollama.run(AgentRunRequest(input="1+1", planner="ollama_math", ollama_stream=True))
+
+        self.assertEqual(raised.exception.detail, {"code": "ollama_adapter"})
+
 
 if __name__ == "__main__":
     unittest.main()
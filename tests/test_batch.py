@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import unittest
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.batch import run_batch
+from agent_runtime.main import app
+from agent_runtime.runtime import AgentRuntime
+
+
+class BatchEndpointTests(unittest.TestCase):
+    def test_batch_streams_every_index_and_runs_each_distinct_call_once(self) -> None:
+        inputs = ["12*13", " 12*13 ", "12*13 and weather in Seattle", "weather in Seattle", "search cats"]
+
+        with TestClient(app) as client:
+            response = client.post("/v1/agent/run_batch", json={"inputs": inputs, "debug": True, "max_concurrency": 2})
+
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        items = [json.loads(line) for line in response.text.splitlines()]
+        by_index = {item["index"]: item for item in items}
+        self.assertEqual(sorted(by_index), [0, 1, 2, 3, 4])
+        self.assertEqual(by_index[0]["output"], "12*13 = 156")
+        self.assertEqual(by_index[1]["output"], "12*13 = 156")
+        self.assertEqual(by_index[3]["output"], "Weather for Seattle: Stub: 72F, clear skies.")
+
+        # Items 0 and 1 normalize to the same input and share one execution. Across the rest,
+        # only the 3 distinct calls (math 12*13, weather Seattle, search) may reach a tool.
+        calls = [t for i in (0, 2, 3, 4) for t in by_index[i]["trace"] if t["type"] == "tool_call"]
+        executed = [t for t in calls if not (t.get("deduplicated") or t.get("cached") or t.get("coalesced"))]
+        self.assertEqual(len(calls), 5)
+        self.assertEqual(sorted(t["tool"] for t in executed), ["math", "weather", "web_search"])
+
+    def test_batch_rejects_empty_input_list(self) -> None:
+        with TestClient(app) as client:
+            response = client.post("/v1/agent/run_batch", json={"inputs": []})
+
+        self.assertEqual(response.status_code, 422)
+
+    def test_unexpected_failure_is_one_item_and_the_rest_keep_streaming(self) -> None:
+        runtime = AgentRuntime()
+        execute = runtime.executor.execute
+
+        async def flaky(plan, run=None):
+            if plan.user_input == "weather in Seattle":
+                raise RuntimeError("executor bug")
+            return await execute(plan, run)
+
+        runtime.executor.execute = flaky
+
+        async def collect():
+            try:
+                return [item async for item in run_batch(runtime, ["12*13", "weather in Seattle", "search cats"], max_concurrency=1)]
+            finally:
+                await runtime.aclose()
+
+        by_index = {item["index"]: item for item in asyncio.run(collect())}
+
+        self.assertEqual(sorted(by_index), [0, 1, 2])
+        self.assertEqual(by_index[1]["error"], {"code": "exception", "message": "executor bug"})
+        self.assertEqual(by_index[0]["output"], "12*13 = 156")
+        self.assertIn("output", by_index[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.bulkhead import Bulkheads
+from agent_runtime.executor import Executor
+from agent_runtime.tools.base import Tool
+from agent_runtime.tools.registry import ToolRegistry
+from agent_runtime.types import Plan, PlanStep, ToolCall
+
+
+class _SleepTool(Tool):
+    description = "Sleeps."
+
+    def __init__(self, name: str, seconds: float, max_concurrency: int | None = None) -> None:
+        self.name = name
+        self.seconds = seconds
+        self.max_concurrency = max_concurrency
+
+    async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        await asyncio.sleep(self.seconds)
+        return {}
+
+
+def _parallel(*calls: ToolCall) -> Plan:
+    return Plan(user_input="p", steps=[PlanStep(kind="parallel_tool_calls", parallel_calls=list(calls))])
+
+
+class BulkheadTests(unittest.TestCase):
+    def test_saturated_tool_queues_without_blocking_other_tools(self) -> None:
+        registry = ToolRegistry(tools={"slow": _SleepTool("slow", 0.05, max_concurrency=1), "fast": _SleepTool("fast", 0)})
+        bulkheads = Bulkheads(max_in_flight=10)
+        executor = Executor(registry, bulkheads=bulkheads)
+        plan = _parallel(
+            ToolCall("slow", {"n": 1}, "s1"),
+            ToolCall("slow", {"n": 2}, "s2"),
+            ToolCall("fast", {}, "f1"),
+        )
+
+        result = asyncio.run(executor.execute(plan))
+
+        by_id = {t["call_id"]: t for t in result.trace if t["type"] == "tool_call"}
+        self.assertLess(by_id["s1"]["queue_ms"], 10)
+        self.assertGreater(by_id["s2"]["queue_ms"], 40)
+        self.assertLess(by_id["f1"]["queue_ms"], 10)
+        stats = bulkheads.stats()
+        self.assertEqual(stats["tools"]["slow"]["waited"], 1)
+        self.assertEqual(stats["global"]["in_flight"], 0)
+
+    def test_registry_override_and_global_cap(self) -> None:
+        registry = ToolRegistry(tools={"t": _SleepTool("t", 0.02, max_concurrency=10)})
+        bulkheads = Bulkheads(max_in_flight=1, tool_limits={"t": 5})
+        executor = Executor(registry, bulkheads=bulkheads)
+
+        result = asyncio.run(executor.execute(_parallel(*(ToolCall("t", {"n": i}, f"c{i}") for i in range(3)))))
+
+        waits = sorted(t["queue_ms"] for t in result.trace if t["type"] == "tool_call")
+        self.assertGreater(waits[-1], 30)
+        self.assertEqual(bulkheads.stats()["tools"]["t"]["limit"], 5)
+        self.assertEqual(bulkheads.stats()["global"]["waited"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+import unittest
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.call_context import reset_deadline, set_deadline
+from agent_runtime.executor import Executor
+from agent_runtime.tools.base import Tool, ToolError
+from agent_runtime.tools.http_pool import HttpClientPool
+from agent_runtime.tools.http_tool import HttpTool
+from agent_runtime.tools.registry import ToolRegistry
+from agent_runtime.types import Plan, PlanStep, ToolCall
+
+
+class _Tool(Tool):
+    description = "Sleeps, then returns a canned result."
+
+    def __init__(self, name: str, seconds: float, result: dict[str, Any]) -> None:
+        self.name = name
+        self.seconds = seconds
+        self.result = result
+        self.cancelled = False
+
+    async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        try:
+            await asyncio.sleep(self.seconds)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self.result
+
+
+class DeadlineTests(unittest.TestCase):
+    def test_deadline_cancels_slow_sibling_and_renders_what_arrived(self) -> None:
+        math = _Tool("math", 5.0, {"result": 1.0})
+        registry = ToolRegistry(tools={"weather": _Tool("weather", 0, {"location": "Seattle", "summary": "Rain."}), "math": math})
+        executor = Executor(registry)
+        plan = Plan(
+            user_input="weather in Seattle and 12*13",
+            steps=[
+                PlanStep(
+                    kind="parallel_tool_calls",
+                    parallel_calls=[ToolCall("weather", {}, "w"), ToolCall("math", {}, "m")],
+                ),
+                PlanStep(kind="final", final_template="weather_plus_math"),
+            ],
+        )
+
+        started = time.perf_counter()
+        result = asyncio.run(executor.execute(plan, executor.new_run(deadline=time.monotonic() + 0.05)))
+
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertTrue(math.cancelled)
+        self.assertEqual(result.output, "Weather for Seattle: Rain.")
+        self.assertEqual(result.trace[2]["error"]["code"], "deadline_exceeded")
+        self.assertEqual(result.trace[-1]["type"], "deadline_exceeded")
+        self.assertEqual(result.trace[-1]["calls"], ["m"])
+
+    def test_calls_after_the_deadline_do_not_start(self) -> None:
+        math = _Tool("math", 0, {"result": 2.0})
+        executor = Executor(ToolRegistry(tools={"math": math}))
+        plan = Plan(
+            user_input="2",
+            steps=[PlanStep(kind="tool_call", tool_call=ToolCall("math", {}, "m")), PlanStep(kind="final", final_template="math")],
+        )
+
+        result = asyncio.run(executor.execute(plan, executor.new_run(deadline=time.monotonic() - 1)))
+
+        self.assertEqual(result.output, "Math result did not arrive before the deadline.")
+
+    def test_http_tool_does_not_attempt_with_too_little_budget(self) -> None:
+        requests: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(503)
+
+        tool = HttpTool(
+            name="h", description="", url="http://upstream.test/", retries=5, min_attempt_s=0.5,
+            pool=HttpClientPool(transport=httpx.MockTransport(handler)),
+        )
+
+        async def run():
+            token = set_deadline(time.monotonic() + 0.2)
+            try:
+                await tool.run({})
+            finally:
+                reset_deadline(token)
+
+        with self.assertRaises(ToolError) as raised:
+            asyncio.run(run())
+
+        self.assertEqual(raised.exception.code, "deadline_exceeded")
+        self.assertEqual(requests, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
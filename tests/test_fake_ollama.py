@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.api import AgentRunRequest, run_agent
+from agent_runtime.fake_ollama import FakeOllamaConfig, build_app, load_sessions
+from agent_runtime.ollama_client import OllamaClient
+from agent_runtime.runtime import AgentRuntime
+
+SESSIONS = load_sessions(ROOT / "sessions")
+RERUN = next(s for s in SESSIONS if s.name.endswith("-rerun"))
+
+
+def _replay(req: AgentRunRequest, config: FakeOllamaConfig | None = None):
+    fake = build_app(SESSIONS, config)
+
+    async def go():
+        runtime = AgentRuntime(ollama=OllamaClient(transport=httpx.ASGITransport(app=fake)))
+        try:
+            return await run_agent(req, runtime=runtime)
+        finally:
+            await runtime.aclose()
+
+    return asyncio.run(go()), fake.state.stats
+
+
+class FakeOllamaTests(unittest.TestCase):
+    def test_sessions_rebuild_the_recorded_tool_call(self) -> None:
+        self.assertEqual(len(SESSIONS), 2)
+        self.assertEqual(RERUN.model, "qwen3.5:9b-q4_K_M")
+        self.assertEqual(
+            RERUN.tool_calls,
+            [{"id": "call_x0d0lyby", "function": {"name": "math", "arguments": {"expression": "483*248+93"}}}],
+        )
+        self.assertIsNotNone(RERUN.tags)
+
+    def test_replays_a_session_through_the_ollama_math_planner(self) -> None:
+        response, stats = _replay(AgentRunRequest(input=RERUN.user_input, planner="ollama_math", debug=True))
+        self.assertEqual(response.output, "483*248+93 = 119877")
+        provider = response.trace[0]
+        self.assertEqual(provider["returned_model"], RERUN.model)
+        self.assertTrue(provider["ok"])
+        self.assertEqual(stats.by_session, {RERUN.name: 1})
+
+    def test_streams_chunks_with_the_tool_call(self) -> None:
+        config = FakeOllamaConfig(stream_chunks=2, chunk_interval_ms=1)
+        response, stats = _replay(
+            AgentRunRequest(input=RERUN.user_input, planner="ollama_math", ollama_stream=True), config
+        )
+        self.assertEqual(response.output, "483*248+93 = 119877")
+        self.assertEqual(stats.streamed, 1)
+
+    def test_strict_mode_rejects_unknown_inputs(self) -> None:
+        async def go():
+            transport = httpx.ASGITransport(app=build_app(SESSIONS, FakeOllamaConfig(strict=True)))
+            async with httpx.AsyncClient(transport=transport, base_url="http://fake") as client:
+                return await client.post("/api/chat", json={"messages": [{"role": "user", "content": "?"}]})
+
+        self.assertEqual(asyncio.run(go()).status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import json
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime import fast_json
+from agent_runtime.fast_json import FastJSONResponse, dumps
+
+
+class FastJsonTests(unittest.TestCase):
+    def test_matches_the_standard_encoder(self) -> None:
+        payload = {"output": "Weather for Zürich: 72°F", "trace": [{"ms": 1.5, "ok": True, "x": None}]}
+        expected = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.assertEqual(dumps(payload), expected)
+        self.assertEqual(FastJSONResponse(payload).body, expected)
+
+    def test_values_orjson_rejects_fall_back(self) -> None:
+        self.assertEqual(json.loads(dumps({"n": 2**80})), {"n": 2**80})
+
+    def test_works_without_orjson(self) -> None:
+        saved = fast_json.orjson
+        fast_json.orjson = None
+        try:
+            self.assertEqual(dumps({"a": [1, "é"]}), '{"a":[1,"é"]}'.encode("utf-8"))
+        finally:
+            fast_json.orjson = saved
+
+
+if __name__ == "__main__":
+    unittest.main()
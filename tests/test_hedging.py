@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.executor import Executor
+from agent_runtime.latency import LatencySketch
+from agent_runtime.tools.base import ToolError
+from agent_runtime.tools.http_pool import HttpClientPool
+from agent_runtime.tools.http_tool import HttpTool
+from agent_runtime.tools.registry import ToolRegistry
+from agent_runtime.tools.resilience import Resilience
+from agent_runtime.types import Plan, PlanStep, ToolCall
+
+
+class _SlowFirst:
+    """The first request stalls; later ones answer at once."""
+
+    def __init__(self, stall_s: float = 5.0) -> None:
+        self.stall_s = stall_s
+        self.requests = 0
+        self.cancelled = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.requests == 1:
+            try:
+                await asyncio.sleep(self.stall_s)
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+        return httpx.Response(200, json={"n": self.requests})
+
+
+class _Latency:
+    """Answers after latency_s, or raises ReadTimeout when that exceeds the request's timeout."""
+
+    def __init__(self, latency_s: float) -> None:
+        self.latency_s = latency_s
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        timeout = request.extensions["timeout"]["read"]
+        await asyncio.sleep(min(self.latency_s, timeout))
+        if self.latency_s > timeout:
+            raise httpx.ReadTimeout("timed out", request=request)
+        return httpx.Response(200, json={})
+
+
+def _tool(handler, **kwargs) -> HttpTool:
+    return HttpTool(
+        name="up",
+        description="",
+        url="http://upstream.test/x",
+        pool=HttpClientPool(transport=httpx.MockTransport(handler)),
+        resilience=Resilience(),
+        **kwargs,
+    )
+
+
+class LatencySketchTests(unittest.TestCase):
+    def test_quantiles_track_the_distribution(self) -> None:
+        sketch = LatencySketch()
+        self.assertIsNone(sketch.quantile(0.95))
+        for i in range(1, 101):
+            sketch.add(i / 1000)
+
+        self.assertAlmostEqual(sketch.quantile(0.5), 0.050, delta=0.002)
+        self.assertAlmostEqual(sketch.quantile(0.95), 0.095, delta=0.003)
+
+    def test_old_samples_fade(self) -> None:
+        sketch = LatencySketch(max_count=100)
+        for _ in range(100):
+            sketch.add(1.0)
+        for _ in range(300):
+            sketch.add(0.01)
+
+        self.assertAlmostEqual(sketch.quantile(0.95), 0.01, delta=0.001)
+
+
+class HedgingTests(unittest.TestCase):
+    def test_hedge_wins_over_a_stalled_attempt(self) -> None:
+        upstream = _SlowFirst()
+        tool = _tool(upstream, hedge=True, idempotent=True)
+        for _ in range(50):
+            tool.latency.add(0.01)
+        executor = Executor(ToolRegistry(tools={"up": tool}))
+        plan = Plan(user_input="x", steps=[PlanStep(kind="tool_call", tool_call=ToolCall("up", {}, "c0"))])
+
+        result = asyncio.run(executor.execute(plan))
+
+        call = [t for t in result.trace if t["type"] == "tool_call"][0]
+        self.assertTrue(call["ok"])
+        self.assertEqual((call["hedges"], call["hedge_wins"]), (1, 1))
+        self.assertEqual(upstream.cancelled, 1)
+        self.assertLess(call["ms"], 1000)
+
+    def test_hedging_needs_an_idempotent_tool(self) -> None:
+        upstream = _SlowFirst(stall_s=0.1)
+        tool = _tool(upstream, hedge=True)
+        for _ in range(50):
+            tool.latency.add(0.01)
+
+        self.assertEqual(asyncio.run(tool.run({})), {"n": 1})
+        self.assertEqual(upstream.requests, 1)
+
+    def test_timeout_adapts_to_observed_latency(self) -> None:
+        tool = _tool(_SlowFirst(), timeout_s=10.0, adaptive_timeout=True)
+        self.assertEqual(tool._attempt_timeout(None), 10.0)
+        for _ in range(50):
+            tool.latency.add(0.5)
+
+        self.assertAlmostEqual(tool._attempt_timeout(None), 1.5, delta=0.05)
+        self.assertEqual(tool._attempt_timeout(0.3), 0.3)
+        self.assertEqual(tool._attempt_timeout(None, probe=True), 10.0)
+        self.assertEqual(_tool(_SlowFirst(), timeout_s=10.0)._attempt_timeout(None), 10.0)
+
+    def test_adaptive_timeout_recovers_when_the_upstream_slows_down(self) -> None:
+        upstream = _Latency(0.01)
+        tool = _tool(upstream, timeout_s=10.0, adaptive_timeout=True, retries=0)
+
+        async def calls(n: int) -> list[bool]:
+            outcomes = []
+            for _ in range(n):
+                try:
+                    await tool.run({})
+                    outcomes.append(True)
+                except ToolError:
+                    outcomes.append(False)
+            return outcomes
+
+        self.assertTrue(all(asyncio.run(calls(50))))
+        self.assertAlmostEqual(tool._attempt_timeout(None), 0.25, delta=0.01)
+        # Well above 3x the old p99 and above the 0.25 s it implies.
+        upstream.latency_s = 0.4
+        outcomes = asyncio.run(calls(6))
+
+        self.assertFalse(outcomes[0])
+        self.assertTrue(all(outcomes[2:]), outcomes)
+        self.assertGreater(tool._attempt_timeout(None), 0.4)
+
+
+if __name__ == "__main__":
+    unittest.main()
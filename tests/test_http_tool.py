@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.tools.http_pool import HttpClientPool, HttpPoolConfig
+from agent_runtime.tools.http_tool import HttpTool
+
+
+def _echo(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"host": request.url.host})
+
+
+class HttpPoolTests(unittest.TestCase):
+    def test_tools_on_the_same_origin_share_one_client(self) -> None:
+        pool = HttpClientPool(transport=httpx.MockTransport(_echo))
+        a = HttpTool(name="a", description="", url="http://upstream.test/a", pool=pool)
+        b = HttpTool(name="b", description="", url="http://upstream.test/b", pool=pool)
+        c = HttpTool(name="c", description="", url="http://other.test/c", pool=pool)
+
+        async def run():
+            out = [await a.run({}), await b.run({}), await c.run({})]
+            await pool.aclose()
+            return out
+
+        results = asyncio.run(run())
+
+        self.assertEqual([r["host"] for r in results], ["upstream.test", "upstream.test", "other.test"])
+
+    def test_per_host_limit_queues_and_records_wait(self) -> None:
+        async def slow(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.02)
+            return httpx.Response(200, json={})
+
+        pool = HttpClientPool(HttpPoolConfig(max_connections_per_host=1), transport=httpx.MockTransport(slow))
+        tool = HttpTool(name="t", description="", url="http://upstream.test/t", pool=pool)
+
+        async def run():
+            await asyncio.gather(*(tool.run({}) for _ in range(3)))
+            stats = pool.stats()["http://upstream.test"]
+            await pool.aclose()
+            return stats
+
+        stats = asyncio.run(run())
+
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["in_use"], 0)
+        self.assertEqual(stats["waited"], 2)
+        self.assertGreater(stats["wait_ms_max"], 15)
+
+    def test_idle_keepalive_connections_are_counted(self) -> None:
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            # Minimal keep-alive HTTP/1.1 upstream: a small JSON body per request until the client hangs up.
+            try:
+                while await reader.readuntil(b"\r\n\r\n"):
+                    await asyncio.sleep(0.02)
+                    writer.write(b"HTTP/1.1 200 OK\r\ncontent-type: application/json\r\ncontent-length: 2\r\n\r\n{}")
+                    await writer.drain()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                pass
+            finally:
+                writer.close()
+
+        async def run():
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            pool = HttpClientPool()
+            tool = HttpTool(name="t", description="", url=f"http://127.0.0.1:{port}/t", pool=pool)
+            try:
+                await asyncio.gather(*(tool.run({}) for _ in range(3)))
+                after_burst = pool.stats()[f"http://127.0.0.1:{port}"]
+                await tool.run({})
+                after_reuse = pool.stats()[f"http://127.0.0.1:{port}"]
+            finally:
+                await pool.aclose()
+                server.close()
+                await server.wait_closed()
+            return after_burst, after_reuse
+
+        after_burst, after_reuse = asyncio.run(run())
+
+        self.assertEqual((after_burst["in_use"], after_burst["idle"]), (0, 3))
+        # The next request reuses one of them rather than opening a fourth.
+        self.assertEqual((after_reuse["requests"], after_reuse["idle"]), (4, 3))
+
+    def test_transport_errors_are_httpx_errors(self) -> None:
+        async def run():
+            pool = HttpClientPool()
+            try:
+                async with pool.client("http://127.0.0.1:9/") as client:
+                    await client.get("http://127.0.0.1:9/")
+            finally:
+                await pool.aclose()
+
+        with self.assertRaises(httpx.ConnectError):
+            asyncio.run(run())
+
+    def test_http2_pools_allow_a_request_per_stream(self) -> None:
+        self.assertEqual(HttpPoolConfig(max_connections_per_host=2).max_requests_per_host, 2)
+        config = HttpPoolConfig(max_connections_per_host=2, http2=True, http2_streams_per_connection=50)
+        self.assertEqual(config.max_requests_per_host, 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
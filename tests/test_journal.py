@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import httpx
+from fastapi import HTTPException
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.api import AgentRunRequest, journal_call, run_agent
+from agent_runtime.journal import JournalConfig, RunJournal
+from agent_runtime.ollama_client import OLLAMA_MODEL, OllamaClient
+from agent_runtime.runtime import AgentRuntime, RuntimeConfig
+
+
+def _run(journal: RunJournal, i: int) -> str | None:
+    trace = [{"type": "tool_call", "call_id": f"call_{i}", "tool": "math", "ok": True, "ms": 0}]
+    return journal.record(f"input {i}", "rules", trace, output=f"output {i}")
+
+
+class RunJournalTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+
+    def test_runs_are_indexed_by_call_id_run_id_and_time(self) -> None:
+        journal = RunJournal(JournalConfig(directory=self.directory))
+        journal.start()
+        started = time.time()
+        run_ids = [_run(journal, i) for i in range(5)]
+        journal.flush()
+
+        self.assertEqual(journal.get_call("call_3")["output"], "output 3")
+        self.assertEqual(journal.get_run(run_ids[1])["input"], "input 1")
+        self.assertIsNone(journal.get_call("call_missing"))
+        self.assertEqual([r["input"] for r in journal.between(since=started, limit=3)], ["input 0", "input 1", "input 2"])
+        self.assertEqual(journal.between(until=started - 1), [])
+        journal.close()
+
+        # A restart rebuilds the index from the .idx files and writes to a fresh segment.
+        reopened = RunJournal(JournalConfig(directory=self.directory))
+        reopened.start()
+        _run(reopened, 3)
+        reopened.flush()
+        self.assertEqual(len(reopened.runs_for_call("call_3")), 2)
+        self.assertEqual(reopened.stats()["segments"], 2)
+        reopened.close()
+
+    def test_rotation_by_size_and_retention_by_count(self) -> None:
+        journal = RunJournal(JournalConfig(directory=self.directory, segment_bytes=300, retention_segments=2))
+        journal.start()
+        for i in range(20):
+            _run(journal, i)
+        journal.flush()
+        journal.close()
+
+        segments = sorted(Path(self.directory).glob("*.seg"))
+        # Two sealed segments kept, plus the one being written when the last rotation ran.
+        self.assertEqual(len(segments), 3)
+        self.assertTrue(all(p.with_suffix(".idx").is_file() for p in segments))
+        self.assertIsNone(journal.get_call("call_0"))
+        self.assertEqual(journal.get_call("call_19")["output"], "output 19")
+
+    def test_missing_index_is_rebuilt_from_the_segment(self) -> None:
+        journal = RunJournal(JournalConfig(directory=self.directory))
+        journal.start()
+        _run(journal, 1)
+        _run(journal, 2)
+        journal.close()
+        segment = next(Path(self.directory).glob("*.seg"))
+        segment.with_suffix(".idx").unlink()
+        # A torn record at the tail, as a crash mid-write leaves it.
+        with open(segment, "ab") as f:
+            f.write(b"\x00\x00\x01\x00garbage")
+
+        reopened = RunJournal(JournalConfig(directory=self.directory))
+        reopened.start()
+        self.assertEqual(reopened.get_call("call_2")["output"], "output 2")
+        self.assertEqual(len(reopened.between()), 2)
+        reopened.close()
+
+    def test_unencodable_run_is_skipped_and_the_writer_keeps_going(self) -> None:
+        journal = RunJournal(JournalConfig(directory=self.directory))
+        journal.start()
+        journal.record("12*13 \ud800", "rules", [], output="lone surrogate")
+        journal.flush()
+        _run(journal, 1)
+        journal.flush()
+
+        stats = journal.stats()
+        self.assertTrue(journal.recording)
+        self.assertEqual((stats["written"], stats["failed"], stats["queued"]), (1, 1, 0))
+        self.assertEqual(journal.get_call("call_1")["output"], "output 1")
+        journal.close()
+
+    def test_runtime_journals_untraced_runs_with_their_trace(self) -> None:
+        async def go():
+            runtime = AgentRuntime(config=RuntimeConfig(journal=JournalConfig(directory=self.directory)))
+            runtime.start()
+            try:
+                response = await run_agent(AgentRunRequest(input="12*13"), runtime=runtime)
+                await asyncio.to_thread(runtime.journal.flush)
+                call_id = runtime.journal.between()[0]["trace"][1]["call_id"]
+                return response, await journal_call(call_id, runtime=runtime)
+            finally:
+                await runtime.aclose()
+
+        response, lookup = asyncio.run(go())
+        self.assertIsNone(response.trace)
+        self.assertIn(b'"output":"12*13 = 156"', lookup.body)
+        self.assertIn(b'"type":"plan"', lookup.body)
+
+    def test_provider_failures_are_journaled_with_the_provider_trace(self) -> None:
+        call = {"function": {"name": "math", "arguments": {"expression": "12*13"}}}
+        # The stream carries a second tool call, which the one-call contract rejects.
+        chunks = [
+            {"model": OLLAMA_MODEL, "message": {"tool_calls": [call]}},
+            {"model": OLLAMA_MODEL, "message": {"tool_calls": [call]}, "done": True},
+        ]
+
+        def ollama(request: httpx.Request) -> httpx.Response:
+            if json.loads(request.content)["stream"]:
+                return httpx.Response(200, content="".join(json.dumps(c) + "\n" for c in chunks).encode("utf-8"))
+            return httpx.Response(200, json={"model": "other:1b", "message": {"tool_calls": [call]}})
+
+        async def go():
+            runtime = AgentRuntime(
+                config=RuntimeConfig(journal=JournalConfig(directory=self.directory)),
+                ollama=OllamaClient(transport=httpx.MockTransport(ollama)),
+            )
+            runtime.start()
+            try:
+                for stream in (False, True):
+                    with self.assertRaises(HTTPException):
+                        req = AgentRunRequest(input="12*13", planner="ollama_math", ollama_stream=stream)
+                        await run_agent(req, runtime=runtime)
+                await asyncio.to_thread(runtime.journal.flush)
+                return runtime.journal.between()
+            finally:
+                await runtime.aclose()
+
+        plain, streamed = asyncio.run(go())
+        self.assertEqual(plain["error"], {"code": "ollama_model_mismatch", "status": 502})
+        self.assertEqual(plain["trace"][0]["returned_model"], "other:1b")
+        self.assertFalse(plain["trace"][0]["ok"])
+        self.assertEqual(streamed["error"]["code"], "ollama_adapter")
+        self.assertEqual(streamed["trace"][0]["error"], {"code": "ollama_adapter"})
+        self.assertTrue(streamed["trace"][0]["stream"])
+
+
+if __name__ == "__main__":
+    unittest.main()
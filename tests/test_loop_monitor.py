@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from typing import Any
+
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.executor import Executor
+from agent_runtime.loop_monitor import LoopMonitor, LoopMonitorConfig
+from agent_runtime.main import app
+from agent_runtime.metrics import MetricsRegistry
+from agent_runtime.profiling import Profiler, ProfilingConfig
+from agent_runtime.runtime import AgentRuntime, RuntimeConfig
+from agent_runtime.tools.base import Tool
+from agent_runtime.tools.registry import ToolRegistry
+from agent_runtime.types import Plan, PlanStep, ToolCall
+
+
+class _Blocking(Tool):
+    name = "blocking"
+    description = ""
+
+    async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        time.sleep(arguments["s"])  # the bug the monitor is for
+        return {}
+
+
+class LoopMonitorTests(unittest.TestCase):
+    def test_stall_names_the_blocking_call(self) -> None:
+        metrics = MetricsRegistry()
+        monitor = LoopMonitor(LoopMonitorConfig(interval_s=0.01, stall_s=0.1), metrics=metrics)
+        executor = Executor(ToolRegistry(tools={"blocking": _Blocking()}))
+        call = ToolCall(tool_name="blocking", arguments={"s": 0.3}, call_id="blocking_0_abc")
+        plan = Plan(user_input="", steps=[PlanStep(kind="tool_call", tool_call=call)])
+
+        async def scenario() -> None:
+            monitor.start()
+            await asyncio.sleep(0.05)
+            await executor.execute(plan)
+            await asyncio.sleep(0.05)
+            await monitor.stop()
+
+        asyncio.run(scenario())
+
+        self.assertEqual(len(monitor.stalls), 1)
+        stall = monitor.stalls[0]
+        self.assertEqual((stall["tool"], stall["call_id"]), ("blocking", "blocking_0_abc"))
+        self.assertGreaterEqual(stall["lag_ms"], 200)
+        self.assertIn(" run", stall["stack"][0])
+        self.assertIn('agent_event_loop_stalls_total{tool="blocking"} 1', metrics.render().splitlines())
+
+
+class ProfilingTests(unittest.TestCase):
+    def test_one_profile_at_a_time_and_rotation(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = Profiler(ProfilingConfig(allow_header=True, directory=tmp, keep=2))
+            self.assertIsNone(profiler.start(None))
+            profile = profiler.start("tracemalloc")
+            self.assertIsNone(profiler.start("cprofile"))
+            blob = [bytearray(1024) for _ in range(100)]
+            summary = profiler.finish(profile)
+            del blob
+
+            self.assertEqual(summary["mode"], "tracemalloc")
+            self.assertEqual(summary["top"][-1]["where"], "peak")
+            for _ in range(3):
+                profiler.save(summary)
+            self.assertEqual(len(list(Path(tmp).glob("profile-*.json"))), 2)
+            self.assertEqual(profiler.stats(), {"profiled": 1, "skipped_busy": 1, "active": False})
+
+    def test_header_attaches_cprofile_summary_to_debug_trace(self) -> None:
+        config = RuntimeConfig(profiling=ProfilingConfig(allow_header=True))
+        with TestClient(app) as client:
+            default = app.state.runtime
+            runtime = app.state.runtime = AgentRuntime(config=config)
+            try:
+                profiled = client.post("/v1/agent/run", json={"input": "12*13", "debug": True}, headers={"x-agent-profile": "cprofile"})
+                plain = client.post("/v1/agent/run", json={"input": "12*13", "debug": True})
+            finally:
+                app.state.runtime = default
+                client.portal.call(runtime.aclose)
+
+        item = profiled.json()["trace"][-1]
+        self.assertEqual(item["type"], "profile")
+        self.assertEqual(item["mode"], "cprofile")
+        # Where run_agent ranks is not stable: cProfile leaves awaited time out of a coroutine's
+        # cumulative time. The summary's shape and order are.
+        self.assertTrue(item["top"])
+        self.assertEqual(set(item["top"][0]), {"function", "calls", "tot_ms", "cum_ms"})
+        cumulative = [row["cum_ms"] for row in item["top"]]
+        self.assertEqual(cumulative, sorted(cumulative, reverse=True))
+        self.assertNotEqual(plain.json()["trace"][-1]["type"], "profile")
+
+
+if __name__ == "__main__":
+    unittest.main()
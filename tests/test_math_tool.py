@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.tools.base import ToolError
+from agent_runtime.tools.examples.math_tool import MathTool
+
+
+def _run(tool: MathTool, expression: str) -> dict:
+    return asyncio.run(tool.run({"expression": expression}))
+
+
+class MathToolTests(unittest.TestCase):
+    def test_evaluates_arithmetic(self) -> None:
+        tool = MathTool()
+
+        self.assertEqual(_run(tool, "12*13"), {"result": 156.0})
+        self.assertEqual(_run(tool, "-2^2 + (3 - 1) / 4"), {"result": -3.5})
+        self.assertEqual(_run(tool, "2^1000")["result"], 2.0**1000)
+
+    def test_oversized_powers_are_rejected_before_computing(self) -> None:
+        tool = MathTool()
+
+        for expression in ("9^9^9", "0.5^-5000", "10^400"):
+            started = time.perf_counter()
+            with self.assertRaises(ToolError) as raised:
+                _run(tool, expression)
+            self.assertEqual(raised.exception.code, "budget_exceeded", expression)
+            self.assertLess(time.perf_counter() - started, 0.5)
+
+    def test_node_and_depth_budgets(self) -> None:
+        with self.assertRaises(ToolError) as raised:
+            _run(MathTool(max_nodes=5), "1+2+3+4")
+        self.assertEqual(raised.exception.code, "budget_exceeded")
+
+        with self.assertRaises(ToolError) as raised:
+            _run(MathTool(max_depth=3), "-(-(-(-1)))")
+        self.assertEqual(raised.exception.code, "budget_exceeded")
+
+        with self.assertRaises(ToolError) as raised:
+            _run(MathTool(max_eval_ms=0), "1+1")
+        self.assertEqual(raised.exception.code, "budget_exceeded")
+
+    def test_compiled_expressions_are_reused_lru(self) -> None:
+        tool = MathTool(cache_size=2)
+        _run(tool, "1+1")
+        evaluator = tool._compiled["1+1"]
+        _run(tool, "2+2")
+        _run(tool, "1+1")
+        _run(tool, "3+3")  # evicts 2+2
+
+        self.assertIs(tool._compiled["1+1"], evaluator)
+        self.assertEqual(list(tool._compiled), ["1+1", "3+3"])
+
+    def test_invalid_expressions_stay_bad_input(self) -> None:
+        for expression in ("1/0", "1 2", "(-8)^(1/3)"):
+            with self.assertRaises(ToolError) as raised:
+                _run(MathTool(), expression)
+            self.assertEqual(raised.exception.code, "bad_input", expression)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+import httpx
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.api import AgentRunRequest, run_agent
+from agent_runtime.main import app
+from agent_runtime.metrics import MetricsRegistry
+from agent_runtime.ollama_client import OllamaClient
+from agent_runtime.runtime import AgentRuntime
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def test_text_exposition(self) -> None:
+        registry = MetricsRegistry()
+        calls = registry.counter("calls_total", "Calls.", ("tool",))
+        latency = registry.histogram("call_seconds", "Latency.", ("tool",), buckets=(0.1, 1.0))
+        calls.inc("math")
+        calls.inc("math")
+        latency.observe(0.05, "math")
+        latency.observe(0.5, "math")
+        latency.observe(3.0, "math")
+        registry.add_collector(lambda: [("cache_entries", "gauge", "Entries.", {"tool": 'a"b'}, 4)])
+
+        lines = registry.render().splitlines()
+
+        self.assertIn("# TYPE calls_total counter", lines)
+        self.assertIn('calls_total{tool="math"} 2', lines)
+        self.assertIn('call_seconds_bucket{tool="math",le="0.1"} 1', lines)
+        self.assertIn('call_seconds_bucket{tool="math",le="1"} 2', lines)
+        self.assertIn('call_seconds_bucket{tool="math",le="+Inf"} 3', lines)
+        self.assertIn('call_seconds_count{tool="math"} 3', lines)
+        self.assertIn('cache_entries{tool="a\\"b"} 4', lines)
+
+
+class MetricsEndpointTests(unittest.TestCase):
+    def test_requests_show_up_without_debug(self) -> None:
+        with TestClient(app) as client:
+            client.post("/v1/agent/run", json={"input": "12*13"})
+            client.post("/v1/agent/run", json={"input": "12*13"})
+            client.post("/v1/agent/run", json={"input": "2 ^ 9999"})
+            scrape = client.get("/metrics")
+
+        self.assertTrue(scrape.headers["content-type"].startswith("text/plain"))
+        lines = scrape.text.splitlines()
+        self.assertIn('agent_tool_calls_total{tool="math"} 3', lines)
+        self.assertIn('agent_tool_errors_total{tool="math",code="budget_exceeded"} 1', lines)
+        self.assertIn('agent_tool_call_seconds_count{tool="math"} 3', lines)
+        self.assertIn('agent_plan_seconds_count{planner="rules"} 3', lines)
+        self.assertIn('agent_tool_cache_hits_total{tool="math"} 1', lines)
+        self.assertIn('agent_tool_invocations_in_flight{tool="math"} 0', lines)
+
+    def test_ollama_tokens_are_counted(self) -> None:
+        payload = {
+            "model": "qwen3.5:9b-q4_K_M",
+            "prompt_eval_count": 73,
+            "eval_count": 19,
+            "message": {"tool_calls": [{"id": "call_1", "function": {"name": "math", "arguments": {"expression": "12*13"}}}]},
+        }
+        ollama = OllamaClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=payload)))
+        runtime = AgentRuntime(ollama=ollama)
+
+        asyncio.run(run_agent(AgentRunRequest(input="12*13", planner="ollama_math"), runtime=runtime))
+
+        lines = runtime.metrics.render().splitlines()
+        self.assertIn('agent_ollama_tokens_total{kind="input"} 73', lines)
+        self.assertIn('agent_ollama_tokens_total{kind="output"} 19', lines)
+        self.assertIn('agent_plan_seconds_count{planner="ollama_math"} 1', lines)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+import unittest
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.executor import Executor
+from agent_runtime.plan_graph import graph_dependencies
+from agent_runtime.tools.base import Tool, ToolError
+from agent_runtime.tools.registry import ToolRegistry
+from agent_runtime.types import Plan, PlanStep, ToolCall
+
+
+class _EchoTool(Tool):
+    name = "echo"
+    description = "Sleeps, then echoes its arguments (or fails on request)."
+
+    def __init__(self) -> None:
+        self.seen: list[dict[str, Any]] = []
+
+    async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        self.seen.append(arguments)
+        await asyncio.sleep(arguments.get("sleep", 0))
+        if arguments.get("fail"):
+            raise ToolError("asked to fail", code="failed")
+        return {"value": arguments.get("value")}
+
+
+def _graph(*calls: ToolCall) -> Plan:
+    return Plan(user_input="g", steps=[PlanStep(kind="tool_graph", graph_calls=list(calls))])
+
+
+class PlanGraphTests(unittest.TestCase):
+    def test_dependent_call_receives_reference_and_runs_at_critical_path_latency(self) -> None:
+        tool = _EchoTool()
+        plan = _graph(
+            ToolCall("echo", {"sleep": 0.05, "value": 7}, "a"),
+            ToolCall("echo", {"sleep": 0.05, "value": 1}, "b"),
+            ToolCall("echo", {"value": {"$ref": "a", "path": "value"}}, "c"),
+            ToolCall("echo", {"sleep": 0.05}, "d", depends_on=("b",)),
+        )
+
+        started = time.perf_counter()
+        result = asyncio.run(Executor(ToolRegistry(tools={"echo": tool})).execute(plan))
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.14)  # a|b (0.05) then c|d (0.05), not the 0.15 sum of stages
+        self.assertIn({"value": 7}, tool.seen)
+        self.assertEqual([t.get("call_id") for t in result.trace], [None, "a", "b", "c", "d"])
+        self.assertEqual(result.trace[0]["steps"][0]["calls"][3]["depends_on"], ["b"])
+
+    def test_failed_dependency_skips_dependents(self) -> None:
+        tool = _EchoTool()
+        plan = _graph(
+            ToolCall("echo", {"fail": True}, "a"),
+            ToolCall("echo", {"value": {"$ref": "a"}}, "b"),
+        )
+
+        result = asyncio.run(Executor(ToolRegistry(tools={"echo": tool})).execute(plan))
+
+        self.assertEqual(len(tool.seen), 1)
+        self.assertEqual(result.trace[2]["error"]["code"], "dependency_failed")
+
+    def test_max_step_concurrency_bounds_in_flight_calls(self) -> None:
+        plan = _graph(*(ToolCall("echo", {"sleep": 0.02}, f"c{i}") for i in range(4)))
+        executor = Executor(ToolRegistry(tools={"echo": _EchoTool()}), max_step_concurrency=2)
+
+        started = time.perf_counter()
+        asyncio.run(executor.execute(plan))
+
+        self.assertGreaterEqual(time.perf_counter() - started, 0.04)
+
+    def test_cycles_and_unknown_dependencies_are_rejected(self) -> None:
+        with self.assertRaisesRegex(ValueError, "cycle"):
+            graph_dependencies([ToolCall("echo", {}, "a", depends_on=("b",)), ToolCall("echo", {}, "b", depends_on=("a",))])
+        with self.assertRaisesRegex(ValueError, "unknown"):
+            graph_dependencies([ToolCall("echo", {"x": {"$ref": "zzz"}}, "a")])
+
+        result = asyncio.run(
+            Executor(ToolRegistry(tools={"echo": _EchoTool()})).execute(
+                _graph(ToolCall("echo", {}, "a", depends_on=("a",)))
+            )
+        )
+        self.assertEqual(result.output, "Invalid plan step.")
+
+
+if __name__ == "__main__":
+    unittest.main()
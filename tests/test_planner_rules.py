@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.executor import Executor
+from agent_runtime.keyword_automaton import KeywordAutomaton
+from agent_runtime.planner_rules import RulesPlanner
+from agent_runtime.tools.base import Tool
+from agent_runtime.tools.registry import build_default_registry
+
+
+class _QuoteTool(Tool):
+    name = "quote"
+    description = "Stock quotes."
+    triggers = ("stock", "share price")
+
+    async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        return {"price": 10}
+
+
+def _calls(plan) -> list[tuple[str, dict, str]]:
+    step = plan.steps[0]
+    calls = step.parallel_calls if step.kind == "parallel_tool_calls" else [step.tool_call]
+    return [(c.tool_name, c.arguments, c.call_id) for c in calls]
+
+
+class RulesPlannerTests(unittest.TestCase):
+    def test_plans_and_call_ids_are_stable(self) -> None:
+        # call_ids are part of the audit trail: they must not change across planner rewrites.
+        planner = RulesPlanner(build_default_registry(), cache_size=0)
+
+        self.assertEqual(
+            _calls(planner.plan("weather in Seattle and 12*13")),
+            [
+                ("weather", {"location": "Seattle and"}, "weather_0_59266e9b63cb"),
+                ("math", {"expression": "12*13"}, "math_1_5c8d242a1cfb"),
+            ],
+        )
+        self.assertEqual(
+            _calls(planner.plan("Forecast for Paris")),
+            [("weather", {"location": "Paris"}, "weather_0_7bdde7aa3a39")],
+        )
+        self.assertEqual(
+            _calls(planner.plan("(3 + 4) ^ 2")),
+            [("math", {"expression": "(3 + 4) ^ 2"}, "math_0_77da2ee260f1")],
+        )
+        self.assertEqual(
+            _calls(planner.plan("Ünïcødé search ſ")),
+            [("web_search", {"query": "Ünïcødé search ſ"}, "web_search_0_20029272fb67")],
+        )
+
+    def test_repeat_inputs_share_one_cached_plan(self) -> None:
+        planner = RulesPlanner(build_default_registry(), cache_size=2)
+
+        first = planner.plan("weather in Seattle")
+        self.assertIs(planner.plan("  weather in Seattle "), first)
+        planner.plan("12*13")
+        planner.plan("search something")  # evicts "weather in Seattle"
+
+        again = planner.plan("weather in Seattle")
+        self.assertIsNot(again, first)
+        self.assertEqual(again, first)
+
+
+    def test_registered_trigger_tools_join_a_multi_intent_plan(self) -> None:
+        registry = build_default_registry()
+        planner = RulesPlanner(registry)
+        before = planner.plan("weather in Oslo and the Stock price")
+        self.assertEqual(before.steps[-1].final_template, "weather")
+
+        registry.register(_QuoteTool())
+        plan = planner.plan("weather in Oslo and the Stock price")
+
+        self.assertEqual(
+            [(c.tool_name, c.arguments) for c in plan.steps[0].parallel_calls],
+            [
+                ("weather", {"location": "Oslo and the Stock price"}),
+                ("quote", {"input": "weather in Oslo and the Stock price"}),
+            ],
+        )
+        self.assertEqual(plan.steps[-1].final_template, "multi")
+
+        result = asyncio.run(Executor(registry).execute(planner.plan("stock for 2+2")))
+        self.assertEqual(result.output, 'quote: {"price":10}\nstock for 2+2 = 4')
+
+
+class KeywordAutomatonTests(unittest.TestCase):
+    def test_finds_overlapping_keywords_in_one_pass(self) -> None:
+        automaton = KeywordAutomaton({"a": ["he", "hers"], "b": ["she"], "c": ["his"], "d": ["zzz"]})
+
+        self.assertEqual(automaton.find("uSHErs"), {"a", "b"})
+        self.assertEqual(automaton.find("this"), {"c"})
+        self.assertEqual(automaton.find(""), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
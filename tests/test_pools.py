@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.executor import Executor
+from agent_runtime.pools import ExecutionPools
+from agent_runtime.tools.base import Tool, ToolError
+from agent_runtime.tools.registry import ToolRegistry
+from agent_runtime.types import Plan, PlanStep, ToolCall
+
+
+class _Busy(Tool):
+    name = "busy"
+    description = "Blocks its worker for a while."
+    execution = "thread"
+
+    async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        return self.run_sync(arguments)
+
+    def run_sync(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        time.sleep(0.05)
+        return {"n": arguments["n"]}
+
+
+class _Pid(Tool):
+    name = "pid"
+    description = "Reports the worker process."
+    execution = "process"
+
+    async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        return self.run_sync(arguments)
+
+    def run_sync(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        if arguments.get("fail"):
+            raise ToolError("refused", code="refused")
+        return {"pid": os.getpid()}
+
+
+def _parallel(tool: str, arguments: list[dict[str, Any]]) -> Plan:
+    calls = [ToolCall(tool, a, f"c{i}") for i, a in enumerate(arguments)]
+    return Plan(user_input="x", steps=[PlanStep(kind="parallel_tool_calls", parallel_calls=calls)])
+
+
+class ExecutionPoolTests(unittest.TestCase):
+    def test_thread_tools_run_off_the_event_loop(self) -> None:
+        pools = ExecutionPools(thread_workers=4)
+        executor = Executor(ToolRegistry(tools={"busy": _Busy()}), pools=pools)
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        async def run():
+            task = asyncio.create_task(ticker())
+            started = time.perf_counter()
+            result = await executor.execute(_parallel("busy", [{"n": i} for i in range(4)]))
+            elapsed = time.perf_counter() - started
+            task.cancel()
+            return result, elapsed
+
+        result, elapsed = asyncio.run(run())
+        pools.shutdown()
+
+        calls = [t for t in result.trace if t["type"] == "tool_call"]
+        self.assertTrue(all(c["ok"] and c["pool"] == "thread" for c in calls))
+        self.assertTrue(all(c["run_ms"] >= 40 for c in calls))
+        self.assertLess(elapsed, 0.15)  # four 50 ms calls side by side, not one after another
+        self.assertGreater(ticks, 5)  # the loop kept turning meanwhile
+
+    def test_process_tools_run_in_worker_processes(self) -> None:
+        pools = ExecutionPools(process_workers=1)
+        executor = Executor(ToolRegistry(tools={"pid": _Pid()}), pools=pools)
+
+        result = asyncio.run(executor.execute(_parallel("pid", [{}, {"fail": True}])))
+        marks: dict[str, Any] = {}
+        direct = asyncio.run(pools.run(_Pid(), {}, marks))
+        pools.shutdown()
+
+        ok, failed = [t for t in result.trace if t["type"] == "tool_call"]
+        self.assertEqual(ok["pool"], "process")
+        self.assertNotEqual(direct["pid"], os.getpid())
+        self.assertEqual(failed["error"]["code"], "refused")
+        self.assertEqual(pools.stats()["process"]["submitted"], 3)
+
+    def test_without_pools_the_tool_runs_inline(self) -> None:
+        executor = Executor(ToolRegistry(tools={"busy": _Busy()}))
+
+        result = asyncio.run(executor.execute(_parallel("busy", [{"n": 1}])))
+
+        call = [t for t in result.trace if t["type"] == "tool_call"][0]
+        self.assertTrue(call["ok"])
+        self.assertNotIn("pool", call)
+
+
+if __name__ == "__main__":
+    unittest.main()
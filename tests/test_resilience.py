@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.executor import Executor
+from agent_runtime.tools.base import ToolError
+from agent_runtime.tools.http_pool import HttpClientPool
+from agent_runtime.tools.http_tool import HttpTool
+from agent_runtime.tools.registry import ToolRegistry
+from agent_runtime.tools.resilience import (
+    BreakerConfig,
+    CircuitBreaker,
+    Resilience,
+    RetryBudget,
+    RetryBudgetConfig,
+    backoff_s,
+)
+from agent_runtime.types import Plan, PlanStep, ToolCall
+
+
+class _Clock:
+    now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _failing(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(503, json={})
+
+
+class CircuitBreakerTests(unittest.TestCase):
+    def test_opens_on_error_rate_then_probes_and_closes(self) -> None:
+        clock = _Clock()
+        breaker = CircuitBreaker("up", BreakerConfig(min_calls=4, failure_rate=0.5, open_s=5.0), clock=clock)
+
+        for ok in (True, False, True, False):
+            breaker.record(breaker.acquire(), ok, 0.01)
+        self.assertEqual(breaker.state, "open")
+        self.assertIsNone(breaker.acquire())
+
+        clock.now = 6.0
+        probe = breaker.acquire()
+        self.assertEqual(breaker.state, "half_open")
+        self.assertIsNone(breaker.acquire())  # only one trial call at a time
+        breaker.record(probe, True, 0.01)
+
+        self.assertEqual(breaker.state, "closed")
+        self.assertEqual(
+            breaker.stats()["transitions"],
+            {"closed->open": 1, "open->half_open": 1, "half_open->closed": 1},
+        )
+        self.assertEqual(breaker.stats()["rejected"], 2)
+
+    def test_slow_calls_open_the_breaker(self) -> None:
+        breaker = CircuitBreaker("up", BreakerConfig(min_calls=2, slow_call_s=1.0, slow_call_rate=1.0))
+
+        breaker.record(breaker.acquire(), True, 2.0)
+        breaker.record(breaker.acquire(), True, 3.0)
+
+        self.assertEqual(breaker.state, "open")
+
+    def test_failed_probe_reopens(self) -> None:
+        clock = _Clock()
+        breaker = CircuitBreaker("up", BreakerConfig(min_calls=1, open_s=1.0), clock=clock)
+        breaker.record(breaker.acquire(), False, 0.01)
+        clock.now = 2.0
+        breaker.record(breaker.acquire(), False, 0.01)
+
+        self.assertEqual(breaker.state, "open")
+        self.assertIsNone(breaker.acquire())
+
+
+class RetryBudgetTests(unittest.TestCase):
+    def test_retries_are_capped_by_recent_traffic(self) -> None:
+        clock = _Clock()
+        budget = RetryBudget(RetryBudgetConfig(ratio=0.1, min_retries_per_s=0.0, window_s=10.0), clock=clock)
+        for _ in range(20):
+            budget.record_request()
+
+        self.assertEqual([budget.try_retry() for _ in range(3)], [True, True, False])
+
+        clock.now = 11.0  # the window has moved past all that traffic
+        self.assertFalse(budget.try_retry())
+        self.assertEqual(budget.stats()["rejected"], 2)
+
+    def test_backoff_is_jittered_and_capped(self) -> None:
+        self.assertEqual(backoff_s(1, base_s=0.1, cap_s=1.0, rand=lambda: 1.0), 0.1)
+        self.assertEqual(backoff_s(3, base_s=0.1, cap_s=1.0, rand=lambda: 1.0), 0.4)
+        self.assertEqual(backoff_s(10, base_s=0.1, cap_s=1.0, rand=lambda: 0.5), 0.5)
+
+
+class HttpToolResilienceTests(unittest.TestCase):
+    def test_open_breaker_fails_fast_and_is_traced(self) -> None:
+        requests = []
+
+        def failing(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(503, json={})
+
+        resilience = Resilience(BreakerConfig(min_calls=2, open_s=60.0))
+        tool = HttpTool(
+            name="up",
+            description="",
+            url="http://upstream.test/x",
+            retries=1,
+            backoff_base_s=0.001,
+            pool=HttpClientPool(transport=httpx.MockTransport(failing)),
+            resilience=resilience,
+        )
+        executor = Executor(ToolRegistry(tools={"up": tool}))
+        plan = Plan(
+            user_input="x",
+            steps=[
+                PlanStep(kind="tool_call", tool_call=ToolCall("up", {"n": 1}, "c0")),
+                PlanStep(kind="tool_call", tool_call=ToolCall("up", {"n": 2}, "c1")),
+            ],
+        )
+
+        result = asyncio.run(executor.execute(plan))
+
+        first, second = [t for t in result.trace if t["type"] == "tool_call"]
+        self.assertEqual(first["error"]["code"], "http_retry_exhausted")
+        self.assertEqual(first["attempts"], 2)
+        self.assertEqual(first["circuit"], [{"upstream": "http://upstream.test", "from": "closed", "to": "open"}])
+        self.assertEqual(second["error"]["code"], "circuit_open")
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(resilience.stats()["breakers"]["http://upstream.test"]["state"], "open")
+
+    def test_exhausted_retry_budget_stops_retrying(self) -> None:
+        resilience = Resilience(retry_budget=RetryBudgetConfig(ratio=0.0, min_retries_per_s=0.0))
+        tool = HttpTool(
+            name="up",
+            description="",
+            url="http://upstream.test/x",
+            retries=3,
+            pool=HttpClientPool(transport=httpx.MockTransport(_failing)),
+            resilience=resilience,
+        )
+
+        with self.assertRaises(ToolError) as raised:
+            asyncio.run(tool.run({}))
+
+        self.assertEqual(raised.exception.code, "http_retry_exhausted")
+        self.assertIn("retry budget", str(raised.exception))
+        self.assertEqual(resilience.stats()["retry_budget"]["rejected"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import unittest
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.canonical import call_key
+from agent_runtime.executor import Executor
+from agent_runtime.pools import ExecutionPools
+from agent_runtime.single_flight import SingleFlight
+from agent_runtime.tool_cache import ToolResultCache
+from agent_runtime.tools.base import CachePolicy, Tool, ToolError
+from agent_runtime.tools.examples.math_tool import MathTool
+from agent_runtime.tools.examples.weather_tool import WeatherTool
+from agent_runtime.tools.http_pool import HttpClientPool
+from agent_runtime.tools.http_tool import HttpTool
+from agent_runtime.tools.registry import ToolRegistry
+from agent_runtime.tools.resilience import Resilience
+from agent_runtime.types import Plan, PlanStep, ToolCall
+
+
+class _Doubler(Tool):
+    name = "double"
+    description = "Doubles n, in batches."
+    batchable = True
+    cache_policy = CachePolicy(ttl_s=60.0)
+
+    def __init__(self) -> None:
+        self.batches: list[list[int]] = []
+
+    async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        raise AssertionError("batched calls should not go through run()")
+
+    async def run_many(self, arguments: list[dict[str, Any]]) -> list[dict[str, Any] | Exception]:
+        self.batches.append([a["n"] for a in arguments])
+        return [ToolError("negative", code="bad_input") if a["n"] < 0 else {"n": a["n"] * 2} for a in arguments]
+
+
+class _SlowDoubler(_Doubler):
+    idempotent = True
+    cache_policy = None
+
+    async def run_many(self, arguments: list[dict[str, Any]]) -> list[dict[str, Any] | Exception]:
+        self.batches.append([a["n"] for a in arguments])
+        await asyncio.sleep(0.05)
+        return [{"n": a["n"] * 2} for a in arguments]
+
+
+def _calls(tool: str, arguments: list[dict[str, Any]]) -> list[ToolCall]:
+    return [ToolCall(tool, a, f"c{i}") for i, a in enumerate(arguments)]
+
+
+class RunManyTests(unittest.TestCase):
+    def test_same_tool_calls_share_one_invocation(self) -> None:
+        tool = _Doubler()
+        cache = ToolResultCache()
+        cache.put("double", tool.cache_policy, call_key("double", {"n": 9}), {"n": 18})
+        executor = Executor(ToolRegistry(tools={"double": tool}), cache=cache)
+        calls = _calls("double", [{"n": 1}, {"n": 2}, {"n": 1}, {"n": -1}, {"n": 9}])
+
+        out = asyncio.run(executor._run_parallel(calls, executor.new_run()))
+
+        self.assertEqual(tool.batches, [[1, 2, -1]])
+        self.assertEqual(
+            [out["results"][c.call_id] for c in calls],
+            [{"n": 2}, {"n": 4}, {"n": 2}, {"error": {"code": "bad_input", "message": "negative"}}, {"n": 18}],
+        )
+        items = [out["traces"][c.call_id][0].as_dict() for c in calls]
+        self.assertEqual([i.get("batched") for i in items], [3, 3, 3, 3, None])
+        self.assertTrue(items[2]["deduplicated"])
+        self.assertTrue(items[4]["cached"])
+
+    def test_math_batch_is_one_pool_submission(self) -> None:
+        pools = ExecutionPools(thread_workers=2)
+        executor = Executor(ToolRegistry(tools={"math": MathTool()}), pools=pools)
+        calls = _calls("math", [{"expression": "1+1"}, {"expression": "2*3"}, {"expression": "9^9^9"}])
+
+        out = asyncio.run(executor._run_parallel(calls, executor.new_run()))
+        pools.shutdown()
+
+        self.assertEqual(out["results"]["c0"], {"result": 2.0})
+        self.assertEqual(out["results"]["c1"], {"result": 6.0})
+        self.assertEqual(out["results"]["c2"]["error"]["code"], "budget_exceeded")
+        self.assertEqual(pools.stats()["thread"]["submitted"], 1)
+
+    def test_call_budget_aborts_the_run_whether_or_not_calls_are_batched(self) -> None:
+        executor = Executor(ToolRegistry(tools={"math": MathTool(), "weather": WeatherTool()}), max_tool_calls=1)
+        batched = [ToolCall("math", {"expression": "1+1"}, "c0"), ToolCall("math", {"expression": "2+2"}, "c1")]
+        mixed = [ToolCall("math", {"expression": "1+1"}, "c0"), ToolCall("weather", {"location": "Oslo"}, "c1")]
+
+        for calls in (batched, mixed):
+            plan = Plan(user_input="x", steps=[PlanStep(kind="parallel_tool_calls", parallel_calls=calls)])
+            with self.assertRaises(ToolError) as raised:
+                asyncio.run(executor.execute(plan))
+            self.assertEqual(raised.exception.code, "rate_limit")
+
+    def test_batched_calls_coalesce_with_concurrent_runs(self) -> None:
+        tool = _SlowDoubler()
+        executor = Executor(ToolRegistry(tools={"double": tool}), single_flight=SingleFlight())
+        calls = _calls("double", [{"n": 1}, {"n": 2}])
+
+        async def both():
+            return await asyncio.gather(*(executor._run_parallel(calls, executor.new_run()) for _ in range(2)))
+
+        first, second = asyncio.run(both())
+
+        self.assertEqual(tool.batches, [[1, 2]])
+        self.assertEqual(first["results"], second["results"])
+        self.assertEqual(second["results"], {"c0": {"n": 2}, "c1": {"n": 4}})
+        self.assertTrue(all(second["traces"][c.call_id][0].as_dict()["coalesced"] for c in calls))
+
+    def test_math_run_many_sync_matches_run_sync(self) -> None:
+        tool = MathTool()
+        arguments = [{"expression": "2^10"}, {"expression": "x"}, {"expression": "9^9^9"}, {"expression": "2^10 "}]
+
+        out = tool.run_many_sync(arguments)
+
+        self.assertEqual(out[0], tool.run_sync(arguments[0]))
+        self.assertEqual([e.code for e in out[1:3]], ["bad_input", "budget_exceeded"])
+        self.assertEqual(out[3], {"result": 1024.0})
+
+    def test_http_tool_maps_a_batch_onto_one_bulk_post(self) -> None:
+        requests: list[httpx.Request] = []
+
+        def upstream(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            items = json.loads(request.content)
+            return httpx.Response(200, json=[{"echo": item["q"]} for item in items])
+
+        tool = HttpTool(
+            name="lookup",
+            description="",
+            url="http://upstream.test/lookup",
+            bulk_url="http://upstream.test/lookup/bulk",
+            pool=HttpClientPool(transport=httpx.MockTransport(upstream)),
+            resilience=Resilience(),
+        )
+        executor = Executor(ToolRegistry(tools={"lookup": tool}))
+        calls = _calls("lookup", [{"q": "a"}, {"q": "b"}])
+
+        out = asyncio.run(executor._run_parallel(calls, executor.new_run()))
+
+        self.assertEqual([str(r.url) for r in requests], ["http://upstream.test/lookup/bulk"])
+        self.assertEqual(out["results"], {"c0": {"echo": "a"}, "c1": {"echo": "b"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
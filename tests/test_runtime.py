@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import unittest
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.main import app
+from agent_runtime.runtime import AgentRuntime
+from agent_runtime.tools.examples.math_tool import MathTool
+from agent_runtime.tools.http_pool import shared_http_pool
+from agent_runtime.tools.resilience import shared_resilience
+
+
+class _Calculator(MathTool):
+    description = "Replacement calculator."
+
+
+class RuntimeTests(unittest.TestCase):
+    def test_lifespan_builds_one_runtime_shared_by_requests(self) -> None:
+        with TestClient(app) as client:
+            runtime = app.state.runtime
+            first = client.post("/v1/agent/run", json={"input": "12*13"})
+            second = client.post("/v1/agent/run", json={"input": "weather in Seattle"})
+            schemas = client.get("/v1/tools/schemas")
+
+            self.assertIs(app.state.runtime, runtime)
+
+        self.assertEqual(first.json(), {"output": "12*13 = 156", "trace": None})
+        self.assertEqual(second.json()["output"], "Weather for Seattle: Stub: 72F, clear skies.")
+        self.assertEqual(schemas.content, runtime.tool_schemas_bytes)
+        self.assertEqual(sorted(json.loads(schemas.content)), ["math", "weather", "web_search"])
+
+    def test_schemas_revalidate_with_etag(self) -> None:
+        with TestClient(app) as client:
+            first = client.get("/v1/tools/schemas")
+            etag = first.headers["etag"]
+            cached = client.get("/v1/tools/schemas", headers={"If-None-Match": f'"stale", W/{etag}'})
+            changed = client.get("/v1/tools/schemas", headers={"If-None-Match": '"stale"'})
+
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b"")
+        self.assertEqual(cached.headers["etag"], etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.content, first.content)
+
+    def test_schemas_follow_registered_tools(self) -> None:
+        with TestClient(app) as client:
+            runtime = app.state.runtime
+            before = client.get("/v1/tools/schemas")
+            etag = before.headers["etag"]
+            math = runtime.registry.get("math")
+            runtime.registry.register(_Calculator())
+            try:
+                after = client.get("/v1/tools/schemas", headers={"If-None-Match": etag})
+                definition = runtime.ollama_math_tool_definition
+            finally:
+                runtime.registry.register(math)
+
+        self.assertEqual(after.status_code, 200)
+        self.assertNotEqual(after.headers["etag"], etag)
+        self.assertEqual(json.loads(after.content)["math"]["description"], _Calculator.description)
+        self.assertEqual(definition["function"]["description"], _Calculator.description)
+
+    def test_shared_http_state_belongs_to_the_started_runtime(self) -> None:
+        async def go():
+            before = shared_http_pool(), shared_resilience()
+            first = AgentRuntime()
+            first.start()
+            AgentRuntime()  # constructing another runtime leaves first's tools alone
+            during = shared_http_pool(), shared_resilience()
+            second = AgentRuntime()
+            second.start()
+            nested = shared_http_pool()
+            await second.aclose()
+            restored = shared_http_pool(), shared_resilience()
+            await first.aclose()
+            return before, first, during, second, nested, restored, (shared_http_pool(), shared_resilience())
+
+        before, first, during, second, nested, restored, after = asyncio.run(go())
+        self.assertEqual(during, (first.http_pool, first.resilience))
+        self.assertIs(nested, second.http_pool)
+        self.assertEqual(restored, (first.http_pool, first.resilience))
+        self.assertIs(after[0], before[0])
+        self.assertIs(after[1], before[1])
+
+    def test_call_budget_is_per_run_not_per_executor(self) -> None:
+        runtime = AgentRuntime()
+        plan = runtime.rules_planner.plan("weather in Seattle and 12*13")
+
+        async def run_many():
+            return await asyncio.gather(*(runtime.executor.execute(plan) for _ in range(20)))
+
+        results = asyncio.run(run_many())
+
+        for result in results:
+            tool_calls = [t for t in result.trace if t["type"] == "tool_call"]
+            self.assertEqual([t["ok"] for t in tool_calls], [True, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
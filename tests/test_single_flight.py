@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+import unittest
+from pathlib import Path
+from typing import Any
+
+import httpx
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.call_context import remaining_s
+from agent_runtime.executor import Executor
+from agent_runtime.single_flight import SingleFlight
+from agent_runtime.tools.base import Tool, ToolError
+from agent_runtime.tools.http_pool import HttpClientPool
+from agent_runtime.tools.http_tool import HttpTool
+from agent_runtime.tools.resilience import Resilience
+from agent_runtime.tools.registry import ToolRegistry
+from agent_runtime.types import Plan, PlanStep, ToolCall
+
+
+class _SlowTool(Tool):
+    name = "slow"
+    description = "Sleeps, then answers or fails."
+    idempotent = True
+
+    def __init__(self, *, fail: bool = False) -> None:
+        self.calls = 0
+        self.fail = fail
+
+    async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        self.calls += 1
+        await asyncio.sleep(0.02)
+        if self.fail:
+            raise ToolError("upstream down", code="upstream")
+        return {"city": arguments["city"]}
+
+
+class _DeadlineAwareTool(_SlowTool):
+    """Checks the ambient deadline between attempts, as HttpTool does before a retry."""
+
+    async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        self.calls += 1
+        await asyncio.sleep(0.1)
+        remaining = remaining_s()
+        if remaining is not None and remaining < 0:
+            raise ToolError("Deadline exceeded", code="deadline_exceeded")
+        return {"city": arguments["city"]}
+
+
+def _plan(call_id: str) -> Plan:
+    return Plan(
+        user_input="weather in Seattle",
+        steps=[PlanStep(kind="tool_call", tool_call=ToolCall("slow", {"city": "Seattle"}, call_id))],
+    )
+
+
+async def _burst(executor: Executor, n: int):
+    return await asyncio.gather(*(executor.execute(_plan(f"c{i}")) for i in range(n)))
+
+
+class SingleFlightTests(unittest.TestCase):
+    def test_concurrent_identical_calls_share_one_run(self) -> None:
+        tool = _SlowTool()
+        flight = SingleFlight()
+        executor = Executor(ToolRegistry(tools={"slow": tool}), single_flight=flight)
+
+        results = asyncio.run(_burst(executor, 5))
+
+        self.assertEqual(tool.calls, 1)
+        traces = [r.trace[1] for r in results]
+        self.assertEqual([t["call_id"] for t in traces], ["c0", "c1", "c2", "c3", "c4"])
+        self.assertEqual(sum(1 for t in traces if t.get("coalesced")), 4)
+        self.assertTrue(all(t["ok"] for t in traces))
+        self.assertEqual(flight.stats(), {"in_flight": 0, "leaders": 1, "followers": 4, "abandoned": 0})
+
+    def test_errors_reach_every_waiter(self) -> None:
+        tool = _SlowTool(fail=True)
+        executor = Executor(ToolRegistry(tools={"slow": tool}), single_flight=SingleFlight())
+
+        results = asyncio.run(_burst(executor, 3))
+
+        self.assertEqual(tool.calls, 1)
+        for result in results:
+            self.assertEqual(result.trace[1]["error"], {"code": "upstream", "message": "upstream down"})
+
+
+    def test_followers_keep_their_own_deadline(self) -> None:
+        tool = _DeadlineAwareTool()
+        executor = Executor(ToolRegistry(tools={"slow": tool}), single_flight=SingleFlight())
+
+        async def both():
+            now = time.monotonic()
+            leader = asyncio.create_task(executor.execute(_plan("c0"), executor.new_run(deadline=now + 0.05)))
+            await asyncio.sleep(0)
+            follower = executor.execute(_plan("c1"), executor.new_run(deadline=now + 5.0))
+            return await asyncio.gather(leader, follower)
+
+        leader, follower = asyncio.run(both())
+
+        self.assertEqual(tool.calls, 1)
+        self.assertEqual(leader.trace[1]["error"]["code"], "deadline_exceeded")
+        self.assertTrue(follower.trace[1]["ok"])
+        self.assertTrue(follower.trace[1]["coalesced"])
+        self.assertNotIn("deadline_exceeded", [t["type"] for t in follower.trace])
+
+    def test_abandoned_call_stops_retrying_after_the_deadline(self) -> None:
+        hits: list[float] = []
+
+        async def upstream(request: httpx.Request) -> httpx.Response:
+            hits.append(time.monotonic())
+            await asyncio.sleep(0.4)
+            return httpx.Response(503)
+
+        tool = HttpTool(
+            name="slow",
+            description="",
+            url="http://upstream.test/x",
+            retries=3,
+            idempotent=True,
+            backoff_base_s=0.0,
+            pool=HttpClientPool(transport=httpx.MockTransport(upstream)),
+            resilience=Resilience(),
+        )
+        flight = SingleFlight()
+        executor = Executor(ToolRegistry(tools={"slow": tool}), single_flight=flight)
+
+        async def run():
+            deadline = time.monotonic() + 0.15
+            result = await executor.execute(_plan("c0"), executor.new_run(deadline=deadline))
+            await asyncio.sleep(0.6)
+            return deadline, result
+
+        deadline, result = asyncio.run(run())
+
+        self.assertEqual(result.trace[1]["error"]["code"], "deadline_exceeded")
+        self.assertEqual(len(hits), 1)
+        self.assertTrue(all(t < deadline for t in hits))
+        self.assertEqual(flight.stats()["abandoned"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
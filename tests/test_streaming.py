@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import unittest
+from pathlib import Path
+from typing import Any
+
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.executor import Executor
+from agent_runtime.main import app
+from agent_runtime.tools.base import Tool
+from agent_runtime.tools.registry import ToolRegistry
+from agent_runtime.types import Plan, PlanStep, ToolCall
+
+
+class _SleepTool(Tool):
+    name = "sleep"
+    description = "Sleeps for the requested time."
+
+    async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        await asyncio.sleep(arguments["s"])
+        return {"slept": arguments["s"]}
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class ExecuteStreamTests(unittest.TestCase):
+    def test_events_arrive_in_completion_order_and_final_trace_in_call_order(self) -> None:
+        executor = Executor(ToolRegistry(tools={"sleep": _SleepTool()}))
+        plan = Plan(
+            user_input="x",
+            steps=[
+                PlanStep(
+                    kind="parallel_tool_calls",
+                    parallel_calls=[ToolCall("sleep", {"s": 0.05}, "slow"), ToolCall("sleep", {"s": 0.0}, "fast")],
+                ),
+                PlanStep(kind="final", final_template="default"),
+            ],
+        )
+
+        async def collect():
+            return [event async for event in executor.execute_stream(plan)]
+
+        events = asyncio.run(collect())
+
+        self.assertEqual(
+            [(e["type"], e.get("call_id")) for e in events],
+            [
+                ("plan", None),
+                ("tool_call_start", "slow"),
+                ("tool_call_start", "fast"),
+                ("tool_call", "fast"),
+                ("tool_call", "slow"),
+                ("final", None),
+            ],
+        )
+        final = events[-1]
+        self.assertEqual([t.get("call_id") for t in final["trace"]], [None, "slow", "fast"])
+
+    def test_closing_the_stream_cancels_outstanding_calls(self) -> None:
+        executor = Executor(ToolRegistry(tools={"sleep": _SleepTool()}))
+        plan = Plan(user_input="x", steps=[PlanStep(kind="tool_call", tool_call=ToolCall("sleep", {"s": 10}, "c0"))])
+
+        async def start_then_close():
+            stream = executor.execute_stream(plan)
+            seen = [await stream.__anext__(), await stream.__anext__()]
+            await stream.aclose()
+            pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            await asyncio.sleep(0)
+            return seen, [t for t in pending if not t.done()]
+
+        seen, still_running = asyncio.run(start_then_close())
+
+        self.assertEqual([e["type"] for e in seen], ["plan", "tool_call_start"])
+        self.assertEqual(still_running, [])
+
+
+class SseEndpointTests(unittest.TestCase):
+    def test_non_debug_stream_hides_tools(self) -> None:
+        with TestClient(app) as client:
+            response = client.post("/v1/agent/run/stream", json={"input": "weather in Seattle and 12*13"})
+
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        events = _parse_sse(response.text)
+        self.assertEqual([name for name, _ in events], ["progress", "progress", "final"])
+        self.assertEqual(events[1][1], {"completed": 2, "total": 2})
+        self.assertIsNone(events[-1][1]["trace"])
+        self.assertIn("Weather for Seattle and", events[-1][1]["output"])
+
+    def test_debug_stream_includes_executor_events(self) -> None:
+        with TestClient(app) as client:
+            response = client.post("/v1/agent/run/stream", json={"input": "12*13", "debug": True})
+
+        names = [name for name, _ in _parse_sse(response.text)]
+        self.assertEqual(names, ["plan", "tool_call_start", "tool_call", "final"])
+
+
+if __name__ == "__main__":
+    unittest.main()
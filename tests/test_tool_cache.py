@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.executor import Executor
+from agent_runtime.tool_cache import ToolResultCache
+from agent_runtime.tools.base import CachePolicy, Tool
+from agent_runtime.tools.registry import ToolRegistry
+from agent_runtime.types import Plan, PlanStep, ToolCall
+
+
+class _Clock:
+    now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _CountingTool(Tool):
+    name = "counting"
+    description = "Counts invocations."
+    cache_policy = CachePolicy(ttl_s=10.0)
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        self.calls += 1
+        return {"n": arguments["n"]}
+
+
+class ToolResultCacheTests(unittest.TestCase):
+    def test_ttl_expiry_and_lru_eviction(self) -> None:
+        clock = _Clock()
+        cache = ToolResultCache(clock=clock)
+        policy = CachePolicy(ttl_s=5.0, max_entries=2)
+
+        cache.put("t", policy, "a", {"v": 1})
+        cache.put("t", policy, "b", {"v": 2})
+        self.assertEqual(cache.get("t", "a"), {"v": 1})
+        cache.put("t", policy, "c", {"v": 3})  # evicts b, the least recently used
+
+        self.assertIsNone(cache.get("t", "b"))
+        clock.now = 6.0
+        self.assertIsNone(cache.get("t", "a"))
+        self.assertEqual(
+            cache.stats()["t"],
+            {"entries": 1, "bytes": 7, "hits": 1, "misses": 2, "evictions": 1, "expirations": 1, "uncacheable": 0},
+        )
+
+    def test_byte_budget_evicts_oldest(self) -> None:
+        cache = ToolResultCache()
+        policy = CachePolicy(ttl_s=60.0, max_bytes=20)
+
+        cache.put("t", policy, "a", {"v": "xxxxxx"})
+        cache.put("t", policy, "b", {"v": "yyyyyy"})
+        cache.put("t", policy, "huge", {"v": "z" * 50})  # larger than the whole budget: not stored
+
+        self.assertIsNone(cache.get("t", "a"))
+        self.assertIsNotNone(cache.get("t", "b"))
+        self.assertIsNone(cache.get("t", "huge"))
+
+    def test_executor_serves_repeat_calls_from_cache(self) -> None:
+        tool = _CountingTool()
+        executor = Executor(ToolRegistry(tools={"counting": tool}), cache=ToolResultCache())
+        plan = Plan(
+            user_input="n",
+            steps=[
+                PlanStep(kind="tool_call", tool_call=ToolCall("counting", {"n": 1}, "c0")),
+                PlanStep(kind="tool_call", tool_call=ToolCall("counting", {"n": 1}, "c1")),
+            ],
+        )
+
+        result = asyncio.run(executor.execute(plan))
+
+        self.assertEqual(tool.calls, 1)
+        calls = [t for t in result.trace if t["type"] == "tool_call"]
+        self.assertNotIn("cached", calls[0])
+        self.assertTrue(calls[1]["cached"])
+
+    def test_unencodable_result_is_returned_but_not_cached(self) -> None:
+        class _SetTool(_CountingTool):
+            async def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+                self.calls += 1
+                return {"tags": {"a"}}
+
+        tool = _SetTool()
+        cache = ToolResultCache()
+        executor = Executor(ToolRegistry(tools={"counting": tool}), cache=cache)
+        plan = Plan(
+            user_input="n",
+            steps=[
+                PlanStep(kind="tool_call", tool_call=ToolCall("counting", {"n": 1}, "c0")),
+                PlanStep(kind="tool_call", tool_call=ToolCall("counting", {"n": 1}, "c1")),
+            ],
+        )
+
+        result = asyncio.run(executor.execute(plan))
+
+        self.assertEqual(tool.calls, 2)
+        self.assertTrue(all(t["ok"] for t in result.trace if t["type"] == "tool_call"))
+        self.assertEqual(cache.stats()["counting"]["uncacheable"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.runtime import AgentRuntime
+from agent_runtime.trace_recorder import NULL_RECORDER, PlanEvent, ToolCallEvent
+
+
+class TraceRecorderTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.runtime = AgentRuntime()
+        self.plan = self.runtime.rules_planner.plan("weather in Seattle and 12*13")
+
+    def _execute(self, run):
+        return asyncio.run(self.runtime.executor.execute(self.plan, run))
+
+    def test_untraced_run_builds_no_events(self) -> None:
+        run = self.runtime.executor.new_run(trace=False)
+        result = self._execute(run)
+
+        self.assertIs(run.recorder, NULL_RECORDER)
+        self.assertTrue(result.output.endswith("12*13 = 156"))
+        self.assertEqual(result.events, [])
+        self.assertEqual(result.trace, [])
+
+    def test_traced_run_materializes_trace_types_once(self) -> None:
+        result = self._execute(self.runtime.executor.new_run())
+
+        self.assertEqual([type(e) for e in result.events], [PlanEvent, ToolCallEvent, ToolCallEvent])
+        trace = result.trace
+        self.assertIs(result.trace, trace)
+        self.assertEqual(trace[0]["type"], "plan")
+        self.assertEqual(trace[0]["steps"][0]["kind"], "parallel_tool_calls")
+        self.assertEqual([(t["type"], t["tool"], t["ok"]) for t in trace[1:]], [("tool_call", "weather", True), ("tool_call", "math", True)])
+
+    def test_untraced_stream_still_reports_tool_calls(self) -> None:
+        async def collect():
+            run = self.runtime.executor.new_run(trace=False)
+            return [e async for e in self.runtime.executor.execute_stream(self.plan, run)]
+
+        events = asyncio.run(collect())
+
+        self.assertEqual([e["type"] for e in events if e["type"] == "tool_call"], ["tool_call", "tool_call"])
+        self.assertEqual(events[-1]["trace"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
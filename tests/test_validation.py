@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+import httpx
+from pydantic import BaseModel
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from agent_runtime.tools.base import ToolError
+from agent_runtime.tools.examples.math_tool import MathTool, MathToolInput, MathToolOutput
+from agent_runtime.tools.http_pool import HttpClientPool
+from agent_runtime.tools.http_tool import HttpTool
+from agent_runtime.tools.resilience import Resilience
+from agent_runtime.tools.validation import type_adapter, validate_arguments
+
+
+class _Quote(BaseModel):
+    symbol: str
+    price: float
+
+
+def _tool(body: bytes, **kwargs) -> HttpTool:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=body, headers={"content-type": "application/json"})
+
+    return HttpTool(
+        name="quotes",
+        description="",
+        url="http://quotes.test/q",
+        pool=HttpClientPool(transport=httpx.MockTransport(handler)),
+        resilience=Resilience(),
+        **kwargs,
+    )
+
+
+class ValidationTests(unittest.TestCase):
+    def test_adapters_are_built_once_per_type(self) -> None:
+        self.assertIs(type_adapter(MathToolInput), type_adapter(MathToolInput))
+
+    def test_bad_arguments_raise_bad_input(self) -> None:
+        with self.assertRaises(ToolError) as ctx:
+            validate_arguments(MathToolInput, {"expression": "import os"})
+        self.assertEqual(ctx.exception.code, "bad_input")
+        with self.assertRaises(ToolError):
+            validate_arguments(MathToolInput, "1+1")
+
+    def test_tool_outputs_match_their_declared_models(self) -> None:
+        out = MathTool().run_sync({"expression": "2*3"})
+        self.assertEqual(out, {"result": 6.0})
+        type_adapter(MathToolOutput).validate_python(out)
+
+    def test_http_body_validated_against_output_model(self) -> None:
+        tool = _tool(b'{"symbol":"ABC","price":"12.5","extra":1}', output_model=_Quote)
+        self.assertEqual(asyncio.run(tool.run({})), {"symbol": "ABC", "price": 12.5})
+        self.assertEqual(tool.output_schema["title"], "_Quote")
+
+    def test_contract_violation_is_an_invalid_response(self) -> None:
+        tool = _tool(b'{"symbol":"ABC"}', output_model=_Quote)
+        with self.assertRaises(ToolError) as ctx:
+            asyncio.run(tool.run({}))
+        self.assertEqual(ctx.exception.code, "http_invalid_response")
+        breaker = tool.resilience.breaker(tool.url).stats()
+        self.assertEqual(breaker["failures"], 1)
+
+    def test_without_a_model_any_json_passes_through(self) -> None:
+        tool = _tool(b'{"anything":[1,2]}')
+        self.assertEqual(asyncio.run(tool.run({})), {"anything": [1, 2]})
+        with self.assertRaises(ToolError) as ctx:
+            asyncio.run(_tool(b"not json").run({}))
+        self.assertEqual(ctx.exception.code, "http_invalid_response")
+
+
+if __name__ == "__main__":
+    unittest.main()